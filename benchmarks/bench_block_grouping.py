@@ -0,0 +1,88 @@
+"""
+Block Grouping Benchmark
+Times the vectorized block grouping against the original per-pair loop for
+100 / 1k / 10k tokens. tests/test_block_grouping.py checks that both (and
+the streaming form) give the same blocks on randomized pages.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_block_grouping [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_line_grouping import random_page
+from src.layout.block_grouping import BLOCK_BREAK_KEYWORDS, group_lines_into_blocks
+from src.layout.line_grouping import group_tokens_into_lines
+from src.layout.token_table import TokenTable
+
+WORDS = ["Swaraj", "744", "FE", "HP", "Rs.", "Qty", "tractors", "dealer"]
+
+
+def reference_contains_block_break(table, line):
+    text = " ".join(t.lower() for t in table.text[line])
+    return any(k.lower() in text for k in BLOCK_BREAK_KEYWORDS)
+
+
+def reference_group_lines_into_blocks(table, lines):
+    # Original per-pair implementation, kept as the semantic reference
+    y_min = table.y_min
+    y_max = table.y_max
+    heights = table.heights
+
+    blocks = []
+    current_block = [lines[0]]
+
+    for prev, curr in zip(lines, lines[1:]):
+        prev_bottom = y_max[prev].max()
+        curr_top = y_min[curr].min()
+
+        gap = curr_top - prev_bottom
+        avg_height = heights[prev].sum() / len(prev)
+
+        if gap > avg_height * 1.3 or reference_contains_block_break(table, curr):
+            blocks.append(current_block)
+            current_block = [curr]
+        else:
+            current_block.append(curr)
+
+    blocks.append(current_block)
+    return blocks
+
+
+def random_layout(num_tokens, rng):
+    tokens = random_page(num_tokens, rng)
+    for token in tokens:
+        token["text"] = rng.choice(WORDS)
+        if rng.random() < 0.03:
+            token["text"] = rng.choice(BLOCK_BREAK_KEYWORDS).upper()
+    table = TokenTable.from_tokens(tokens)
+    return table, group_tokens_into_lines(table)
+
+
+def time_call(fn, table, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(table, lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f"{'tokens':>8} {'lines':>6} {'reference ms':>14} {'vectorized ms':>14} {'speedup':>8}")
+    for n in (100, 1_000, 10_000):
+        table, lines = random_layout(n, rng)
+        ref_s = time_call(reference_group_lines_into_blocks, table, lines, args.repeat)
+        new_s = time_call(group_lines_into_blocks, table, lines, args.repeat)
+        print(f"{n:>8} {len(lines):>6} {ref_s * 1000:>14.2f} {new_s * 1000:>14.2f} "
+              f"{ref_s / new_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Document Gate Benchmark
+Precision / recall of the DocumentGate, its cost per page, and the
+normalization time it saves on each rejected page.
+
+Positives are the pages of --input (data/train holds quotations only);
+--labels adds labelled pages (CSV: path,label with label "quotation" or
+anything else). Negatives are synthesized from the positives: blank paper,
+bleed-through of a mirrored page, an ID-card sized crop on an empty page,
+and photo-like smooth fields. Real non-quotation scans (bank statements,
+...) are not covered by the synthetic set; add them with --labels.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_document_gate [--pages 120] [--negatives 30]
+        [--labels labels.csv] [--profile quality]
+"""
+import argparse
+import csv
+import os
+import statistics
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from src.batch import collect_inputs
+from src.preprocessing.image_loader import load_image
+from src.preprocessing.image_normalizer import ImageNormalizer
+from src.reasoning.document_gate import DocumentGate, is_rejected
+
+NEGATIVE_KINDS = ("blank", "bleed", "idcard", "photo")
+
+
+def paper(rng, height=1680, width=1200):
+    page = np.full((height, width), rng.uniform(215, 250), np.float32)
+    page += np.linspace(0, rng.uniform(-20, 20), width)[None, :]
+    page += rng.normal(0, rng.uniform(2, 8), (height, width))
+    for _ in range(rng.integers(0, 30)):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        cv2.circle(page, center, int(rng.integers(1, 4)), float(rng.uniform(0, 120)), -1)
+    return page
+
+
+def synthetic_negative(kind, source, rng):
+    gray = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    if kind == "blank":
+        page = paper(rng)
+    elif kind == "bleed":
+        # Back of a thin sheet: faint mirror image of the front
+        page = paper(rng, *gray.shape)
+        page -= (255 - cv2.flip(gray, 1)) * rng.uniform(0.04, 0.1)
+    elif kind == "idcard":
+        page = paper(rng)
+        height, width = gray.shape
+        card = gray[int(height * 0.1):int(height * 0.35), int(width * 0.05):int(width * 0.7)]
+        page[500:800, 350:850] = cv2.resize(card, (500, 300))
+        # Photo on the card
+        cv2.rectangle(page, (370, 560), (500, 740), float(rng.uniform(30, 90)), -1)
+    else:
+        coarse = rng.uniform(0, 255, (12, 9)).astype(np.float32)
+        page = cv2.resize(coarse, (1200, 1680), interpolation=cv2.INTER_CUBIC)
+        page += rng.normal(0, 12, page.shape)
+
+    return cv2.cvtColor(np.clip(page, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+
+
+def load_labels(path):
+    with open(path, newline="") as f:
+        return [(row["path"], row["label"] == "quotation") for row in csv.DictReader(f)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default=os.path.join("data", "train"),
+                        help="quotation images: directory or manifest (default: data/train)")
+    parser.add_argument("--pages", type=int, default=120,
+                        help="positive pages to sample, evenly spaced (default: 120)")
+    parser.add_argument("--negatives", type=int, default=30,
+                        help="synthetic negatives per kind (default: 30)")
+    parser.add_argument("--labels", default=None,
+                        help="extra labelled pages, CSV with columns path,label")
+    parser.add_argument("--profile", default="quality",
+                        help="normalizer profile used to price a rejected page")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.input)
+    step = max(1, len(paths) // args.pages)
+    positives = [(p, load_image(p)) for p in paths[::step][:args.pages]]
+
+    rng = np.random.default_rng(args.seed)
+    samples = [("quotation", image, True) for _, image in positives]
+    for kind in NEGATIVE_KINDS:
+        for i in range(args.negatives):
+            source = positives[(i * 37) % len(positives)][1]
+            samples.append((kind, synthetic_negative(kind, source, rng), False))
+    if args.labels:
+        samples += [("labelled", load_image(p), label) for p, label in load_labels(args.labels)]
+
+    gate = DocumentGate()
+    normalizer = ImageNormalizer(profile=args.profile)
+    confusion = Counter()
+    reasons = Counter()
+    gate_ms, saved_ms = [], []
+
+    for kind, image, is_quotation in samples:
+        start = time.perf_counter()
+        verdict = gate.classify(image)
+        gate_ms.append((time.perf_counter() - start) * 1000)
+
+        rejected = is_rejected(verdict)
+        confusion[(is_quotation, rejected)] += 1
+        reasons[(kind, verdict["reason"])] += 1
+        if rejected:
+            start = time.perf_counter()
+            normalizer.run(image)
+            saved_ms.append((time.perf_counter() - start) * 1000)
+
+    # "Positive" = rejected (the gate's job is finding non-quotations)
+    true_pos = confusion[(False, True)]
+    false_pos = confusion[(True, True)]
+    false_neg = confusion[(False, False)]
+    precision = true_pos / max(1, true_pos + false_pos)
+    recall = true_pos / max(1, true_pos + false_neg)
+
+    print(f"samples: {len(samples)} ({len(positives)} quotation pages)")
+    print(f"rejection precision: {precision:.3f}  recall: {recall:.3f}  "
+          f"quotations rejected: {false_pos}")
+    print(f"{'kind':>10} {'reason':>20} {'pages':>6}")
+    for (kind, reason), count in sorted(reasons.items()):
+        print(f"{kind:>10} {reason:>20} {count:>6}")
+    print(f"gate: {statistics.mean(gate_ms):.1f} ms/page "
+          f"(max {max(gate_ms):.1f})")
+    if saved_ms:
+        print(f"saved per rejected page: {statistics.mean(saved_ms):.1f} ms normalization "
+              f"({args.profile}), plus its OCR and resolver time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Line Grouping Benchmark
+Times the sweep-line grouping against the original all-lines scan for
+100 / 1k / 10k tokens. tests/test_line_grouping.py checks that both give
+the same lines on randomized pages.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_line_grouping [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+from src.layout.geometry import quad_to_rect
+from src.layout.line_grouping import group_tokens_into_lines
+from src.layout.token_table import TokenTable
+
+
+def vertical_overlap(a, b):
+    top = max(a["y_min"], b["y_min"])
+    bottom = min(a["y_max"], b["y_max"])
+    overlap = max(0, bottom - top)
+    return overlap / min(a["height"], b["height"])
+
+
+def reference_group_tokens_into_lines(tokens):
+    # Original O(n * lines) implementation, kept as the semantic reference
+    tokens = sorted(tokens, key=lambda t: t["rect"]["y_center"])
+    lines = []
+
+    for token in tokens:
+        placed = False
+        for line in lines:
+            ref = line[0]["rect"]
+
+            if vertical_overlap(token["rect"], ref) > 0.5:
+                line.append(token)
+                placed = True
+                break
+
+            if abs(token["rect"]["y_center"] - ref["y_center"]) < ref["height"] * 0.6:
+                line.append(token)
+                placed = True
+                break
+
+        if not placed:
+            lines.append([token])
+
+    for line in lines:
+        line.sort(key=lambda t: t["rect"]["x_min"])
+
+    return lines
+
+
+def random_page(num_tokens, rng, page_width=2480):
+    """Rows of words with jitter, skew, mixed font sizes and a few tall outliers."""
+    tokens = []
+    y = 40.0
+    while len(tokens) < num_tokens:
+        row_height = rng.choice([18, 22, 26, 30, 40])
+        x = rng.uniform(20, 120)
+        for _ in range(rng.randint(1, 12)):
+            if len(tokens) >= num_tokens:
+                break
+            h = row_height * rng.uniform(0.7, 1.3)
+            if rng.random() < 0.02:
+                h *= rng.uniform(2, 6)  # logo / stamp-sized box
+            w = rng.uniform(20, 220)
+            top = y + rng.uniform(-0.35, 0.35) * row_height
+            skew = rng.uniform(-3, 3)
+            quad = [
+                [x, top],
+                [x + w, top + skew],
+                [x + w, top + skew + h],
+                [x, top + h]
+            ]
+            tokens.append({
+                "text": f"t{len(tokens)}",
+                "bbox": quad,
+                "rect": quad_to_rect(quad),
+                "confidence": 0.9
+            })
+            x += w + rng.uniform(5, 60)
+            if x > page_width:
+                break
+        y += row_height * rng.uniform(0.6, 2.2)
+    return tokens
+
+
+def time_call(fn, page, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f"{'tokens':>8} {'reference ms':>14} {'sweep ms':>10} {'speedup':>8}")
+    for n in (100, 1_000, 10_000):
+        tokens = random_page(n, rng)
+        ref_s = time_call(reference_group_tokens_into_lines, tokens, args.repeat)
+        new_s = time_call(group_tokens_into_lines, TokenTable.from_tokens(tokens), args.repeat)
+        print(f"{n:>8} {ref_s * 1000:>14.2f} {new_s * 1000:>10.2f} {ref_s / new_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
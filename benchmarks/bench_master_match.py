@@ -0,0 +1,92 @@
+"""
+Master Match Benchmark
+Times MasterIndex.query against a brute-force rapidfuzz scan of every
+master name for 1k / 10k / 100k synthetic dealer names, and reports how
+often both return the same best match and score. Queries are master names
+with up to `--edits` OCR-style character errors. tests/test_fuzzy_match.py
+checks agreement for names with one error.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_master_match [--queries 200] [--edits 2]
+"""
+import argparse
+import random
+import time
+
+from rapidfuzz import fuzz, process
+
+from src.utils.fuzzy_match import MasterIndex
+from src.utils.text_normalize import normalize_text
+
+SYLLABLES = ["ra", "ma", "sh", "ka", "ni", "ve", "lo", "tu", "pa", "gu",
+             "de", "bi", "jo", "sa", "ha", "vi", "na", "ko", "re", "ya"]
+TRADES = ["Motors", "Tractors", "Automobiles", "Agro", "Agencies",
+          "Enterprises", "Farm Equipments", "Traders"]
+SUFFIXES = ["", "Pvt Ltd", "& Co.", "and Sons", "LLP"]
+
+
+def random_name(rng):
+    """A dealer-style name: one or two made-up words, a trade and a suffix."""
+    words = [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        for _ in range(rng.randint(1, 2))
+    ]
+    return " ".join(words + [rng.choice(TRADES), rng.choice(SUFFIXES)]).strip()
+
+
+def ocr_noise(text, edits, rng):
+    """`edits` random character substitutions / deletions."""
+    chars = list(text)
+    for _ in range(edits):
+        if not chars:
+            break
+        i = rng.randrange(len(chars))
+        if rng.random() < 0.5:
+            chars[i] = rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0158")
+        else:
+            del chars[i]
+    return "".join(chars)
+
+
+def brute_force_best(text, names, scorer=fuzz.WRatio):
+    """(row, score) of the best of all normalized master names."""
+    _, score, row = process.extractOne(normalize_text(text), names, scorer=scorer)
+    return row, round(float(score), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f"{'rows':>8} {'build s':>8} {'brute ms':>9} {'index ms':>9} {'speedup':>8} {'agree':>7}")
+    for n in (1_000, 10_000, 100_000):
+        labels = [random_name(rng) for _ in range(n)]
+        start = time.perf_counter()
+        index = MasterIndex.build(labels)
+        build_s = time.perf_counter() - start
+
+        names = [index.name(row) for row in range(len(index))]
+        queries = [ocr_noise(rng.choice(labels), rng.randint(0, args.edits), rng)
+                   for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        expected = [brute_force_best(q, names) for q in queries]
+        brute_s = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        results = [index.query(q, k=1) for q in queries]
+        index_s = (time.perf_counter() - start) / len(queries)
+
+        agree = sum(
+            bool(top) and top[0]["score"] == score
+            for top, (_, score) in zip(results, expected)
+        ) / len(queries)
+        print(f"{n:>8} {build_s:>8.2f} {brute_s * 1000:>9.2f} {index_s * 1000:>9.3f} "
+              f"{brute_s / index_s:>7.1f}x {agree:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Memory Benchmark
+Peak resident memory and time per page of load + normalize, default vs
+lean-memory mode, and a check that lean mode produces the same pixels.
+
+Each mode runs in a fresh process; its peak RSS (VmHWM) is reset after
+imports, so the figure reported is the peak growth over the resident set
+the page loop started from (Linux only). The equivalence check feeds both
+normalizers the same gray page (lean output must equal the default
+output's gray channel exactly) and also reports how far decoding straight
+to gray differs from BGR-then-gray.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_memory [--pages 20] [--profile fast]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+import cv2
+import numpy as np
+
+from src.batch import collect_inputs
+from src.preprocessing.image_loader import decode_image, load_image, read_image_bytes
+from src.preprocessing.image_normalizer import ImageNormalizer
+from src.preprocessing.memory import rss_mb
+
+
+def reset_peak_rss():
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+
+def peak_rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+
+def measure(paths, profile, lean):
+    # Runs in a child process
+    from src.preprocessing.preprocess import Preprocessor
+
+    preprocessor = Preprocessor(normalize_profile=profile, lean_memory=lean, document_gate=False)
+    base_mb = rss_mb()
+    reset_peak_rss()
+    start = time.perf_counter()
+    for path in paths:
+        page = preprocessor.normalize(preprocessor.load(path))
+        page_size = page["page_size"]
+        # What recognize() keeps after OCR: lean mode drops the image
+        preprocessor._release_image(page)
+        del page
+    elapsed = time.perf_counter() - start
+    return {
+        "peak_growth_mb": round(peak_rss_mb() - base_mb, 1),
+        "ms_per_page": round(elapsed * 1000 / len(paths), 1),
+        "last_page_size": page_size
+    }
+
+
+def check_equivalence(paths, profile):
+    default = ImageNormalizer(profile=profile)
+    lean = ImageNormalizer(profile=profile, lean=True)
+    identical = 0
+    decode_diff_pixels = decode_max_diff = 0
+    total_pixels = 0
+
+    for path in paths:
+        image = load_image(path)
+        expected = cv2.cvtColor(default.run(image), cv2.COLOR_BGR2GRAY)
+        got = lean.run(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+        identical += bool(np.array_equal(expected, got))
+
+        direct = decode_image(read_image_bytes(path), path, grayscale=True)
+        diff = np.abs(direct.astype(np.int16) - cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+        decode_diff_pixels += int(np.count_nonzero(diff))
+        decode_max_diff = max(decode_max_diff, int(diff.max()))
+        total_pixels += diff.size
+
+    print(f"equivalence: {identical}/{len(paths)} pages identical after normalization")
+    print(f"gray decode vs BGR->gray: {decode_diff_pixels / total_pixels:.2%} of pixels differ, "
+          f"by at most {decode_max_diff} grey level(s)")
+    if identical != len(paths):
+        raise AssertionError("lean normalization differs from the default path")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default=os.path.join("data", "train"),
+                        help="image directory or manifest (default: data/train)")
+    parser.add_argument("--pages", type=int, default=20,
+                        help="pages to sample, evenly spaced (default: 20)")
+    parser.add_argument("--profile", default="fast",
+                        help="normalizer profile (default: fast)")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.input)
+    step = max(1, len(paths) // args.pages)
+    paths = paths[::step][:args.pages]
+
+    check_equivalence(paths, args.profile)
+
+    context = mp.get_context("spawn")
+    print(f"{'mode':>8} {'peak growth MB':>15} {'ms/page':>9}")
+    for lean in (False, True):
+        with context.Pool(1) as pool:
+            result = pool.apply(measure, (paths, args.profile, lean))
+        print(f"{'lean' if lean else 'default':>8} {result['peak_growth_mb']:>15} "
+              f"{result['ms_per_page']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Normalizer Profile Benchmark
+Time per page for each ImageNormalizer profile and the change in OCR
+confidence it causes downstream (relative to the "quality" profile).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_normalizer [--pages 40] [--no-ocr]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from src.batch import collect_inputs
+from src.preprocessing.image_loader import load_image
+from src.preprocessing.image_normalizer import PROFILES, ImageNormalizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default=os.path.join("data", "train"),
+                        help="image directory or manifest (default: data/train)")
+    parser.add_argument("--pages", type=int, default=40,
+                        help="pages to sample, evenly spaced (default: 40)")
+    parser.add_argument("--no-ocr", action="store_true",
+                        help="only time normalization (no PaddleOCR needed)")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.input)
+    step = max(1, len(paths) // args.pages)
+    paths = paths[::step][:args.pages]
+    images = [load_image(p) for p in paths]
+
+    ocr = None
+    if not args.no_ocr:
+        from src.preprocessing.ocr_engine import OCREngine
+        ocr = OCREngine()
+
+    rows = {}
+    for profile in PROFILES:
+        normalizer = ImageNormalizer(profile=profile)
+        times, confs, tokens, skipped = [], [], [], 0
+
+        for image in images:
+            start = time.perf_counter()
+            normalized = normalizer.run(image)
+            times.append(time.perf_counter() - start)
+
+            if profile == "auto":
+                noise = normalizer.estimate_noise(normalizer.enhance(image))
+                skipped += noise < normalizer.noise_threshold
+
+            if ocr is not None:
+                result = ocr.run(normalized)
+                tokens.append(len(result))
+                confs.append(
+                    statistics.fmean(t["confidence"] for t in result) if result else 0.0
+                )
+
+        rows[profile] = {
+            "ms_per_page": statistics.fmean(times) * 1000,
+            "p95_ms": sorted(times)[int(0.95 * (len(times) - 1))] * 1000,
+            "mean_conf": statistics.fmean(confs) if confs else None,
+            "tokens": statistics.fmean(tokens) if tokens else None,
+            "skipped": skipped if profile == "auto" else None
+        }
+
+    base = rows["quality"]
+    print(f"{len(images)} pages from {args.input}")
+    print(f"{'profile':<8} {'ms/page':>9} {'p95 ms':>9} {'speedup':>8} "
+          f"{'mean conf':>10} {'d conf':>8} {'tokens':>7}")
+    for profile, r in rows.items():
+        conf = d_conf = tok = "-"
+        if r["mean_conf"] is not None:
+            conf = f"{r['mean_conf']:.4f}"
+            d_conf = f"{r['mean_conf'] - base['mean_conf']:+.4f}"
+            tok = f"{r['tokens']:.0f}"
+        print(f"{profile:<8} {r['ms_per_page']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{base['ms_per_page'] / r['ms_per_page']:>7.1f}x {conf:>10} {d_conf:>8} {tok:>7}")
+    if rows["auto"]["skipped"] is not None:
+        print(f"auto skipped denoising on {rows['auto']['skipped']}/{len(images)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Orientation Benchmark
+Accuracy and cost of OrientationCorrector on pages from data/train.
+
+The training pages are (nearly all) upright, so each sampled page is also
+turned 90/180/270 degrees and given a random skew in +-max_skew; the
+detector must recover the rotation and, when it does, the skew. Skew error
+is measured against the skew detected on the original page, which is not
+always exactly level.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_orientation [--pages 60] [--max-skew 4]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from collections import Counter
+
+import cv2
+
+from src.batch import collect_inputs
+from src.preprocessing.image_loader import load_image
+from src.preprocessing.orientation import OrientationCorrector, _ROTATE_CODES, _rotate_small
+
+ROTATIONS = (0, 90, 180, 270)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default=os.path.join("data", "train"),
+                        help="image directory or manifest (default: data/train)")
+    parser.add_argument("--pages", type=int, default=60,
+                        help="pages to sample, evenly spaced (default: 60)")
+    parser.add_argument("--max-skew", type=float, default=4.0,
+                        help="largest synthetic skew in degrees (default: 4)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.input)
+    step = max(1, len(paths) // args.pages)
+    paths = paths[::step][:args.pages]
+
+    corrector = OrientationCorrector()
+    rng = random.Random(args.seed)
+    confusion = Counter()
+    times, skew_errors, originals = [], [], Counter()
+
+    for path in paths:
+        image = load_image(path)
+        reference = corrector.detect(image)
+        originals[reference["rotation"]] += 1
+
+        for rotation in ROTATIONS:
+            skew = rng.uniform(-args.max_skew, args.max_skew)
+            page = cv2.rotate(image, _ROTATE_CODES[rotation]) if rotation else image
+            page = _rotate_small(page, -skew, border=cv2.BORDER_REPLICATE, expand=True)
+
+            start = time.perf_counter()
+            found = corrector.detect(page)
+            times.append(time.perf_counter() - start)
+
+            expected = (360 - rotation) % 360
+            confusion[expected, found["rotation"]] += 1
+            if found["rotation"] == expected:
+                skew_errors.append(abs(found["skew"] - (skew + reference["skew"])))
+
+    total = sum(confusion.values())
+    correct = sum(n for (want, got), n in confusion.items() if want == got)
+
+    print(f"{len(paths)} pages x {len(ROTATIONS)} rotations from {args.input}")
+    print(f"original pages detected as: "
+          + ", ".join(f"{r}: {originals[r]}" for r in ROTATIONS))
+    print(f"rotation accuracy: {correct / total:.1%} ({correct}/{total})")
+    print(f"{'expected':>9} " + " ".join(f"{r:>5}" for r in ROTATIONS))
+    for want in ROTATIONS:
+        print(f"{want:>9} " + " ".join(f"{confusion[want, got]:>5}" for got in ROTATIONS))
+    print(f"skew abs error: mean {statistics.fmean(skew_errors):.2f} deg, "
+          f"p90 {percentile(skew_errors, 0.9):.2f} deg")
+    print(f"detect: mean {statistics.fmean(times) * 1000:.1f} ms, "
+          f"p95 {percentile(times, 0.95) * 1000:.1f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
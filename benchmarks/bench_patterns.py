@@ -0,0 +1,209 @@
+"""
+Patterns Benchmark
+Lines per second through each regex-based extractor, original per-call
+patterns vs the compiled registry (src/utils/patterns.py).
+tests/test_patterns.py checks that both give the same output on every line.
+
+Lines are the OCR lines of the bench_pipeline fixtures (--fixtures), plus
+randomized quotation-like lines (model rows, HP / PTO specs, prices,
+addresses) so long tables are covered too.
+
+Usage:
+    python -m benchmarks.bench_patterns [--lines 50000] [--repeat 3]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import time
+
+from src.extraction.hp import HPResolver
+from src.extraction.model_name import ModelNameResolver
+from src.layout.line_grouping import group_tokens_into_lines
+from src.layout.token_table import TokenTable
+from src.utils.text_normalize import normalize_text
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ocr")
+
+
+# ------------------------------------------------------------
+# Original implementations, kept as the semantic reference
+# ------------------------------------------------------------
+
+def reference_table_row(text):
+    text = text.upper()
+
+    patterns = [
+        r'\b(?:SWARAJ|MAHINDRA|MF|JD)\s*\d{3,4}\s*[A-Z]{1,3}\b',
+        r'\b\d{3,4}\s*[A-Z]{1,3}\b'
+    ]
+
+    for p in patterns:
+        m = re.search(p, text)
+        if m:
+            return m.group(0)
+
+    return None
+
+
+def reference_model_core(text):
+    if not text:
+        return None
+
+    text = text.upper()
+
+    # Kill obvious non-model words
+    blacklist = [
+        "ADDRESS", "IFSC", "BANK", "DATE", "FOR",
+        "TOTAL", "AMOUNT", "HDFC", "GST"
+    ]
+    if any(b in text for b in blacklist):
+        return None
+
+    text = re.sub(
+        r'\b(HP|WD|CYLINDER|CATG|TRACTOR|PTO|TYRE|SIZE|X)\b',
+        '',
+        text
+    )
+
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    if not re.search(r'\d', text):
+        return None
+
+    text = re.sub(r'^(SWARAJ|MAHINDRA|MF|JD)\s+', '', text)
+
+    patterns = [
+        r'\b(?:MF|SWARAJ|MAHINDRA|JD)?\s*\d{3,4}\s*[A-Z]{1,3}\b'
+    ]
+
+    for p in patterns:
+        m = re.search(p, text)
+        if m:
+            return m.group(0).strip()
+
+    return None
+
+
+def reference_hp_numbers(text):
+    values = []
+
+    for m in re.finditer(r"\b\d{2,3}(\.\d+)?\b", text):
+        val = float(m.group())
+        if 20 <= val <= 100:
+            values.append((int(round(val)), m.start()))
+
+    if "/" in text and len(values) >= 2:
+        return [values[0]]
+
+    return values
+
+
+def reference_normalize_text(text):
+    if not text:
+        return ""
+
+    text = text.upper()
+    text = re.sub(r'[^A-Z0-9 ]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    text = text.replace('0', 'O')
+    text = text.replace('1', 'I')
+
+    return text
+
+
+# ------------------------------------------------------------
+# Lines
+# ------------------------------------------------------------
+
+BRANDS = ["Swaraj", "SWARAJ", "Mahindra", "MF", "JD", "Sonalika", "Eicher", "John Deere"]
+MODELS = ["744 FE", "855FE", "575 DI", "1035 DI", "5050 D", "241 R", "DI 750 III", "963 FE 4WD"]
+SPECS = ["48 HP", "47.5 HP", "42 HP / 38 PTO", "PTO HP 41", "3 Cylinder", "2WD", "4 WD",
+         "Tyre Size 13.6 X 28", "CATG II", "Engine 3307 cc", "HP-52", "Tractor"]
+OTHER = ["Rs. 7,45,000/-", "Total Amount", "GSTIN 27AAACM1234F1Z5", "Qty 1", "Date: 12/03/2024",
+         "Mob: 98765 43210", "Near Bus Stand, Nashik - 422001", "Ex-showroom price",
+         "Shubham Motors & Tractors Pvt. Ltd.", "Insurance", "Registration (RTO)", "₹ 6.85 lakh"]
+
+
+def random_line(rng):
+    parts = []
+    for _ in range(rng.randint(1, 5)):
+        kind = rng.random()
+        if kind < 0.2:
+            parts.append(rng.choice(BRANDS))
+        elif kind < 0.4:
+            parts.append(rng.choice(MODELS))
+        elif kind < 0.65:
+            parts.append(rng.choice(SPECS))
+        else:
+            parts.append(rng.choice(OTHER))
+    return rng.choice([" ", "  ", " | ", "\t"]).join(parts)
+
+
+def fixture_lines(fixture_dir):
+    lines = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            tokens = json.load(f)["tokens"]
+        table = TokenTable.from_tokens(tokens)
+        lines.extend(table.line_text(line) for line in group_tokens_into_lines(table))
+    return lines
+
+
+# ------------------------------------------------------------
+# Main
+# ------------------------------------------------------------
+
+def extractors():
+    """(name, reference, registry version, takes lowercased lines) per extractor."""
+    model = ModelNameResolver()
+    hp = HPResolver()
+    return [
+        ("model table row", reference_table_row, model._extract_model_from_table_row, False),
+        ("model core", reference_model_core, model._extract_model_core, False),
+        ("hp numbers", reference_hp_numbers, hp._extract_hp_numbers, True),
+        ("normalize_text", reference_normalize_text, normalize_text, False),
+    ]
+
+
+def lines_per_sec(fn, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURE_DIR,
+                        help=f"OCR fixture directory (default: {FIXTURE_DIR})")
+    parser.add_argument("--lines", type=int, default=50000,
+                        help="randomized lines added to the fixture lines (default: 50000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed passes per extractor, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    recorded = fixture_lines(args.fixtures)
+    lines = recorded + [random_line(rng) for _ in range(args.lines)]
+    lower = [line.lower() for line in lines]
+    print(f"{len(recorded)} fixture lines + {args.lines} randomized lines")
+
+    print(f"{'extractor':>16} {'before lines/s':>15} {'after lines/s':>14} {'speedup':>8}")
+    for name, before, after, lowercase in extractors():
+        inputs = lower if lowercase else lines
+        before_rate = lines_per_sec(before, inputs, args.repeat)
+        after_rate = lines_per_sec(after, inputs, args.repeat)
+        print(f"{name:>16} {before_rate:>15,.0f} {after_rate:>14,.0f} "
+              f"{after_rate / before_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
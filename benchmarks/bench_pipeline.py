@@ -0,0 +1,356 @@
+"""
+Pipeline Benchmark
+Per-stage latency, throughput and peak memory of single-page extraction on
+data/train, with OCR replayed from recorded fixtures so the run needs no
+OCR model and is repeatable.
+
+    record  run load + normalize + OCR once (needs PaddleOCR) and write one
+            fixture per page: page size, OCR time and tokens
+    run     load and normalize each page, replay its OCR tokens, then time
+            quad_to_rect (TokenTable), line grouping, block grouping, page
+            features, each resolver and master matching
+
+benchmarks/fixtures/ocr ships a few pages of data/train whose tokens were
+transcribed by hand from the page images, in PaddleOCR's token format
+("source": "transcribed", no recorded OCR time), so `run` works on a fresh
+checkout. `record` adds (or replaces) fixtures with real OCR output.
+
+`run` writes a JSON report (p50/p95/p99 per stage, pages/sec, peak RSS and
+the fields extracted from every page). Pass an earlier report as
+--baseline to flag stages whose p50 got slower than --threshold and pages
+whose extracted fields changed; the exit status is 1 when either happens.
+
+Usage:
+    python -m benchmarks.bench_pipeline record [--pages 468]
+    python -m benchmarks.bench_pipeline run [--pages 50] [--output report.json]
+        [--baseline previous.json] [--threshold 0.2] [--min-delta-ms 0.5]
+        [--no-preprocess]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from src.batch import collect_inputs
+from src.layout.block_grouping import group_lines_into_blocks
+from src.layout.line_grouping import group_tokens_into_lines
+from src.layout.token_table import TokenTable
+from src.extraction.page_features import PageFeatures
+from src.pipeline import Pipeline
+from src.reasoning.document_gate import is_rejected
+from src.utils.constants import BASE_DIR
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ocr")
+TRAIN_DIR = os.path.join(BASE_DIR, "data", "train")
+
+# Stages in pipeline order (report order)
+STAGES = (
+    "load", "normalize", "ocr_replay", "quad_to_rect", "line_grouping",
+    "block_grouping", "page_features", "dealer_resolver", "model_resolver",
+    "hp_resolver", "master_match", "cost_resolver", "extract_total",
+)
+
+FIELDS = (
+    ("dealer_name_result", "dealer_name"),
+    ("model_name_result", "model_name"),
+    ("hp_result", "hp"),
+    ("cost_result", "cost"),
+)
+
+
+def sample(paths, pages):
+    step = max(1, len(paths) // pages)
+    return paths[::step][:pages]
+
+
+def fixture_path(fixture_dir, image_path):
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(fixture_dir, stem + ".json")
+
+
+def repo_relative(path):
+    """Image path as stored in fixtures: relative to the repo root when inside it."""
+    path = os.path.abspath(path)
+    relative = os.path.relpath(path, BASE_DIR)
+    return path if relative.startswith(os.pardir) else relative
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(values_ms):
+    values = np.asarray(values_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class StageTimer:
+    """Collects wall-clock milliseconds per stage name."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def __call__(self, stage, fn, *args):
+        start = time.perf_counter()
+        value = fn(*args)
+        self.samples[stage].append((time.perf_counter() - start) * 1000)
+        return value
+
+
+# ------------------------------------------------------------
+# record
+# ------------------------------------------------------------
+
+def record(args):
+    pipeline = Pipeline(master_matching=False, normalize_profile=args.normalize_profile)
+    preprocessor = pipeline.preprocessor
+    preprocessor.warmup()
+    os.makedirs(args.fixtures, exist_ok=True)
+
+    paths = sample(collect_inputs(args.input), args.pages)
+    for i, path in enumerate(paths, 1):
+        page = preprocessor.normalize(preprocessor.load(path))
+        start = time.perf_counter()
+        page = preprocessor.recognize(page)
+        ocr_ms = (time.perf_counter() - start) * 1000
+
+        fixture = {
+            "image": repo_relative(path),
+            "page_size": list(page["page_size"]),
+            "ocr_ms": round(ocr_ms, 2),
+            "gate": page["gate"],
+            "settings": preprocessor.cache_settings(),
+            "tokens": page["ocr"]
+        }
+        with open(fixture_path(args.fixtures, path), "w", encoding="utf-8") as f:
+            json.dump(fixture, f)
+        print(f"[{i}/{len(paths)}] {path}: {len(page['ocr'])} tokens, {ocr_ms:.0f} ms")
+
+
+# ------------------------------------------------------------
+# run
+# ------------------------------------------------------------
+
+def load_fixture(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def extract(pipeline, timer, tokens, page_size):
+    """Pipeline._extract_fields, one timed stage at a time."""
+    table = timer("quad_to_rect", TokenTable.from_tokens, tokens)
+    lines = timer("line_grouping", group_tokens_into_lines, table)
+    blocks = timer("block_grouping", group_lines_into_blocks, table, lines)
+
+    image_height, image_width = page_size
+    page = timer("page_features", PageFeatures, table, blocks, image_width, image_height)
+
+    dealer = timer("dealer_resolver", pipeline.dealer_resolver.resolve, page)
+    model = timer("model_resolver", pipeline.model_resolver.resolve, page)
+    hp = timer("hp_resolver", pipeline.hp_resolver.resolve, page)
+
+    def master_match():
+        if pipeline.dealer_index is not None and dealer["dealer_name"]:
+            dealer["master_matches"] = pipeline.dealer_index.query(dealer["dealer_name"], k=3)
+        if pipeline.asset_index is not None and model["model_name"]:
+            model["master_matches"] = pipeline.asset_index.query(model["original_text"], k=3)
+
+    timer("master_match", master_match)
+
+    def cost_resolver():
+        candidates = pipeline.cost_extractor.extract(page)
+        return pipeline.cost_reasoner.resolve(candidates, model)
+
+    cost = timer("cost_resolver", cost_resolver)
+    return {
+        "dealer_name_result": dealer,
+        "model_name_result": model,
+        "hp_result": hp,
+        "cost_result": cost,
+        "num_ocr_tokens": len(table),
+        "num_lines": len(lines),
+        "num_blocks": len(blocks)
+    }
+
+
+def run(args):
+    fixtures = sorted(
+        os.path.join(args.fixtures, name)
+        for name in os.listdir(args.fixtures) if name.endswith(".json")
+    ) if os.path.isdir(args.fixtures) else []
+    if not fixtures:
+        sys.exit(f"no OCR fixtures in {args.fixtures}; create them with "
+                 f"`python -m benchmarks.bench_pipeline record`")
+    fixtures = sample(fixtures, args.pages)
+
+    pipeline = Pipeline(master_matching=not args.no_master,
+                        normalize_profile=args.normalize_profile)
+    preprocessor = pipeline.preprocessor
+    timer = StageTimer()
+    outputs = {}
+    recorded_ocr_ms = []
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    for path in fixtures:
+        fixture = timer("ocr_replay", load_fixture, path)
+        if fixture.get("ocr_ms") is not None:
+            recorded_ocr_ms.append(fixture["ocr_ms"])
+
+        if not args.no_preprocess:
+            # Fixture images are relative to the repo root
+            image_path = os.path.join(BASE_DIR, fixture["image"])
+            page = timer("load", preprocessor.load, image_path)
+            timer("normalize", preprocessor.normalize, page)
+
+        if is_rejected(fixture.get("gate")):
+            outputs[fixture["image"]] = {"status": "rejected"}
+            continue
+
+        result = timer("extract_total", extract, pipeline, timer,
+                       fixture["tokens"], fixture["page_size"])
+        outputs[fixture["image"]] = {
+            value_key: result[result_key][value_key] for result_key, value_key in FIELDS
+        }
+    wall_s = time.perf_counter() - start
+
+    # extract_total includes the per-stage timer overhead; it is the figure
+    # to compare, the stages say where the time goes
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {
+            "pages": len(fixtures),
+            "normalize_profile": args.normalize_profile,
+            "preprocess": not args.no_preprocess,
+            "master_matching": not args.no_master
+        },
+        "pages_per_sec": round(len(fixtures) / wall_s, 3),
+        "extract_pages_per_sec": round(
+            len(timer.samples["extract_total"]) / (sum(timer.samples["extract_total"]) / 1000), 3
+        ) if timer.samples["extract_total"] else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_before_run_mb": rss_before,
+        "stages_ms": {
+            stage: summarize(timer.samples[stage]) for stage in STAGES if timer.samples[stage]
+        },
+        "recorded_ocr_ms": summarize(recorded_ocr_ms) if recorded_ocr_ms else None,
+        "outputs": outputs
+    }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold, args.min_delta_ms):
+            sys.exit(1)
+
+
+def print_report(report):
+    print(f"{'stage':>16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for stage, stats in report["stages_ms"].items():
+        print(f"{stage:>16} {stats['p50']:>9.3f} {stats['p95']:>9.3f} "
+              f"{stats['p99']:>9.3f} {stats['mean']:>9.3f}")
+    ocr = report["recorded_ocr_ms"]
+    if ocr:
+        print(f"{'ocr (recorded)':>16} {ocr['p50']:>9.1f} {ocr['p95']:>9.1f} "
+              f"{ocr['p99']:>9.1f} {ocr['mean']:>9.1f}")
+    print(f"pages/sec: {report['pages_per_sec']} (extraction only: "
+          f"{report['extract_pages_per_sec']}), peak RSS: {report['peak_rss_mb']} MB")
+
+
+def compare(baseline, report, threshold, min_delta_ms):
+    """Print stage slowdowns and changed outputs; True if any were found."""
+    failed = False
+    for stage, stats in report["stages_ms"].items():
+        before = baseline.get("stages_ms", {}).get(stage)
+        if not before or before["p50"] <= 0:
+            continue
+        change = stats["p50"] / before["p50"] - 1
+        # Sub-millisecond stages jitter by more than `threshold` run to run
+        if change > threshold and stats["p50"] - before["p50"] > min_delta_ms:
+            failed = True
+            print(f"REGRESSION {stage}: p50 {before['p50']:.3f} -> {stats['p50']:.3f} ms "
+                  f"({change:+.0%})")
+
+    changed = [
+        image for image, fields in report["outputs"].items()
+        if image in baseline.get("outputs", {}) and baseline["outputs"][image] != fields
+    ]
+    for image in changed:
+        failed = True
+        print(f"CHANGED {image}: {baseline['outputs'][image]} -> {report['outputs'][image]}")
+
+    if not failed:
+        print(f"no regressions against baseline {baseline.get('commit')}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("mode", choices=["record", "run"])
+    parser.add_argument("--input", default=TRAIN_DIR,
+                        help="record: image directory or manifest (default: data/train)")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR,
+                        help=f"OCR fixture directory (default: {FIXTURE_DIR})")
+    parser.add_argument("--pages", type=int, default=None,
+                        help="pages to sample, evenly spaced (default: all for record, "
+                             "50 for run)")
+    parser.add_argument("--normalize-profile", default="quality")
+    parser.add_argument("--no-preprocess", action="store_true",
+                        help="run: skip the load/normalize stages (extraction only)")
+    parser.add_argument("--no-master", action="store_true",
+                        help="run: skip master data matching")
+    parser.add_argument("--output", default=None, help="run: JSON report path")
+    parser.add_argument("--baseline", default=None,
+                        help="run: earlier JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="run: allowed p50 slowdown per stage (default: 0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="run: ignore p50 slowdowns smaller than this (default: 0.5 ms)")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        args.pages = args.pages or sys.maxsize
+        record(args)
+    else:
+        args.pages = args.pages or 50
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
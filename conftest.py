@@ -0,0 +1 @@
+# Repo root on sys.path so tests import `src` and `benchmarks` as run_pipeline.py does
@@ -1,51 +1,79 @@
-from src.layout.geometry import quad_to_rect
+from src.layout.token_table import TokenTable
 from src.layout.line_grouping import group_tokens_into_lines
 from src.layout.block_grouping import group_lines_into_blocks
 from src.preprocessing.preprocess import Preprocessor
-import sys
+from src.utils.telemetry import new_trace
+import argparse
+import json
+import logging
+
+log = logging.getLogger(__name__)
+
 
 class Pipeline:
 
-    def __init__(self, preprocessor=None):
+    def __init__(self, preprocessor=None, telemetry=False):
         self.preprocessor = preprocessor or Preprocessor()
+        self.telemetry = telemetry
 
     def run(self, image_path):
-        preprocess_result = self.preprocessor.run(image_path)
+        trace = new_trace(self.telemetry)
+        preprocess_result = self.preprocessor.run(image_path, trace)
         tokens = preprocess_result["ocr"]
 
-        # 1. Normalize bounding boxes
-        for t in tokens:
-            t["rect"] = quad_to_rect(t["bbox"])
+        # 1. Columnar token store (rects / centers computed once)
+        with trace.span("quad_to_rect"):
+            table = TokenTable.from_tokens(tokens)
 
         # 2. Group into lines
-        lines = group_tokens_into_lines(tokens)
+        with trace.span("line_grouping"):
+            lines = group_tokens_into_lines(table)
 
         # 3. Group lines into blocks
-        blocks = group_lines_into_blocks(lines)
+        with trace.span("block_grouping"):
+            blocks = group_lines_into_blocks(table, lines)
+
+        # 4. Lines and blocks for inspection (debug level only; the text is
+        #    not even joined otherwise)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("================ LINES ================")
+            for i, line in enumerate(lines):
+                log.debug("Line %d: %s", i, table.line_text(line))
 
-        # 4. PRINT FOR INSPECTION
-        print("\n================ LINES ================\n")
-        for i, line in enumerate(lines):
-            line_text = " ".join(tok["text"] for tok in line)
-            print(f"Line {i}: {line_text}")
+            log.debug("================ BLOCKS ================")
+            for b, block in enumerate(blocks):
+                log.debug("Block %d:", b)
+                for line in block:
+                    log.debug("  %s", table.line_text(line))
 
-        print("\n================ BLOCKS ================\n")
-        for b, block in enumerate(blocks):
-            print(f"\nBlock {b}:")
-            for line in block:
-                print("  " + " ".join(tok["text"] for tok in line))
+        trace.count("tokens", len(tokens))
+        trace.count("lines", len(lines))
+        trace.count("blocks", len(blocks))
 
-        return {
+        output = {
             "num_tokens": len(tokens),
             "num_lines": len(lines),
             "num_blocks": len(blocks)
         }
+        if trace.enabled:
+            output["trace"] = trace.to_dict()
+        return output
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 main.py <image_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="OCR + layout inspection of one page")
+    parser.add_argument("image_path")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="print every line and block")
+    parser.add_argument("--trace", action="store_true",
+                        help="include per-stage timings in the output")
+    args = parser.parse_args()
 
-    image_path = sys.argv[1]
-    pipeline = Pipeline()
-    pipeline.run(image_path)
+    # -v turns on debug output for this project only; third-party loggers
+    # (paddle, PIL, urllib3) stay at INFO
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(message)s")
+    if args.verbose:
+        for name in ("src", __name__):
+            logging.getLogger(name).setLevel(logging.DEBUG)
+    pipeline = Pipeline(telemetry=args.trace)
+    print(json.dumps(pipeline.run(args.image_path), indent=2))
@@ -1,65 +1,246 @@
-import sys
+import argparse
 import json
-from src.preprocessing.preprocess import Preprocessor
-from src.extraction.dealer_name import DealerNameResolver
-from src.extraction.model_name import ModelNameResolver
-from src.layout.line_grouping import group_tokens_into_lines
-from src.layout.block_grouping import group_lines_into_blocks
-from src.layout.geometry import quad_to_rect
-from src.extraction.hp import HPResolver
+import logging
+import os
+from src.utils.constants import NORMALIZE_PROFILES
 
-def main(image_path):
-    preprocessor = Preprocessor()
-    dealer_resolver = DealerNameResolver()
-    model_resolver = ModelNameResolver()
-    hp_resolver = HPResolver()
+# The pipeline (OpenCV, NumPy, the master indexes) is imported inside the
+# entry points so that --help and argument errors return immediately.
 
+def main(image_path, pipeline_options=None, exporter=None):
+    from src.pipeline import Pipeline
 
+    pipeline = Pipeline(**(pipeline_options or {}))
+    output = pipeline.run(image_path)
+    trace = output.pop("trace", None)
+    if exporter is not None:
+        exporter.add(output, trace)
 
-    # Step 1: Preprocess
-    result = preprocessor.run(image_path)
+    # Final debug-friendly output
+    print(json.dumps(output, indent=2))
+
+def main_batch(source, output_path, workers, chunksize, pipeline_options=None,
+               stage_options=None, exporter=None):
+    from src.batch import collect_inputs, run_batch, run_streaming
+
+    inputs = collect_inputs(source)
+    if not inputs:
+        print(f"No images found in {source}")
+        return
 
-    ocr_tokens = result["ocr"]
+    if stage_options is not None:
+        stats = run_streaming(inputs, output_path, stage_options=stage_options,
+                              pipeline_options=pipeline_options, exporter=exporter)
+    else:
+        stats = run_batch(inputs, output_path, workers=workers, chunksize=chunksize,
+                          pipeline_options=pipeline_options, exporter=exporter)
+    print(json.dumps(stats, indent=2))
 
-    # Step 2: Layout processing (normalize bboxes and create blocks)
-    for t in ocr_tokens:
-        t["rect"] = quad_to_rect(t["bbox"])
+def main_documents(source, output_path, pipeline_options=None, stage_options=None,
+                   dpi=200, early_stop_confidence=0.8):
+    from src.batch import DOCUMENT_EXTENSIONS, collect_inputs, run_documents
 
-    lines = group_tokens_into_lines(ocr_tokens)
-    blocks = group_lines_into_blocks(lines)
+    if os.path.splitext(source)[1].lower() in DOCUMENT_EXTENSIONS:
+        inputs = [source]
+    else:
+        inputs = collect_inputs(source, DOCUMENT_EXTENSIONS)
+    if not inputs:
+        print(f"No documents found in {source}")
+        return
 
-    # Step 3: Dealer name extraction
-    # Get page height from the image
-    image_height = result["image"].shape[0] if result["image"] is not None else 1000
-    dealer_result = dealer_resolver.resolve(blocks, image_height)
+    stats = run_documents(inputs, output_path, dpi=dpi,
+                          early_stop_confidence=early_stop_confidence,
+                          stage_options=stage_options, pipeline_options=pipeline_options)
+    print(json.dumps(stats, indent=2))
 
-    # Step 4: Model name extraction
-    model_result = model_resolver.resolve(blocks, image_height)
+def main_serve(address, pipeline_options=None, stage_options=None, exporter=None,
+               batch_wait_ms=20, max_upload_mb=32, root=None):
+    from src.service import ExtractionService, serve
 
-    # Step 5: HP extraction
-    hp_result = hp_resolver.resolve(
-        blocks=blocks,
-        page_width=result["image"].shape[1] if result["image"] is not None else 800,
-        page_height=image_height
+    # Startup and request errors from the service; third-party loggers
+    # stay at WARNING
+    logging.basicConfig(level=logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("src").setLevel(logging.INFO)
+
+    stage_options = stage_options or {}
+    service = ExtractionService(
+        ocr_workers=stage_options.get("ocr_workers", 1),
+        normalize_workers=stage_options.get("normalize_workers"),
+        extract_workers=stage_options.get("extract_workers", 2),
+        batch_wait_ms=batch_wait_ms,
+        exporter=exporter,
+        **(pipeline_options or {})
     )
+    serve(address, service, max_upload_mb, root)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="IDFC quotation field extraction")
+    parser.add_argument("image_path", nargs="?", help="single image to process")
+    parser.add_argument("--batch", metavar="DIR_OR_MANIFEST",
+                        help="directory of images or manifest file (one path per line)")
+    parser.add_argument("--output", default="predictions.jsonl",
+                        help="JSONL output file for --batch (default: predictions.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for --batch (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=1,
+                        help="pages handed to a worker at a time (default: 1)")
+    parser.add_argument("--ocr-cache", metavar="DIR",
+                        help="reuse OCR results from this on-disk cache directory")
+    parser.add_argument("--ocr-cache-max-mb", type=float, default=1024,
+                        help="OCR cache size cap before LRU eviction (default: 1024)")
+    parser.add_argument("--normalize-profile", choices=NORMALIZE_PROFILES, default="quality",
+                        help="quality: NL-means denoise (default); fast: median filter; "
+                             "auto: denoise only pages whose estimated noise needs it")
+    parser.add_argument("--orientation", action="store_true",
+                        help="rotate/deskew pages before OCR instead of letting PaddleOCR "
+                             "classify each text line's orientation (faster, but misses "
+                             "some upside-down pages)")
+    parser.add_argument("--gate", action="store_true",
+                        help="skip OCR on pages the document gate classifies as not a "
+                             "quotation (blank, photo, ...); off by default until it is "
+                             "validated on real scans")
+    parser.add_argument("--roi-ocr", action="store_true",
+                        help="detect text on the whole page but recognize only the header "
+                             "and table-like regions; the rest is recognized only when a "
+                             "field is missing")
+    parser.add_argument("--lean-memory", action="store_true",
+                        help="decode pages to grayscale, normalize in place with reused "
+                             "buffers and drop each image once OCR is done")
+    parser.add_argument("--worker-memory-mb", type=float, default=None,
+                        help="resident memory budget per worker process: above it, free "
+                             "buffers after each page and (with --streaming/--documents) "
+                             "hold back new pages until pages in flight finish")
+    parser.add_argument("--detect-visuals", action="store_true",
+                        help="also detect signatures and stamps (YOLO, needs ultralytics and "
+                             "models/signature_stamp.pt), alongside OCR on the same pages")
+    parser.add_argument("--visual-batch-size", type=int, default=8,
+                        help="pages per YOLO inference call (default: 8)")
+    parser.add_argument("--ocr-batch-size", type=int, default=4,
+                        help="pages per PaddleOCR call in --streaming mode (default: 4)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="run --batch as one staged pipeline (overlapping decode, "
+                             "normalize, OCR and extraction threads) instead of a process pool")
+    parser.add_argument("--documents", action="store_true",
+                        help="one result per document: PDFs, and page images grouped by "
+                             "document id (<document>_pg<N>.png); pages run in parallel "
+                             "(implied for a single .pdf input)")
+    parser.add_argument("--dpi", type=int, default=200,
+                        help="PDF rasterization resolution (default: 200)")
+    parser.add_argument("--early-stop-confidence", type=float, default=0.8,
+                        help="stop reading a document's pages once dealer, model and HP "
+                             "all reach this confidence (default: 0.8)")
+    parser.add_argument("--decode-workers", type=int, default=2)
+    parser.add_argument("--normalize-workers", type=int, default=None,
+                        help="default: CPU count minus the decode and OCR workers")
+    parser.add_argument("--ocr-workers", type=int, default=1)
+    parser.add_argument("--extract-workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="max pages waiting between two stages "
+                             "(default: 8, or 2 with --documents to keep read-ahead short)")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="run as a long-lived HTTP service on HOST:PORT or "
+                             "unix:/path/to.sock with the models kept warm "
+                             "(POST /extract, GET /health, GET /metrics)")
+    parser.add_argument("--batch-wait-ms", type=float, default=20,
+                        help="--serve: how long the oldest waiting page waits for others "
+                             "to share its OCR call (default: 20)")
+    parser.add_argument("--max-upload-mb", type=float, default=32,
+                        help="--serve: largest accepted image upload (default: 32)")
+    parser.add_argument("--root", metavar="DIR",
+                        help="--serve: also accept {\"path\": ...} requests for files under "
+                             "this directory (default: image uploads only)")
+    parser.add_argument("--trace-jsonl", metavar="PATH",
+                        help="write per-page stage timings and counters (tokens, lines, "
+                             "blocks, candidates per field) as JSON lines")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write stage latency histograms and counters as a Prometheus "
+                             "text file (rewritten every 100 pages)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="run under cProfile and save the stats to PATH; --batch then "
+                             "runs in this process with one worker (also the simplest "
+                             "setup to attach py-spy to)")
 
-    # Step 6: Final debug-friendly output
-    output = {
-        "status": "ok",
-        "image": image_path,
-        "num_ocr_tokens": len(ocr_tokens),
-        "num_lines": len(lines),
-        "num_blocks": len(blocks),
-        "dealer_name_result": dealer_result,
-        "model_name_result": model_result,
-        "hp_result": hp_result
+    args = parser.parse_args(argv)
+    if args.serve:
+        if args.image_path or args.batch or args.documents or args.streaming or args.profile:
+            parser.error("--serve takes pages over HTTP; drop the image path / batch options")
+        return args
+    if bool(args.image_path) == bool(args.batch):
+        parser.error("give either an image path, --batch or --serve")
+    if args.streaming and not args.batch:
+        parser.error("--streaming needs --batch")
+    if args.image_path and args.image_path.lower().endswith(".pdf"):
+        args.documents = True
+    if args.documents and (args.trace_jsonl or args.metrics):
+        parser.error("--trace-jsonl/--metrics work per page, not with --documents")
+    if args.profile:
+        if args.streaming or args.documents:
+            parser.error("--profile runs pages in one thread; drop --streaming/--documents")
+        args.workers = 1
+    return args
+
+def stage_options_from_args(args):
+    if not (args.streaming or args.documents or args.serve):
+        return None
+    options = {
+        "decode_workers": args.decode_workers,
+        "normalize_workers": args.normalize_workers,
+        "ocr_workers": args.ocr_workers,
+        "extract_workers": args.extract_workers
     }
+    if args.queue_size is not None:
+        options["queue_size"] = args.queue_size
+    return options
 
-    print(json.dumps(output, indent=2))
+def pipeline_options_from_args(args):
+    return {
+        "ocr_cache_dir": args.ocr_cache,
+        "ocr_cache_max_mb": args.ocr_cache_max_mb,
+        "ocr_batch_size": args.ocr_batch_size,
+        "normalize_profile": args.normalize_profile,
+        "correct_orientation": args.orientation,
+        "roi_ocr": args.roi_ocr,
+        "document_gate": args.gate,
+        "lean_memory": args.lean_memory,
+        "detect_visuals": args.detect_visuals,
+        "visual_batch_size": args.visual_batch_size,
+        "memory_budget_mb": args.worker_memory_mb,
+        "telemetry": bool(args.trace_jsonl or args.metrics)
+    }
+
+def exporter_from_args(args):
+    if not (args.trace_jsonl or args.metrics):
+        return None
+    from src.utils.telemetry import TelemetryExporter
+    return TelemetryExporter(jsonl_path=args.trace_jsonl, prometheus_path=args.metrics)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python run_pipeline.py <image_path>")
-        sys.exit(1)
+    args = parse_args()
+    options = pipeline_options_from_args(args)
+    exporter = exporter_from_args(args)
+
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
 
-    main(sys.argv[1])
+    try:
+        if args.serve:
+            main_serve(args.serve, options, stage_options_from_args(args), exporter,
+                       args.batch_wait_ms, args.max_upload_mb, args.root)
+        elif args.documents:
+            main_documents(args.batch or args.image_path, args.output, options,
+                           stage_options_from_args(args), args.dpi, args.early_stop_confidence)
+        elif args.batch:
+            main_batch(args.batch, args.output, args.workers, args.chunksize, options,
+                       stage_options_from_args(args), exporter)
+        else:
+            main(args.image_path, options, exporter)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if exporter is not None:
+            exporter.close()
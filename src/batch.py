@@ -0,0 +1,232 @@
+"""
+Batch Runner Module
+Runs the extraction pipeline over a directory or manifest of pages
+"""
+import json
+import multiprocessing as mp
+import os
+import time
+
+from tqdm import tqdm
+
+from src.preprocessing.document_loader import PDF_EXTENSIONS, group_documents
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"}
+DOCUMENT_EXTENSIONS = IMAGE_EXTENSIONS | PDF_EXTENSIONS
+
+# One pipeline per worker process (built by the pool initializer)
+_pipeline = None
+
+
+def collect_inputs(source, extensions=IMAGE_EXTENSIONS):
+    """
+    Directory -> all files in it with one of `extensions` (sorted).
+    File      -> manifest with one image path per line ('#' comments allowed),
+                 relative paths resolved against the manifest's folder.
+    """
+    if os.path.isdir(source):
+        return [
+            os.path.join(source, name)
+            for name in sorted(os.listdir(source))
+            if os.path.splitext(name)[1].lower() in extensions
+        ]
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            paths.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+    return paths
+
+
+def _init_worker(pipeline_options=None, prewarm=False):
+    global _pipeline
+    from src.pipeline import Pipeline
+    _pipeline = Pipeline(**(pipeline_options or {}))
+    if prewarm:
+        # Load the OCR model before the first page so it does not inflate
+        # that page's latency (models are otherwise loaded on first use)
+        _pipeline.preprocessor.warmup()
+
+
+def _process_page(image_path):
+    start = time.perf_counter()
+    try:
+        result = _pipeline.run(image_path)
+    except Exception as e:
+        result = {
+            "status": "error",
+            "image": image_path,
+            "error": f"{type(e).__name__}: {e}"
+        }
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    result["worker_pid"] = os.getpid()
+    return result
+
+
+class BatchStats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.errors = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.start = time.perf_counter()
+
+    def add(self, result):
+        self.latencies_ms.append(result["latency_ms"])
+        if result["status"] == "error":
+            self.errors += 1
+        elif result["status"] == "rejected":
+            self.rejected += 1
+        if result.get("ocr_cache_hit"):
+            self.cache_hits += 1
+
+    def summary(self):
+        wall_s = time.perf_counter() - self.start
+        lat = sorted(self.latencies_ms)
+        n = len(lat)
+
+        def pct(p):
+            if not lat:
+                return None
+            return lat[min(n - 1, int(round(p / 100 * (n - 1))))]
+
+        return {
+            "pages": n,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "ocr_cache_hits": self.cache_hits,
+            "wall_s": round(wall_s, 2),
+            "pages_per_sec": round(n / wall_s, 3) if wall_s > 0 else None,
+            "latency_ms": {
+                "mean": round(sum(lat) / n, 2) if n else None,
+                "p50": pct(50),
+                "p95": pct(95),
+                "p99": pct(99),
+                "max": lat[-1] if lat else None
+            }
+        }
+
+
+def _write_results(results, out, stats, total, exporter=None):
+    progress = tqdm(total=total, unit="page")
+    try:
+        for result in results:
+            # Traces go to the telemetry exporter, not the predictions
+            trace = result.pop("trace", None)
+            if exporter is not None:
+                exporter.add(result, trace)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            stats.add(result)
+            progress.update(1)
+    finally:
+        progress.close()
+
+
+def run_batch(inputs, output_path, workers=1, chunksize=1, pipeline_options=None,
+              prewarm=None, exporter=None):
+    """
+    Process every page in `inputs` and stream one JSON line per page to
+    `output_path` (in completion order). Returns throughput / latency stats.
+
+    `pipeline_options` are passed to Pipeline() in every worker. `prewarm`
+    loads the OCR model in each pool worker up front; by default it is on
+    unless an OCR cache is configured (a warm cache may never need OCR).
+    With pipeline_options["telemetry"], page traces are handed to
+    `exporter` (a TelemetryExporter) in this process.
+    """
+    if prewarm is None:
+        prewarm = not (pipeline_options or {}).get("ocr_cache_dir")
+    stats = BatchStats()
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        if workers <= 1:
+            _init_worker(pipeline_options)
+            _write_results(map(_process_page, inputs), out, stats, len(inputs), exporter)
+        else:
+            # spawn: PaddleOCR's native thread pools do not survive fork()
+            with mp.get_context("spawn").Pool(
+                workers, initializer=_init_worker, initargs=(pipeline_options, prewarm)
+            ) as pool:
+                results = pool.imap_unordered(_process_page, inputs, chunksize)
+                _write_results(results, out, stats, len(inputs), exporter)
+
+    return stats.summary()
+
+
+def run_streaming(inputs, output_path, stage_options=None, pipeline_options=None,
+                  exporter=None):
+    """
+    Same output as run_batch, but through one StagedPipeline: decode,
+    normalize, OCR and extraction overlap on threads with bounded queues.
+    `stage_options` sets the per-stage worker counts and queue size.
+    """
+    from src.staged_pipeline import StagedPipeline
+
+    staged = StagedPipeline(**(stage_options or {}), **(pipeline_options or {}))
+    stats = BatchStats()
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        _write_results(staged.run(inputs), out, stats, len(inputs), exporter)
+
+    summary = stats.summary()
+    summary["stages"] = staged.stage_stats()
+    if staged.memory_budget is not None:
+        summary["memory"] = staged.memory_budget.stats()
+    return summary
+
+
+def run_documents(inputs, output_path, dpi=200, early_stop_confidence=0.8,
+                  stage_options=None, pipeline_options=None):
+    """
+    One JSON line per document instead of per page: PDFs, and page images
+    grouped by document id (`<document>_pg<N>.png`). Pages of a document
+    run in parallel through a DocumentPipeline, which keeps the best field
+    results across pages and stops once all are confidently found.
+    """
+    from src.document_pipeline import DocumentPipeline
+
+    documents = DocumentPipeline(
+        dpi=dpi,
+        early_stop_confidence=early_stop_confidence,
+        stage_options=stage_options,
+        **(pipeline_options or {})
+    )
+    grouped = group_documents(inputs)
+    start = time.perf_counter()
+    num_pages = pages_processed = errors = rejected = 0
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        for _, paths in tqdm(grouped, unit="doc"):
+            source = paths[0] if len(paths) == 1 else paths
+            try:
+                result = documents.run(source)
+            except Exception as e:
+                result = {
+                    "status": "error",
+                    "document": paths[0],
+                    "error": f"{type(e).__name__}: {e}"
+                }
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+
+            errors += result["status"] == "error"
+            rejected += result["status"] == "rejected"
+            num_pages += result.get("num_pages", 0)
+            pages_processed += result.get("pages_processed", 0)
+
+    wall_s = time.perf_counter() - start
+    return {
+        "documents": len(grouped),
+        "errors": errors,
+        "rejected": rejected,
+        "pages": num_pages,
+        "pages_processed": pages_processed,
+        "pages_skipped_early_stop": num_pages - pages_processed,
+        "wall_s": round(wall_s, 2),
+        "pages_per_sec": round(pages_processed / wall_s, 3) if wall_s > 0 else None
+    }
@@ -1,5 +1,193 @@
 """
 Cost Candidate Module
 Handles cost candidate extraction and processing
+
+Amounts are parsed per OCR token (Indian or western digit grouping, ₹ /
+Rs / INR, paise, "/-", lakh / crore) and located through a ColumnIndex
+over the x-centers of the amount tokens:
+
+    amount column   the column under the best "Amount" / "Total" / "Price"
+                    header (else the densest column of amounts), one range
+                    lookup, sorted by y
+    total row       for each "Total" line, the column entry level with it:
+                    one binary search instead of a rescan of the page
+    marked amount   currency-marked amounts anywhere else on the page
+
+CostReasoner (src/reasoning/cost_reasoner.py) chooses among the candidates.
 """
-pass
+import numpy as np
+
+from src.candidates.base import Candidate
+from src.layout.block_grouping import COLUMN_BIN
+from src.layout.column_index import ColumnIndex
+from src.utils.keyword_matcher import KeywordMatcher
+from src.utils.patterns import AMOUNT, AMOUNT_EXCLUDED_LINE, AMOUNT_UNITS
+
+# Quoted costs outside this range are not costs (quantities, HP, phone
+# numbers); plain unformatted numbers must also reach MIN_PLAIN_AMOUNT
+MIN_AMOUNT = 1000
+MIN_PLAIN_AMOUNT = 10000
+MAX_AMOUNT = 1e9
+
+# Column header words, best first (matched on whole words of a token)
+AMOUNT_HEADERS = {
+    "amount": 0, "amt": 0,
+    "total": 1,
+    "price": 2, "value": 2, "cost": 2,
+    "rate": 3
+}
+
+# Total lines, by how likely their amount is the quoted cost
+GRAND_TOTAL_KEYWORDS = [
+    "grand total", "net total", "total amount", "total price", "total cost",
+    "total payable", "on road", "on-road"
+]
+SUB_TOTAL_KEYWORDS = ["sub total", "subtotal", "sub-total"]
+
+GRAND_TOTAL_MATCHER = KeywordMatcher(GRAND_TOTAL_KEYWORDS)
+SUB_TOTAL_MATCHER = KeywordMatcher(SUB_TOTAL_KEYWORDS)
+
+# Base score per candidate source (blended with OCR confidence)
+SOURCE_SCORES = {
+    "grand_total_row": 0.95,
+    "total_row": 0.85,
+    "amount_column_max": 0.65,
+    "sub_total_row": 0.55,
+    "marked_amount": 0.45,
+    "amount_column": 0.35
+}
+
+
+def parse_amount(text):
+    """
+    Last amount in `text` as (value, formatted), or None. `formatted`: it
+    carried a currency marker, digit grouping, "/-" or a lakh / crore unit,
+    so it is an amount even outside an amount column.
+    """
+    found = None
+    for m in AMOUNT.finditer(text.upper()):
+        number = m.group("number")
+        value = float(number.replace(",", "") + (m.group("decimals") or ""))
+        unit = m.group("unit")
+        if unit:
+            value *= AMOUNT_UNITS[unit]
+
+        formatted = bool(m.group("currency") or m.group("suffix") or unit or "," in number)
+        minimum = MIN_AMOUNT if formatted else MIN_PLAIN_AMOUNT
+        if minimum <= value <= MAX_AMOUNT:
+            found = (value, formatted)
+    return found
+
+
+class CostCandidateExtractor:
+
+    def __init__(self, column_tolerance=COLUMN_BIN):
+        # Half-width of a column around its x-center (at least this much)
+        self.column_tolerance = column_tolerance
+
+    def extract(self, page):
+        """Cost Candidates of a PageFeatures page (a value may appear more than once)."""
+        table = page.table
+        if not len(table):
+            return []
+
+        line_of_row = np.empty(len(table), dtype=np.int64)
+        for li, line in enumerate(page.lines):
+            line_of_row[line] = li
+        # Phone / PIN / GSTIN / date / account lines (whole words only)
+        excluded = [AMOUNT_EXCLUDED_LINE.search(text) is not None for text in page.text_lower]
+
+        amounts = {}
+        for row, text in enumerate(table.text):
+            if excluded[line_of_row[row]]:
+                continue
+            parsed = parse_amount(text)
+            if parsed is not None:
+                amounts[row] = parsed
+
+        index = ColumnIndex(table, sorted(amounts))
+        column = self._amount_column(page, index, amounts)
+
+        candidates = []
+        in_column = set(column.tolist())
+        if len(column):
+            largest = max(column.tolist(), key=lambda row: amounts[row][0])
+            for row in column.tolist():
+                source = "amount_column_max" if row == largest else "amount_column"
+                candidates.append(self._candidate(table, row, amounts[row][0], source))
+
+        for li, text in enumerate(page.text_lower):
+            if "total" not in text:
+                continue
+            row = self._total_amount(page, li, index, column, amounts)
+            if row is None:
+                continue
+            if GRAND_TOTAL_MATCHER.search(text):
+                source = "grand_total_row"
+            elif SUB_TOTAL_MATCHER.search(text):
+                source = "sub_total_row"
+            else:
+                source = "total_row"
+            candidates.append(self._candidate(table, row, amounts[row][0], source))
+
+        for row, (value, formatted) in amounts.items():
+            if formatted and row not in in_column:
+                candidates.append(self._candidate(table, row, value, "marked_amount"))
+
+        return candidates
+
+    # ------------------------------------------------------------
+    # Layout lookups
+    # ------------------------------------------------------------
+
+    def _amount_column(self, page, index, amounts):
+        """Rows of the amount column below its header, sorted by y (may be empty)."""
+        table = page.table
+        best = None
+        for row, text in enumerate(page.token_text_lower):
+            ranks = [AMOUNT_HEADERS[w] for w in (w.strip(".:()-/₹") for w in text.split())
+                     if w in AMOUNT_HEADERS]
+            if not ranks:
+                continue
+
+            tolerance = max(self.column_tolerance, (table.x_max[row] - table.x_min[row]) / 2)
+            column = index.column(float(table.x_center[row]), tolerance)
+            column = column[table.y_center[column] > table.y_max[row]]
+            if not len(column):
+                continue
+
+            # Best header word, then most amounts under it, then rightmost
+            key = (-min(ranks), len(column), float(table.x_center[row]))
+            if best is None or key > best[0]:
+                best = (key, column)
+
+        if best is not None:
+            return best[1]
+
+        # No header: the densest column of amounts, if it holds two or more
+        x, count = index.densest_column(self.column_tolerance)
+        if count < 2:
+            return np.empty(0, dtype=np.int64)
+        return index.column(x, self.column_tolerance)
+
+    def _total_amount(self, page, li, index, column, amounts):
+        """Amount row of a "Total" line: level with it in the column, else its last amount."""
+        line = page.lines[li]
+        tolerance = float(page.table.heights[line].max())
+        row = index.nearest_in_column(column, page.center_y[li], tolerance)
+        if row is not None:
+            return row
+
+        # Line rows are sorted left to right
+        line_amounts = [row for row in line if row in amounts]
+        return line_amounts[-1] if line_amounts else None
+
+    @staticmethod
+    def _candidate(table, row, value, source):
+        score = SOURCE_SCORES[source] * 0.8 + float(table.conf[row]) * 0.2
+        return Candidate(
+            value=int(value) if float(value).is_integer() else round(value, 2),
+            bbox=table.quads[row].tolist(),
+            confidence=round(score, 3),
+            source=source
+        )
@@ -0,0 +1,135 @@
+"""
+Document Pipeline Module
+Runs every page of a multi-page document through the staged pipeline and
+keeps the best dealer / model / HP / cost result across pages
+"""
+import threading
+import time
+
+from src.preprocessing.document_loader import PDFDocument, document_id, is_pdf, page_number
+from src.staged_pipeline import StagedPipeline
+
+# (result key, value key) of each extracted field
+FIELDS = (
+    ("dealer_name_result", "dealer_name"),
+    ("model_name_result", "model_name"),
+    ("hp_result", "hp"),
+    ("cost_result", "cost"),
+)
+
+# Fields that must all be confident before the remaining pages are skipped
+# (the cost often sits on the last page, under the totals)
+EARLY_STOP_FIELDS = FIELDS[:3]
+
+
+class DocumentPipeline:
+    """
+    One document per run() call, pages in parallel:
+
+        documents = DocumentPipeline(dpi=200, early_stop_confidence=0.8)
+        result = documents.run("quotation.pdf")
+        result = documents.run(["doc_pg1.png", "doc_pg2.png"])
+
+    Pages are fed in page order and PDF pages are only rasterized as the
+    pipeline pulls them, so once dealer, model and HP have been found with at
+    least `early_stop_confidence` the remaining pages are never rendered or
+    OCRed.
+    Small queues keep that read-ahead short.
+    """
+
+    def __init__(self, dpi=200, early_stop_confidence=0.8, stage_options=None,
+                 **pipeline_options):
+        self.dpi = dpi
+        self.early_stop_confidence = early_stop_confidence
+
+        stage_options = {"queue_size": 2, **(stage_options or {})}
+        self.staged = StagedPipeline(**stage_options, **pipeline_options)
+
+    def run(self, document):
+        """
+        `document`: a PDF path, or one or more page image paths. Raises
+        ValueError when no page image path is given.
+        """
+        start = time.perf_counter()
+        pdf = None
+
+        if isinstance(document, str) and is_pdf(document):
+            pdf = PDFDocument(document, dpi=self.dpi)
+            name, pages = document_id(document), pdf.pages()
+        else:
+            paths = [document] if isinstance(document, str) else list(document)
+            if not paths:
+                raise ValueError("document has no page images")
+            name = document_id(paths[0])
+            pages = [{"path": path, "page": page_number(path)} for path in paths]
+
+        stop = threading.Event()
+        best = {}
+        page_results = []
+        try:
+            for result in self.staged.run(pages, stop=stop):
+                page_results.append(self._page_summary(result))
+                if result["status"] == "ok":
+                    self._merge(best, result)
+                if self._confident(best):
+                    stop.set()
+        finally:
+            if pdf is not None:
+                pdf.close()
+
+        page_results.sort(key=lambda r: r["page"])
+        statuses = {r["status"] for r in page_results}
+        output = {
+            "status": "ok" if "ok" in statuses else "rejected" if "rejected" in statuses else "error",
+            "document": name,
+            "num_pages": len(pages),
+            "pages_processed": len(page_results),
+            "early_stop": stop.is_set() and len(page_results) < len(pages),
+        }
+        for result_key, _ in FIELDS:
+            output[result_key] = best.get(result_key)
+        output["pages"] = page_results
+        output["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return output
+
+    # ------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _merge(best, result):
+        """Keep, per field, the found value with the highest confidence."""
+        for result_key, value_key in FIELDS:
+            candidate = dict(result[result_key], page=result["page"])
+            current = best.get(result_key)
+            if current is None or (
+                (candidate[value_key] is not None, candidate["confidence"])
+                > (current[value_key] is not None, current["confidence"])
+            ):
+                best[result_key] = candidate
+
+    def _confident(self, best):
+        return all(
+            best.get(result_key) is not None
+            and best[result_key][value_key] is not None
+            and best[result_key]["confidence"] >= self.early_stop_confidence
+            for result_key, value_key in EARLY_STOP_FIELDS
+        )
+
+    @staticmethod
+    def _page_summary(result):
+        summary = {
+            "page": result["page"],
+            "image": result["image"],
+            "status": result["status"],
+            "latency_ms": result["latency_ms"]
+        }
+        if result["status"] == "ok":
+            for result_key, value_key in FIELDS:
+                summary[value_key] = result[result_key][value_key]
+            summary["ocr_cache_hit"] = result["ocr_cache_hit"]
+        elif result["status"] == "rejected":
+            summary["gate"] = result["gate"]["reason"]
+        else:
+            summary["error"] = result["error"]
+        return summary
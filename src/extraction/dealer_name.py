@@ -1,4 +1,5 @@
-import re
+from src.extraction.top_k import TopK
+from src.utils.keyword_matcher import KeywordMatcher
 
 KEYWORDS = [
     "tractor", "tractors", "motors", "agency", "agencies",
@@ -18,89 +19,110 @@ KEYWORDS = [
 
 ]
 
+# Plain substrings (matched on the lowercased line)
 EXCLUDE_PATTERNS = [
-    r"gst", r"phone", r"mob", r"email", r"date",
-    r"quotation", r"invoice", r"bank","branch","ifsc"
+    "gst", "phone", "mob", "email", "date",
+    "quotation", "invoice", "bank", "branch", "ifsc"
 ]
 
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+EXCLUDE_MATCHER = KeywordMatcher(EXCLUDE_PATTERNS)
+
 
 class DealerNameResolver:
-    def __init__(self, score_threshold=0.6):
+    """
+    Scores multi-word lines by position, dealer keywords, capitalization and
+    OCR confidence. Lines are visited highest score bound first and only the
+    `top_k` best distinct names are kept (see top_k.py); they come back as
+    "alternatives". Lines whose bound cannot reach them are skipped
+    ("num_pruned").
+    """
+
+    def __init__(self, score_threshold=0.6, top_k=5):
         self.score_threshold = score_threshold
+        self.top_k = top_k
+
+    def resolve(self, page):
+        keyword_counts = [KEYWORD_MATCHER.count(hits) for hits in page.keyword_hits(KEYWORD_MATCHER)]
+        bounds = [
+            self._score_bound(page.first_y[li], page.max_conf[li], keyword_counts[li], page.page_height)
+            for li in range(len(page.text))
+        ]
+
+        top = TopK(self.top_k)
+        num_candidates = visited = 0
+        for li in sorted(range(len(bounds)), key=bounds.__getitem__, reverse=True):
+            if not top.admits(bounds[li]):
+                break
+            visited += 1
+
+            text = page.text[li].strip()
+            if not self._is_candidate(text, page.text_lower[li]):
+                continue
+            num_candidates += 1
+
+            score = self._score_candidate(
+                text=text,
+                y_center=page.first_y[li],
+                confidence=page.max_conf[li],
+                keyword_hits=keyword_counts[li],
+                page_height=page.page_height
+            )
+            top.push(score, (li,), text, {"dealer_name": text, "score": score})
+
+        ranking = {
+            "num_candidates": num_candidates,
+            "num_pruned": len(bounds) - visited,
+            "alternatives": top.items()
+        }
+        best = top.best()
 
-    def resolve(self, blocks, page_height):
-        candidates = []
-
-        for block in blocks:
-            # Current block structure: list of lines, each line is list of tokens
-            for line in block:
-                # Convert line (list of tokens) to text string
-                text = " ".join(tok["text"] for tok in line).strip()
-
-                # Get bbox from first token (approximation)
-                bbox = line[0]["bbox"] if line else [[0,0],[1,1],[1,1],[0,0]]
-                conf = max(tok.get("confidence", 0.0) for tok in line) if line else 0.0
-
-                if not self._is_candidate(text):
-                    continue
-
-                score = self._score_candidate(
-                    text=text,
-                    bbox=bbox,
-                    confidence=conf,
-                    page_height=page_height
-                )
-
-                candidates.append({
-                    "text": text,
-                    "score": score
-                })
-
-        if not candidates:
+        if best is None:
             return {
                 "dealer_name": None,
                 "confidence": 0.0,
-                "reason": "no_candidates"
+                "reason": "no_candidates",
+                **ranking
             }
 
-        best = max(candidates, key=lambda x: x["score"])
-
         if best["score"] < self.score_threshold:
             return {
                 "dealer_name": None,
                 "confidence": round(best["score"], 2),
-                "reason": "low_confidence"
+                "reason": "low_confidence",
+                **ranking
             }
 
         return {
-            "dealer_name": best["text"],
+            "dealer_name": best["dealer_name"],
             "confidence": round(best["score"], 2),
-            "reason": "heuristic_match"
+            "reason": "heuristic_match",
+            **ranking
         }
 
-    def _is_candidate(self, text):
-        text_l = text.lower()
-
+    def _is_candidate(self, text, text_l):
         if len(text.split()) < 2:
             return False
 
-        for p in EXCLUDE_PATTERNS:
-            if re.search(p, text_l):
-                return False
+        return not EXCLUDE_MATCHER.search(text_l)
 
-        return True
+    def _score_bound(self, y_center, confidence, keyword_hits, page_height):
+        # _score_candidate with the best possible capitalization score
+        return (
+            max(0, 1.0 - y_center / page_height) * 0.35
+            + min(keyword_hits * 0.15, 0.30)
+            + 0.15
+            + confidence * 0.20
+        )
 
-    def _score_candidate(self, text, bbox, confidence, page_height):
+    def _score_candidate(self, text, y_center, confidence, keyword_hits, page_height):
         score = 0.0
 
         # 1. Position score (35% weight - higher is better)
-        y_center = sum(p[1] for p in bbox) / 4
         vertical_ratio = y_center / page_height
         score += max(0, 1.0 - vertical_ratio) * 0.35
 
         # 2. Keyword score (30% max weight)
-        text_l = text.lower()
-        keyword_hits = sum(1 for k in KEYWORDS if k in text_l)
         score += min(keyword_hits * 0.15, 0.30)  # Max 30%
 
         # 3. Capitalization score (15% weight)
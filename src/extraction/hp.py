@@ -1,16 +1,17 @@
-import re
+from src.extraction.top_k import TopK
+from src.utils.keyword_matcher import KeywordMatcher
+from src.utils.patterns import HP_NUMBER
 
 
-HP_KEYWORDS = [
-    "hp", "h.p", "horse power", "horsepower",
-    "engine power", "engine", "tractor power",
-    "rated power"
-]
-
 PTO_KEYWORDS = [
     "pto", "pto hp", "pto power", "power take off"
 ]
 
+ENGINE_CONTEXT_KEYWORDS = ["engine", "tractor", "diesel"]
+
+# Everything the scorer looks for in a line, found in one pass
+CONTEXT_MATCHER = KeywordMatcher(["hp"] + ENGINE_CONTEXT_KEYWORDS + PTO_KEYWORDS)
+
 
 class HPResolver:
     """
@@ -23,61 +24,90 @@ class HPResolver:
     - Indian tractor–specific sanity
     """
 
-    def __init__(self, score_threshold=0.55):
+    def __init__(self, score_threshold=0.55, top_k=5):
         self.score_threshold = score_threshold
+        self.top_k = top_k
 
     # ------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------
 
-    def resolve(self, blocks, page_width, page_height):
-        hp_col_x, pto_col_x = self._detect_hp_columns(blocks)
-        candidates = []
-
-        for block_id, block in enumerate(blocks):
-            is_table = self._is_table_like_block(block)
-
-            for line_id, line in enumerate(block):
-                text = " ".join(tok["text"] for tok in line).lower()
-                numbers = self._extract_hp_numbers(text)
-
-                for value, pos in numbers:
-                    score = self._score_candidate(
-                        value=value,
-                        pos=pos,
-                        text=text,
-                        line=line,
-                        is_table=is_table,
-                        hp_col_x=hp_col_x,
-                        pto_col_x=pto_col_x,
-                        page_height=page_height
-                    )
-
-                    candidates.append({
-                        "hp": value,
-                        "score": score
-                    })
-
-        if not candidates:
+    def resolve(self, page):
+        """
+        Lines are visited highest score bound first (everything but the
+        number <-> "HP" distance is known per line); once a line's bound
+        cannot reach the `top_k` best distinct values, it and every line
+        after it are neither parsed nor scored. The kept values come back
+        as "alternatives".
+        """
+        hp_col_x, pto_col_x = self._detect_hp_columns(page)
+        context_hits = page.keyword_hits(CONTEXT_MATCHER)
+        bounds = [
+            self._score_bound(
+                hits=context_hits[li],
+                line_x=page.center_x[li],
+                line_y=page.center_y[li],
+                is_table=page.block_is_table[page.line_pos[li][0]],
+                hp_col_x=hp_col_x,
+                pto_col_x=pto_col_x,
+                page_height=page.page_height
+            )
+            for li in range(len(page.text_lower))
+        ]
+
+        top = TopK(self.top_k)
+        num_candidates = visited = 0
+        for li in sorted(range(len(bounds)), key=bounds.__getitem__, reverse=True):
+            if not top.admits(bounds[li]):
+                break
+            visited += 1
+
+            numbers = self._extract_hp_numbers(page.text_lower[li])
+            num_candidates += len(numbers)
+            block_id, _ = page.line_pos[li]
+
+            for j, (value, pos) in enumerate(numbers):
+                score = self._score_candidate(
+                    value=value,
+                    pos=pos,
+                    hits=context_hits[li],
+                    line_x=page.center_x[li],
+                    line_y=page.center_y[li],
+                    is_table=page.block_is_table[block_id],
+                    hp_col_x=hp_col_x,
+                    pto_col_x=pto_col_x,
+                    page_height=page.page_height
+                )
+                top.push(score, (li, j), value, {"hp": value, "score": score})
+
+        ranking = {
+            "num_candidates": num_candidates,
+            "num_pruned": len(bounds) - visited,
+            "alternatives": top.items()
+        }
+        best = top.best()
+
+        if best is None:
             return {
                 "hp": None,
                 "confidence": 0.0,
-                "reason": "no_candidates"
+                "reason": "no_candidates",
+                **ranking
             }
 
-        best = max(candidates, key=lambda x: x["score"])
-
         if best["score"] < self.score_threshold:
             return {
                 "hp": None,
                 "confidence": round(best["score"], 2),
-                "reason": "low_confidence"
+                "reason": "low_confidence",
+                **ranking
             }
 
         return {
             "hp": best["hp"],
             "confidence": round(best["score"], 2),
-            "reason": "column_aligned_match"
+            "reason": "column_aligned_match",
+            **ranking
         }
 
     # ------------------------------------------------------------
@@ -90,7 +120,7 @@ class HPResolver:
         """
         values = []
 
-        for m in re.finditer(r"\b\d{2,3}(\.\d+)?\b", text):
+        for m in HP_NUMBER.finditer(text):
             val = float(m.group())
             if 20 <= val <= 100:
                 values.append((int(round(val)), m.start()))
@@ -109,8 +139,9 @@ class HPResolver:
         self,
         value,
         pos,
-        text,
-        line,
+        hits,
+        line_x,
+        line_y,
         is_table,
         hp_col_x,
         pto_col_x,
@@ -123,8 +154,6 @@ class HPResolver:
             score += 0.25
 
         # --- Column alignment ---
-        line_x = self._line_center_x(line)
-
         if hp_col_x is not None:
             dist = abs(line_x - hp_col_x)
             score += max(0, 1 - dist / 300) * 0.35
@@ -134,69 +163,62 @@ class HPResolver:
             score -= 0.45
 
         # --- Semantic binding: number ↔ "HP" ---
-        if "hp" in text:
-            hp_idx = text.find("hp")
+        if "hp" in hits:
+            hp_idx = hits["hp"]
             if abs(hp_idx - pos) <= 12:
                 score += 0.30
             else:
                 score += 0.10
 
         # --- Engine context boost ---
-        if any(k in text for k in ["engine", "tractor", "diesel"]):
+        if any(k in hits for k in ENGINE_CONTEXT_KEYWORDS):
             score += 0.15
 
         # --- PTO semantic penalty ---
-        if any(k in text for k in PTO_KEYWORDS):
+        if any(k in hits for k in PTO_KEYWORDS):
             score -= 0.35
 
         # --- Vertical sanity (avoid headers/footers) ---
-        y = self._line_center_y(line)
-        vr = y / page_height
+        vr = line_y / page_height
         if 0.25 <= vr <= 0.75:
             score += 0.10
 
         return max(0.0, min(round(score, 3), 1.0))
 
+    def _score_bound(self, hits, line_x, line_y, is_table, hp_col_x, pto_col_x, page_height):
+        """_score_candidate for a number right next to the line's "HP"."""
+        score = 0.25 if is_table else 0.0
+        if hp_col_x is not None:
+            score += max(0, 1 - abs(line_x - hp_col_x) / 300) * 0.35
+        if pto_col_x is not None and abs(line_x - pto_col_x) < 60:
+            score -= 0.45
+        if "hp" in hits:
+            score += 0.30
+        if any(k in hits for k in ENGINE_CONTEXT_KEYWORDS):
+            score += 0.15
+        if any(k in hits for k in PTO_KEYWORDS):
+            score -= 0.35
+        if 0.25 <= line_y / page_height <= 0.75:
+            score += 0.10
+        return max(0.0, min(score, 1.0))
+
     # ------------------------------------------------------------
     # Column detection
     # ------------------------------------------------------------
 
-    def _detect_hp_columns(self, blocks):
+    def _detect_hp_columns(self, page):
         hp_x = None
         pto_x = None
+        token_text = page.token_text_lower
+        x_center = page.table.x_center
 
-        for block in blocks:
-            for line in block:
-                for tok in line:
-                    txt = tok["text"].lower()
-                    x = sum(p[0] for p in tok["bbox"]) / 4
+        for line in page.lines:
+            for row in line:
+                txt = token_text[row]
 
-                    if txt.strip() == "hp":
-                        hp_x = x
-                    elif "pto" in txt:
-                        pto_x = x
+                if txt.strip() == "hp":
+                    hp_x = float(x_center[row])
+                elif "pto" in txt:
+                    pto_x = float(x_center[row])
 
         return hp_x, pto_x
-
-    # ------------------------------------------------------------
-    # Geometry helpers
-    # ------------------------------------------------------------
-
-    def _line_center_x(self, line):
-        xs = [sum(p[0] for p in tok["bbox"]) / 4 for tok in line]
-        return sum(xs) / len(xs)
-
-    def _line_center_y(self, line):
-        ys = [sum(p[1] for p in tok["bbox"]) / 4 for tok in line]
-        return sum(ys) / len(ys)
-
-    def _is_table_like_block(self, block):
-        if len(block) < 2:
-            return False
-
-        xs = []
-        for line in block:
-            for tok in line:
-                xs.append(sum(p[0] for p in tok["bbox"]) / 4)
-
-        return len(set(int(x // 50) for x in xs)) >= 2
@@ -1,122 +1,142 @@
-import re
-
-# Model-specific keywords
-MODEL_KEYWORDS = [
-    "model", "hp", "h.p", "cyl", "tractor",
-    "xt", "di", "fe", "eco", "dx", "sx", "wd"
+from src.extraction.top_k import TopK
+from src.utils.keyword_matcher import KeywordMatcher
+from src.utils.patterns import (
+    DIGIT, MODEL_BRAND_PREFIX, MODEL_CORE, MODEL_NOISE, MODEL_TABLE_ROW, collapse_spaces
+)
+
+# Words that rule out a model span (matched on the uppercased span)
+MODEL_CORE_BLACKLIST = [
+    "ADDRESS", "IFSC", "BANK", "DATE", "FOR",
+    "TOTAL", "AMOUNT", "HDFC", "GST"
 ]
 
-# OCR cleanup
-OCR_CORRECTIONS = {
-    "D I": "DI",
-    " F E ": " FE ",
-    " X T ": " XT ",
-    "M F": "MF",
-    "J D": "JD",
-}
-
-# Known brands
-BRANDS = [
-    "swaraj", "mahindra", "john deere",
-    "sonalika", "eicher", "escorts",
-    "new holland", "kubota",
-    "massey ferguson", "mf", "jd"
+# Lines that never carry the model (matched on the lowercased line)
+EXCLUDED_LINE_KEYWORDS = [
+    "gst", "invoice", "quotation", "total",
+    "amount", "price", "bank", "signature",
+    "customer", "party", "terms"
 ]
 
+CORE_BLACKLIST_MATCHER = KeywordMatcher(MODEL_CORE_BLACKLIST)
+EXCLUDED_LINE_MATCHER = KeywordMatcher(EXCLUDED_LINE_KEYWORDS)
+
 
 class ModelNameResolver:
-    def __init__(self, score_threshold=0.5):
+    """
+    Model codes (e.g. "744 FE") from table rows and lines, scored by table
+    context, alphanumeric density, position and OCR confidence. Like
+    DealerNameResolver, lines are visited highest score bound first, the
+    regex extraction is skipped for lines that cannot reach the `top_k`
+    best, and those come back as "alternatives".
+    """
+
+    def __init__(self, score_threshold=0.5, top_k=5):
         self.score_threshold = score_threshold
+        self.top_k = top_k
 
-    def resolve(self, blocks, page_height):
-        candidates = self._generate_candidates(blocks, page_height)
+    def resolve(self, page):
+        bounds = [
+            self._score_bound(page.first_y[li], page.max_conf[li], page.page_height,
+                              page.block_is_table[page.line_pos[li][0]])
+            for li in range(len(page.text))
+        ]
 
-        if not candidates:
-            return {
-                "model_name": None,
-                "confidence": 0.0,
-                "reason": "no_candidates"
-            }
+        top = TopK(self.top_k)
+        num_candidates = visited = 0
+        for li in sorted(range(len(bounds)), key=bounds.__getitem__, reverse=True):
+            if not top.admits(bounds[li]):
+                break
+            visited += 1
+
+            c = self._line_candidate(page, li)
+            if c is None:
+                continue
+            num_candidates += 1
 
-        scored = []
-        for c in candidates:
             score = self._score_candidate(
                 text=c["text"],
-                bbox=c["bbox"],
+                y_center=c["y_center"],
                 confidence=c["confidence"],
-                page_height=page_height,
-                block_id=c["block_id"],
-                line_id=c["line_id"],
-                raw_line=c["raw_line"],
-                blocks=blocks
+                page_height=page.page_height,
+                is_table=c["is_table"],
+                is_table_row=c["is_table_row"]
             )
-            scored.append({**c, "score": score})
+            top.push(score, (li,), c["text"], {
+                "model_name": c["text"],
+                "original_text": c["raw_line"],
+                "score": score
+            })
+
+        ranking = {
+            "num_candidates": num_candidates,
+            "num_pruned": len(bounds) - visited,
+            "alternatives": top.items()
+        }
+        best = top.best()
 
-        best = max(scored, key=lambda x: x["score"])
+        if best is None:
+            return {
+                "model_name": None,
+                "confidence": 0.0,
+                "reason": "no_candidates",
+                **ranking
+            }
 
         if best["score"] < self.score_threshold:
             return {
                 "model_name": None,
                 "confidence": round(best["score"], 2),
-                "reason": "low_confidence"
+                "reason": "low_confidence",
+                **ranking
             }
 
         return {
-            "model_name": best["text"],
+            "model_name": best["model_name"],
             "confidence": round(best["score"], 2),
             "reason": "heuristic_match",
-            "original_text": best["raw_line"]
+            "original_text": best["original_text"],
+            **ranking
         }
 
     # ------------------------------------------------------------------
 
-    def _generate_candidates(self, blocks, page_height):
-        candidates = []
-
-        for block_id, block in enumerate(blocks):
-            is_table = self._is_table_like_block(block)
-
-            for line_id, line in enumerate(block):
-                raw_text = " ".join(tok["text"] for tok in line).strip()
-                if len(raw_text) < 5:
-                    continue
-
-                if self._is_excluded_line(raw_text):
-                    continue
+    def _line_candidate(self, page, li):
+        raw_text = page.text[li].strip()
+        if len(raw_text) < 5:
+            return None
 
-                # Try extracting from table rows
-                span = self._extract_model_from_table_row(raw_text) if is_table else raw_text
-                core = self._extract_model_core(span)
+        if self._is_excluded_line(page.text_lower[li]):
+            return None
 
-                if not core:
-                    continue
+        block_id, line_id = page.line_pos[li]
+        is_table = page.block_is_table[block_id]
 
-                bbox = line[0]["bbox"]
-                conf = max(tok.get("confidence", 0.0) for tok in line)
+        # Try extracting from table rows (also reused as a scoring signal)
+        table_span = self._extract_model_from_table_row(raw_text)
+        span = table_span if is_table else raw_text
+        core = self._extract_model_core(span)
 
-                candidates.append({
-                    "text": core,
-                    "raw_line": raw_text,
-                    "bbox": bbox,
-                    "confidence": conf,
-                    "block_id": block_id,
-                    "line_id": line_id
-                })
+        if not core:
+            return None
 
-        return candidates
+        return {
+            "text": core,
+            "raw_line": raw_text,
+            "y_center": page.first_y[li],
+            "confidence": page.max_conf[li],
+            "block_id": block_id,
+            "line_id": line_id,
+            "is_table": is_table,
+            "is_table_row": table_span is not None
+        }
 
     # ------------------------------------------------------------------
 
     def _extract_model_from_table_row(self, text):
         text = text.upper()
 
-        patterns = [
-            r'\b(?:SWARAJ|MAHINDRA|MF|JD)\s*\d{3,4}\s*[A-Z]{1,3}\b',
-            r'\b\d{3,4}\s*[A-Z]{1,3}\b'
-        ]
-
-        for p in patterns:
-            m = re.search(p, text)
+        for pattern in MODEL_TABLE_ROW:
+            m = pattern.search(text)
             if m:
                 return m.group(0)
 
@@ -131,77 +151,54 @@ class ModelNameResolver:
         text = text.upper()
 
         # Kill obvious non-model words
-        blacklist = [
-            "ADDRESS", "IFSC", "BANK", "DATE", "FOR",
-            "TOTAL", "AMOUNT", "HDFC", "GST"
-        ]
-        if any(b in text for b in blacklist):
+        if CORE_BLACKLIST_MATCHER.search(text):
             return None
 
         # Remove config noise
-        text = re.sub(
-            r'\b(HP|WD|CYLINDER|CATG|TRACTOR|PTO|TYRE|SIZE|X)\b',
-            '',
-            text
-        )
-
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = collapse_spaces(MODEL_NOISE.sub("", text))
 
         # Reject if no digits after cleanup
-        if not re.search(r'\d', text):
+        if not DIGIT.search(text):
             return None
 
         # Canonical formatting - remove brand prefixes
-        text = re.sub(r'^(SWARAJ|MAHINDRA|MF|JD)\s+', '', text)
+        text = MODEL_BRAND_PREFIX.sub("", text)
 
-        # STRICT model core patterns
-        patterns = [
-            r'\b(?:MF|SWARAJ|MAHINDRA|JD)?\s*\d{3,4}\s*[A-Z]{1,3}\b'
-        ]
-
-        for p in patterns:
-            m = re.search(p, text)
-            if m:
-                return m.group(0).strip()
+        # STRICT model core pattern
+        m = MODEL_CORE.search(text)
+        if m:
+            return m.group(0).strip()
 
         return None
 
     # ------------------------------------------------------------------
 
-    def _is_excluded_line(self, text):
-        text_l = text.lower()
-        blacklist = [
-            "gst", "invoice", "quotation", "total",
-            "amount", "price", "bank", "signature",
-            "customer", "party", "terms"
-        ]
-        return any(b in text_l for b in blacklist)
+    def _is_excluded_line(self, text_l):
+        return EXCLUDED_LINE_MATCHER.search(text_l)
 
     # ------------------------------------------------------------------
 
-    def _is_table_like_block(self, block):
-        if len(block) < 2:
-            return False
-
-        xs = []
-        for line in block:
-            for tok in line:
-                x = sum(p[0] for p in tok["bbox"]) / 4
-                xs.append(int(x // 50))
-
-        return len(set(xs)) >= 2
-
-    # ------------------------------------------------------------------
+    def _score_bound(self, y_center, confidence, page_height, is_table):
+        # _score_candidate for a table-row span of full alphanumeric density
+        vr = y_center / page_height
+        return min(
+            (0.30 if is_table else 0.0)
+            + 0.15
+            + 0.25
+            + max(0, 1 - abs(vr - 0.5) * 2) * 0.25
+            + min(confidence, 0.85) * 0.20,
+            1.0
+        )
 
-    def _score_candidate(self, text, bbox, confidence, page_height, block_id, line_id, raw_line, blocks):
+    def _score_candidate(self, text, y_center, confidence, page_height, is_table, is_table_row):
         score = 0.0
 
         # Table context
-        if self._is_table_like_block(blocks[block_id]):
+        if is_table:
             score += 0.30
 
         # Strong boost if extracted from table row
-        if self._extract_model_from_table_row(raw_line):
+        if is_table_row:
             score += 0.15
 
         # Alphanumeric density
@@ -209,8 +206,7 @@ class ModelNameResolver:
         score += min(density, 1.0) * 0.25
 
         # Position (middle of page)
-        y = sum(p[1] for p in bbox) / 4
-        vr = y / page_height
+        vr = y_center / page_height
         score += max(0, 1 - abs(vr - 0.5) * 2) * 0.25
 
         # OCR confidence
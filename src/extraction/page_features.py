@@ -0,0 +1,99 @@
+import numpy as np
+
+from src.layout.block_grouping import is_table_like_block
+from src.utils.text_normalize import normalize_text
+
+
+class PageFeatures:
+    """
+    Per-page features shared by every field resolver.
+
+    Built once from the TokenTable and the block/line layout, so adding a
+    resolver does not add another pass of joining, lowercasing, center or
+    table-likeness computation over the page.
+
+    Lines are addressed by a flat index `li` (page reading order);
+    `line_pos[li]` gives back (block_id, line_id) and `block_lines[b]` the
+    flat indices of block `b`.
+    """
+
+    def __init__(self, table, blocks, page_width, page_height):
+        self.table = table
+        self.blocks = blocks
+        self.page_width = page_width
+        self.page_height = page_height
+
+        self.lines = []
+        self.line_pos = []
+        self.block_lines = []
+        for block_id, block in enumerate(blocks):
+            start = len(self.lines)
+            for line_id, line in enumerate(block):
+                self.lines.append(line)
+                self.line_pos.append((block_id, line_id))
+            self.block_lines.append(range(start, len(self.lines)))
+
+        # Line text
+        self.text = [table.line_text(line) for line in self.lines]
+        self.text_lower = [t.lower() for t in self.text]
+
+        # Line geometry / confidence: one segmented reduction over all lines
+        lengths = np.array([len(line) for line in self.lines], dtype=np.int64)
+        rows = np.array([row for line in self.lines for row in line], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        if len(rows):
+            self.center_x = (np.add.reduceat(table.x_center[rows], starts) / lengths).tolist()
+            self.center_y = (np.add.reduceat(table.y_center[rows], starts) / lengths).tolist()
+            self.first_y = table.y_center[rows[starts]].tolist()
+            self.max_conf = np.maximum.reduceat(table.conf[rows], starts).tolist()
+        else:
+            self.center_x = self.center_y = self.first_y = self.max_conf = []
+
+        # Block structure
+        self.block_is_table = [self._is_table_like_block(block) for block in blocks]
+
+        self._text_upper = None
+        self._text_normalized = None
+        self._token_text_lower = None
+        self._keyword_hits = {}
+
+    # ------------------------------------------------------------
+    # Lazily derived text views
+    # ------------------------------------------------------------
+
+    @property
+    def text_upper(self):
+        if self._text_upper is None:
+            self._text_upper = [t.upper() for t in self.text]
+        return self._text_upper
+
+    @property
+    def text_normalized(self):
+        if self._text_normalized is None:
+            self._text_normalized = [normalize_text(t) for t in self.text]
+        return self._text_normalized
+
+    @property
+    def token_text_lower(self):
+        if self._token_text_lower is None:
+            self._token_text_lower = [t.lower() for t in self.table.text]
+        return self._token_text_lower
+
+    def keyword_hits(self, matcher):
+        """
+        Per-line {keyword: first position} hits of a KeywordMatcher over the
+        lowercased line text. Cached per matcher, so every resolver asking
+        for the same dictionary shares one pass.
+        """
+        hits = self._keyword_hits.get(matcher)
+        if hits is None:
+            hits = [matcher.hits(text) for text in self.text_lower]
+            self._keyword_hits[matcher] = hits
+        return hits
+
+    # ------------------------------------------------------------
+    # Geometry helpers
+    # ------------------------------------------------------------
+
+    def _is_table_like_block(self, block):
+        return is_table_like_block(self.table, block)
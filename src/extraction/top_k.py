@@ -0,0 +1,58 @@
+"""
+Top-K Module
+Bounded best-k candidate heap shared by the field resolvers
+
+Resolvers visit lines in decreasing order of a cheap upper bound on the
+score any candidate from that line can get, and stop once that bound can
+no longer reach the heap (`admits(bound)` is False): the remaining lines
+are neither parsed nor scored.
+
+Ties rank by `order` (a tuple, smaller = earlier on the page), so the best
+candidate is the one max() over all candidates in page order would have
+picked, whatever order they were pushed in. Keys are kept distinct: a
+value seen on several lines appears once, with its best score.
+"""
+import heapq
+
+# Scores are rounded to 3 decimals after the bounds are taken
+BOUND_SLACK = 1e-3
+
+
+class TopK:
+
+    def __init__(self, k=5):
+        self.k = max(1, k)
+        self._heap = []    # (score, negated order, key, item); root = worst kept
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def admits(self, bound):
+        """Could a candidate scoring at most `bound` still be kept?"""
+        return len(self._heap) < self.k or bound + BOUND_SLACK >= self._heap[0][0]
+
+    def push(self, score, order, key, item):
+        entry = (score, tuple(-i for i in order), key, item)
+
+        current = self._entries.get(key)
+        if current is not None:
+            if entry[:2] <= current[:2]:
+                return
+            # Same key, better score: drop the old entry (k is small)
+            self._heap.remove(current)
+            heapq.heapify(self._heap)
+        elif len(self._heap) >= self.k:
+            if entry[:2] <= self._heap[0][:2]:
+                return
+            del self._entries[heapq.heappop(self._heap)[2]]
+
+        heapq.heappush(self._heap, entry)
+        self._entries[key] = entry
+
+    def best(self):
+        return max(self._heap, key=lambda entry: entry[:2])[3] if self._heap else None
+
+    def items(self):
+        """Kept items, best first."""
+        return [entry[3] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
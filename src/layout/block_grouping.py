@@ -1,3 +1,11 @@
+import numpy as np
+
+from src.utils.keyword_matcher import KeywordMatcher
+
+# Tokens whose x-centers fall in different bins of this width are treated
+# as separate columns by the table-like checks
+COLUMN_BIN = 50
+
 BLOCK_BREAK_KEYWORDS = [
     "S.N.",
     "Particulars",
@@ -8,26 +16,109 @@ BLOCK_BREAK_KEYWORDS = [
     "Customer Signature"
 ]
 
-def contains_block_break(line):
-    text = " ".join(t["text"].lower() for t in line)
-    return any(k.lower() in text for k in BLOCK_BREAK_KEYWORDS)
+BLOCK_BREAK_MATCHER = KeywordMatcher([k.lower() for k in BLOCK_BREAK_KEYWORDS])
+
+# A vertical gap larger than this many mean line heights starts a new block
+BLOCK_GAP_FACTOR = 1.3
+
+def contains_block_break(table, line):
+    return BLOCK_BREAK_MATCHER.search(" ".join(table.text[line]).lower())
+
+def is_multi_column_line(table, line):
+    return len(line) >= 2 and len(np.unique(table.x_center[line] // COLUMN_BIN)) >= 2
+
+def is_table_like_block(table, block):
+    if len(block) < 2:
+        return False
+
+    rows = [row for line in block for row in line]
+    return len(np.unique(table.x_center[rows] // COLUMN_BIN)) >= 2
 
-def group_lines_into_blocks(lines):
-    blocks = []
-    current_block = [lines[0]]
+def line_stats(table, lines):
+    """
+    Per-line arrays for a list of lines: top (min y_min), bottom
+    (max y_max), mean token height and the block-break keyword flag.
+    One segmented reduction over all rows instead of one per line.
+    """
+    lengths = np.fromiter((len(line) for line in lines), dtype=np.int64, count=len(lines))
+    rows = np.fromiter((row for line in lines for row in line), dtype=np.int64,
+                       count=int(lengths.sum()))
+    starts = np.cumsum(lengths) - lengths
 
-    for prev, curr in zip(lines, lines[1:]):
-        prev_bottom = max(t["rect"]["y_max"] for t in prev)
-        curr_top = min(t["rect"]["y_min"] for t in curr)
+    top = np.minimum.reduceat(table.y_min[rows], starts)
+    bottom = np.maximum.reduceat(table.y_max[rows], starts)
+    mean_height = np.add.reduceat(table.heights[rows], starts) / lengths
+    return top, bottom, mean_height, _break_flags(table, lines)
 
-        gap = curr_top - prev_bottom
-        avg_height = sum(t["rect"]["height"] for t in prev) / len(prev)
+def _break_flags(table, lines):
+    # One keyword scan over the whole page: lines joined by newlines (no
+    # keyword spans one), matches mapped back to lines by offset
+    words = table.text.tolist()
+    texts = [" ".join([words[row] for row in line]).lower() for line in lines]
+    offsets = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
 
-        if gap > avg_height * 1.3 or contains_block_break(curr):
-            blocks.append(current_block)
-            current_block = [curr]
+    breaks = np.zeros(len(lines), dtype=bool)
+    hits = BLOCK_BREAK_MATCHER.starts("\n".join(texts))
+    breaks[np.searchsorted(offsets, hits, side="right") - 1] = True
+    return breaks
+
+def block_starts(top, bottom, mean_height, breaks):
+    """
+    Indices (>= 1) of the lines that open a new block: the gap to the line
+    above exceeds BLOCK_GAP_FACTOR x that line's mean token height, or the
+    line holds a block-break keyword.
+    """
+    gap = top[1:] - bottom[:-1]
+    return np.flatnonzero((gap > mean_height[:-1] * BLOCK_GAP_FACTOR) | breaks[1:]) + 1
+
+def group_lines_into_blocks(table, lines):
+    """Split the lines (in reading order) into blocks: lists of lines."""
+    if not lines:
+        return []
+
+    starts = block_starts(*line_stats(table, lines)).tolist()
+    return [lines[a:b] for a, b in zip([0] + starts, starts + [len(lines)])]
+
+def iter_blocks(table, lines, chunk_size=4096):
+    """
+    Streaming group_lines_into_blocks: takes any iterable of lines and
+    yields each block as soon as the next one opens, holding only one
+    chunk of lines plus the open block in memory. For long multi-page
+    documents whose lines are produced incrementally.
+    """
+    current = []    # open block, carried across chunks
+    last = None     # stats of its last line
+
+    lines = iter(lines)
+    while True:
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == chunk_size:
+                break
+        if not chunk:
+            break
+
+        top, bottom, mean_height, breaks = line_stats(table, chunk)
+        if last is not None:
+            # Prepend the previous chunk's last line so its gap is tested too
+            top = np.concatenate(([last[0]], top))
+            bottom = np.concatenate(([last[1]], bottom))
+            mean_height = np.concatenate(([last[2]], mean_height))
+            breaks = np.concatenate(([False], breaks))
+            offset = 1
         else:
-            current_block.append(curr)
+            offset = 0
+
+        prev = 0
+        for start in (block_starts(top, bottom, mean_height, breaks) - offset).tolist():
+            current.extend(chunk[prev:start])
+            if current:
+                yield current
+            current = []
+            prev = start
+        current.extend(chunk[prev:])
+        last = (top[-1], bottom[-1], mean_height[-1])
 
-    blocks.append(current_block)
-    return blocks
+    if current:
+        yield current
@@ -0,0 +1,65 @@
+"""
+Column Index Module
+Binary-search lookups of TokenTable rows by x-center (columns) and y-center
+
+Table extractors ask "which tokens sit in this column?" and "which token of
+this column is level with that label?" many times per page. The index
+sorts the rows by x-center once; a column is then a slice found with two
+searchsorted calls (O(log n + k)) and comes back sorted by y-center, so the
+row level with a given y is one more binary search.
+"""
+import numpy as np
+
+
+class ColumnIndex:
+
+    def __init__(self, table, rows=None):
+        """Index every row of `table`, or only `rows` (e.g. numeric tokens)."""
+        self.table = table
+        rows = np.arange(len(table)) if rows is None else np.asarray(rows, dtype=np.int64)
+        x = table.x_center[rows]
+        order = np.argsort(x, kind="stable")
+        self.rows = rows[order]
+        self.x = x[order]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def rows_between(self, x_min, x_max):
+        """Rows with x_min <= x-center <= x_max, sorted by x-center."""
+        lo = np.searchsorted(self.x, x_min, side="left")
+        hi = np.searchsorted(self.x, x_max, side="right")
+        return self.rows[lo:hi]
+
+    def column(self, x, tolerance):
+        """Rows within `tolerance` of x-center `x`, sorted by y-center."""
+        rows = self.rows_between(x - tolerance, x + tolerance)
+        return rows[np.argsort(self.table.y_center[rows], kind="stable")]
+
+    def densest_column(self, tolerance):
+        """
+        x-center with the most indexed rows within `tolerance` of it (the
+        rightmost on ties, where amount columns sit) and that count; (None,
+        0) when the index is empty.
+        """
+        if not len(self.rows):
+            return None, 0
+        counts = (np.searchsorted(self.x, self.x + tolerance, side="right")
+                  - np.searchsorted(self.x, self.x - tolerance, side="left"))
+        best = len(counts) - 1 - int(np.argmax(counts[::-1]))
+        return float(self.x[best]), int(counts[best])
+
+    def nearest_in_column(self, column_rows, y, tolerance):
+        """
+        Row of `column_rows` (sorted by y-center, as column() returns them)
+        closest to y-center `y`, or None when none is within `tolerance`.
+        """
+        if not len(column_rows):
+            return None
+        ys = self.table.y_center[column_rows]
+        i = int(np.searchsorted(ys, y))
+        best = min(
+            (j for j in (i - 1, i) if 0 <= j < len(ys)),
+            key=lambda j: abs(ys[j] - y)
+        )
+        return int(column_rows[best]) if abs(ys[best] - y) <= tolerance else None
@@ -1,34 +1,68 @@
-def vertical_overlap(a, b):
-    top = max(a["y_min"], b["y_min"])
-    bottom = min(a["y_max"], b["y_max"])
-    overlap = max(0, bottom - top)
-    return overlap / min(a["height"], b["height"])
+from bisect import bisect_right
 
+# Slack for float rounding in the search-window bound (pixels)
+_EPS = 1e-6
 
-def group_tokens_into_lines(tokens):
-    tokens = sorted(tokens, key=lambda t: t["rect"]["y_center"])
+
+def group_tokens_into_lines(table):
+    """
+    Group the rows of a TokenTable into lines (lists of row indices, each
+    sorted left-to-right).
+
+    Sweep over tokens sorted by y_center. A token joins the first line (in
+    creation order) whose reference token -- the line's first token --
+    vertically overlaps it by > 0.5 or whose center is within 0.6 * height.
+
+    Line references are created in y_center order, so they form a sorted
+    index. A reference can only match if its center lies above
+        min(token.y_min - max_h, token.y_center - 0.6 * max_h)
+    (max_h = tallest reference so far), because y_max <= y_center + height.
+    Everything before that bound is skipped with one bisect instead of being
+    rechecked, which keeps grouping ~O(n log n) instead of O(n * lines).
+    """
+    # Plain Python floats: scalar access on lists beats per-element numpy
+    y_min = table.y_min.tolist()
+    y_max = table.y_max.tolist()
+    y_center = table.y_center.tolist()
+    height = table.heights.tolist()
+    x_min = table.x_min.tolist()
+
+    order = sorted(range(len(y_center)), key=y_center.__getitem__)
     lines = []
+    ref_centers = []
+    ref_rows = []
+    max_ref_height = 0.0
+
+    for row in order:
+        top, bottom, center, h = y_min[row], y_max[row], y_center[row], height[row]
+
+        lower = min(top - max_ref_height, center - 0.6 * max_ref_height) - _EPS
 
-    for token in tokens:
         placed = False
-        for line in lines:
-            ref = line[0]["rect"]
+        for i in range(bisect_right(ref_centers, lower), len(lines)):
+            ref = ref_rows[i]
 
-            if vertical_overlap(token["rect"], ref) > 0.5:
-                line.append(token)
+            # vertical overlap ratio > 0.5
+            overlap = max(0, min(bottom, y_max[ref]) - max(top, y_min[ref]))
+            if overlap / min(h, height[ref]) > 0.5:
+                lines[i].append(row)
                 placed = True
                 break
 
-            if abs(token["rect"]["y_center"] - ref["y_center"]) < ref["height"] * 0.6:
-                line.append(token)
+            # or centers within 0.6 * reference height
+            if abs(center - y_center[ref]) < height[ref] * 0.6:
+                lines[i].append(row)
                 placed = True
                 break
 
         if not placed:
-            lines.append([token])
+            lines.append([row])
+            ref_centers.append(center)
+            ref_rows.append(row)
+            max_ref_height = max(max_ref_height, h)
 
     # sort tokens left-to-right within each line
     for line in lines:
-        line.sort(key=lambda t: t["rect"]["x_min"])
+        line.sort(key=x_min.__getitem__)
 
     return lines
@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.layout.block_grouping import group_lines_into_blocks, is_multi_column_line
+from src.layout.line_grouping import group_tokens_into_lines
+
+# Top of the page holding the dealer header
+HEADER_FRACTION = 0.3
+
+def select_regions(table, page_height, header_fraction=HEADER_FRACTION):
+    """
+    Rows of a detection-only TokenTable (boxes, no text yet) worth
+    recognizing: the header band, plus every block with a multi-column
+    line (the model/HP table, its totals row, label: value rows). Running
+    prose such as terms and conditions is skipped.
+
+    Text is not known yet, so blocks split on vertical gaps only.
+    """
+    if not len(table):
+        return np.empty(0, dtype=np.intp)
+
+    keep = table.y_min < header_fraction * page_height
+
+    lines = group_tokens_into_lines(table)
+    for block in group_lines_into_blocks(table, lines):
+        if any(is_multi_column_line(table, line) for line in block):
+            keep[[row for line in block for row in line]] = True
+
+    return np.flatnonzero(keep)
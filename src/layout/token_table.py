@@ -0,0 +1,99 @@
+import sys
+import numpy as np
+
+from src.utils.geometry import as_quads, quads_to_rects, quad_centers, rect_heights
+
+
+class TokenTable:
+    """
+    Columnar store for the OCR tokens of one page.
+
+    Layout, line/block grouping and the resolvers address tokens by row
+    index; lines are lists of rows and blocks are lists of lines.
+
+    Columns:
+        quads    (N, 4, 2) float64  OCR polygon
+        rects    (N, 4)    float64  x_min, y_min, x_max, y_max
+        centers  (N, 2)    float64  x_center, y_center (mean of the 4 corners)
+        heights  (N,)      float64  y_max - y_min
+        conf     (N,)      float64  OCR confidence
+        text     (N,)      object   interned token strings
+    """
+
+    def __init__(self, texts, quads, confidences):
+        # Whole-page geometry in one batched pass
+        self.quads = as_quads(quads)
+        self.rects = quads_to_rects(self.quads)
+        self.centers = quad_centers(self.quads)
+        self.heights = rect_heights(self.rects)
+
+        self.conf = np.asarray(confidences, dtype=np.float64)
+
+        self.text = np.empty(len(texts), dtype=object)
+        self.text[:] = [sys.intern(t) for t in texts]
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        """Build from the list of dicts returned by OCREngine.run."""
+        return cls(
+            texts=[tok["text"] for tok in tokens],
+            quads=[tok["bbox"] for tok in tokens] or np.empty((0, 4, 2)),
+            confidences=[tok.get("confidence", 0.0) for tok in tokens]
+        )
+
+    def __len__(self):
+        return len(self.text)
+
+    # ------------------------------------------------------------
+    # Column views
+    # ------------------------------------------------------------
+
+    @property
+    def x_min(self):
+        return self.rects[:, 0]
+
+    @property
+    def y_min(self):
+        return self.rects[:, 1]
+
+    @property
+    def x_max(self):
+        return self.rects[:, 2]
+
+    @property
+    def y_max(self):
+        return self.rects[:, 3]
+
+    @property
+    def x_center(self):
+        return self.centers[:, 0]
+
+    @property
+    def y_center(self):
+        return self.centers[:, 1]
+
+    # ------------------------------------------------------------
+    # Row helpers
+    # ------------------------------------------------------------
+
+    def line_text(self, rows):
+        return " ".join(self.text[rows]) if len(rows) else ""
+
+    def token(self, row):
+        """Dict view of one row (debugging / JSON output)."""
+        x_min, y_min, x_max, y_max = self.rects[row].tolist()
+        x_center, y_center = self.centers[row].tolist()
+        return {
+            "text": self.text[row],
+            "bbox": self.quads[row].tolist(),
+            "confidence": float(self.conf[row]),
+            "rect": {
+                "x_min": x_min,
+                "y_min": y_min,
+                "x_max": x_max,
+                "y_max": y_max,
+                "x_center": x_center,
+                "y_center": y_center,
+                "height": y_max - y_min
+            }
+        }
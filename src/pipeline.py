@@ -1,17 +1,189 @@
+from src.preprocessing.memory import MemoryBudget
 from src.preprocessing.preprocess import Preprocessor
+from src.extraction.dealer_name import DealerNameResolver
+from src.extraction.model_name import ModelNameResolver
+from src.extraction.hp import HPResolver
+from src.candidates.cost import CostCandidateExtractor
+from src.extraction.page_features import PageFeatures
+from src.layout.line_grouping import group_tokens_into_lines
+from src.layout.block_grouping import group_lines_into_blocks
+from src.layout.token_table import TokenTable
+from src.reasoning.cost_reasoner import CostReasoner
+from src.reasoning.document_gate import is_rejected
+from src.utils.constants import DEALER_MASTER_CSV, ASSET_MASTER_CSV, MASTER_INDEX_DIR
+from src.utils.fuzzy_match import MasterIndex
+from src.utils.telemetry import NULL_TRACE, new_trace
+import os
+
 
 class Pipeline:
-    def __init__(self):
-        self.preprocessor = Preprocessor()
+    """
+    Single-page extraction: preprocess + OCR, layout, field resolvers.
+
+    Build it once and call run() per page so the OCR model is only
+    loaded one time per process.
+
+    With telemetry=True each result carries a "trace": per-stage timings
+    (load, normalize, ocr, layout, each resolver, master matching) and
+    counters (tokens, lines, blocks, candidates per field).
+
+    memory_budget_mb caps this worker's resident memory: over it, reusable
+    buffers are dropped and freed memory is returned to the OS after each
+    page (see src/preprocessing/memory.py).
+    """
+
+    def __init__(self, preprocessor=None, master_matching=True, telemetry=False,
+                 memory_budget_mb=None, **preprocess_options):
+        self.preprocessor = preprocessor or Preprocessor(**preprocess_options)
+        self.telemetry = telemetry
+
+        self.memory_budget = None
+        if memory_budget_mb:
+            self.memory_budget = MemoryBudget(memory_budget_mb)
+            self.memory_budget.on_trim(self.preprocessor.normalizer.release_buffers)
+        self.dealer_resolver = DealerNameResolver()
+        self.model_resolver = ModelNameResolver()
+        self.hp_resolver = HPResolver()
+        self.cost_extractor = CostCandidateExtractor()
+        self.cost_reasoner = CostReasoner()
+
+        # Master data lookups (memory-mapped, shared across workers)
+        self.dealer_index = None
+        self.asset_index = None
+        if master_matching:
+            self.dealer_index = MasterIndex.load_or_build(
+                DEALER_MASTER_CSV, ["dealer_name"],
+                os.path.join(MASTER_INDEX_DIR, "dealer")
+            )
+            self.asset_index = MasterIndex.load_or_build(
+                ASSET_MASTER_CSV, ["make", "model"],
+                os.path.join(MASTER_INDEX_DIR, "asset")
+            )
+
+    def new_trace(self):
+        return new_trace(self.telemetry)
 
     def run(self, image_path):
-        preprocess_result = self.preprocessor.run(image_path)
+        trace = self.new_trace()
+
+        # Step 1: Preprocess
+        result = self.preprocessor.run(image_path, trace)
+
+        output = self.extract(result, image_path, trace=trace)
+        del result
+        if self.memory_budget is not None:
+            self.memory_budget.after_page()
+        if trace.enabled:
+            output["trace"] = trace.to_dict()
+        return output
+
+    def extract(self, result, image_path, ocr_engine=None, trace=NULL_TRACE):
+        """
+        Layout + field extraction on a preprocessed page. Pages the document
+        gate rejected come back with status "rejected". With ROI OCR, a
+        page missing any field gets its skipped text boxes recognized too
+        and is extracted again.
+        """
+        if is_rejected(result.get("gate")):
+            # Not a quotation: no layout, no resolvers
+            return {
+                "status": "rejected",
+                "image": image_path,
+                "ocr_cache_hit": result.get("cache_hit", False),
+                "gate": result["gate"]
+            }
+
+        output = self._extract_fields(result, image_path, trace)
+
+        if result.get("pending") and not self._all_fields_found(output):
+            with trace.span("ocr_fallback"):
+                result = self.preprocessor.complete(result, ocr_engine)
+            output = self._extract_fields(result, image_path, trace)
+            output["ocr_fallback"] = True
 
-        ocr_tokens = preprocess_result["ocr"]
+        return output
 
-        return {
+    @staticmethod
+    def _all_fields_found(output):
+        return (
+            output["dealer_name_result"]["dealer_name"] is not None
+            and output["model_name_result"]["model_name"] is not None
+            and output["hp_result"]["hp"] is not None
+        )
+
+    def _extract_fields(self, result, image_path, trace=NULL_TRACE):
+        ocr_tokens = result["ocr"]
+
+        # Step 2: Layout processing (columnar token store, lines and blocks
+        # of row indices)
+        with trace.span("quad_to_rect"):
+            table = TokenTable.from_tokens(ocr_tokens)
+        with trace.span("line_grouping"):
+            lines = group_tokens_into_lines(table)
+        with trace.span("block_grouping"):
+            blocks = group_lines_into_blocks(table, lines)
+
+        # Page size comes from the preprocessor (the image itself is not
+        # available on an OCR cache hit)
+        image_height, image_width = result["page_size"]
+
+        # Step 3: Shared per-page features (text, centers, table flags,
+        # keyword hits) computed once for all resolvers
+        with trace.span("page_features"):
+            page = PageFeatures(table, blocks, image_width, image_height)
+
+        # Step 4: Dealer name extraction
+        with trace.span("dealer_resolver"):
+            dealer_result = self.dealer_resolver.resolve(page)
+
+        # Step 5: Model name extraction
+        with trace.span("model_resolver"):
+            model_result = self.model_resolver.resolve(page)
+
+        # Step 6: HP extraction
+        with trace.span("hp_resolver"):
+            hp_result = self.hp_resolver.resolve(page)
+
+        # Step 7: Match extracted names against the master data
+        with trace.span("master_match"):
+            if self.dealer_index is not None and dealer_result["dealer_name"]:
+                dealer_result["master_matches"] = self.dealer_index.query(
+                    dealer_result["dealer_name"], k=3
+                )
+            if self.asset_index is not None and model_result["model_name"]:
+                model_result["master_matches"] = self.asset_index.query(
+                    model_result["original_text"], k=3
+                )
+
+        # Step 8: Cost (after master matching: the matched asset's cost
+        # range is part of the evidence)
+        with trace.span("cost_resolver"):
+            cost_candidates = self.cost_extractor.extract(page)
+            cost_result = self.cost_reasoner.resolve(cost_candidates, model_result)
+
+        trace.count("tokens", len(ocr_tokens))
+        trace.count("lines", len(lines))
+        trace.count("blocks", len(blocks))
+        trace.count("dealer_name_candidates", dealer_result["num_candidates"])
+        trace.count("model_name_candidates", model_result["num_candidates"])
+        trace.count("hp_candidates", hp_result["num_candidates"])
+        trace.count("cost_candidates", cost_result["num_candidates"])
+
+        output = {
             "status": "ok",
+            "image": image_path,
+            "ocr_cache_hit": result.get("cache_hit", False),
+            "ocr_fallback": False,
             "num_ocr_tokens": len(ocr_tokens),
-            "sample_tokens": ocr_tokens[:10]
+            "num_lines": len(lines),
+            "num_blocks": len(blocks),
+            "dealer_name_result": dealer_result,
+            "model_name_result": model_result,
+            "hp_result": hp_result,
+            "cost_result": cost_result
         }
-
+        if result.get("visuals") is not None:
+            # Signature / stamp boxes (Preprocessor(detect_visuals=True))
+            output["visuals"] = result["visuals"]
+            trace.count("visuals", len(result["visuals"]))
+        return output
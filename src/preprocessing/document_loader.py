@@ -0,0 +1,97 @@
+"""
+Document Loader Module
+Multi-page inputs: PDFs rasterized one page at a time, on demand, and page
+images exploded offline (`<document>_pg<N>.png`) grouped back into
+documents.
+
+PDF support needs pypdfium2 (imported on first use).
+"""
+import hashlib
+import os
+import re
+import threading
+
+PDF_EXTENSIONS = {".pdf"}
+
+_PAGE_SUFFIX = re.compile(r"_pg(\d+)$", re.IGNORECASE)
+
+# PDFium is not thread-safe: one render at a time per process
+_PDFIUM_LOCK = threading.Lock()
+
+
+def is_pdf(path):
+    return os.path.splitext(path)[1].lower() in PDF_EXTENSIONS
+
+
+def document_id(path):
+    """'data/train/172427893_3_pg11.png' -> '172427893_3' (PDFs: file stem)."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem if is_pdf(path) else _PAGE_SUFFIX.sub("", stem)
+
+
+def page_number(path):
+    match = _PAGE_SUFFIX.search(os.path.splitext(os.path.basename(path))[0])
+    return int(match.group(1)) if match else 1
+
+
+def group_documents(paths):
+    """
+    [(document_id, [paths])] in first-seen order. Each PDF is its own
+    document; page images sharing a document id are grouped and sorted by
+    page number.
+    """
+    documents = {}
+    for path in paths:
+        key = ("pdf", path) if is_pdf(path) else ("pages", document_id(path))
+        documents.setdefault(key, []).append(path)
+
+    return [
+        (document_id(paths[0]), sorted(paths, key=page_number))
+        for paths in documents.values()
+    ]
+
+
+class PDFDocument:
+    """
+    Lazily rasterized PDF. pages() describes every page without rendering
+    anything; each page is rendered (as a BGR array, like cv2.imread) only
+    when its render callable is invoked, i.e. on an OCR cache miss.
+    """
+
+    def __init__(self, path, dpi=200):
+        import pypdfium2
+
+        self.path = path
+        self.dpi = dpi
+        with open(path, "rb") as f:
+            self.sha256 = hashlib.sha256(f.read()).hexdigest()
+        with _PDFIUM_LOCK:
+            self._pdf = pypdfium2.PdfDocument(path)
+            self._num_pages = len(self._pdf)
+
+    def __len__(self):
+        return self._num_pages
+
+    def render(self, index):
+        with _PDFIUM_LOCK:
+            bitmap = self._pdf[index].render(scale=self.dpi / 72)
+            # Copy out of PDFium's buffer before the bitmap is released
+            return bitmap.to_numpy().copy()
+
+    def pages(self):
+        """Page items for StagedPipeline.run: source name, number, renderer."""
+        return [
+            {
+                "path": f"{self.path}#{index + 1}",
+                "page": index + 1,
+                "render": lambda index=index: self.render(index),
+                # Identifies the rendered page for the OCR cache (file
+                # content + page + DPI), so warm pages are never rendered
+                "cache_data": f"{self.sha256}:{index}:{self.dpi}".encode()
+            }
+            for index in range(len(self))
+        ]
+
+    def close(self):
+        with _PDFIUM_LOCK:
+            self._pdf.close()
@@ -1,7 +1,30 @@
 import cv2 as cv
+import numpy as np
 
 def load_image(image_path: str):
     image = cv.imread(image_path)
     if image is None:
         raise ValueError(f"Could not load image: {image_path}")
     return image
+
+def read_image_bytes(image_path: str) -> bytes:
+    with open(image_path, "rb") as f:
+        return f.read()
+
+def decode_image(data: bytes, source: str = "<bytes>", grayscale: bool = False):
+    flags = cv.IMREAD_GRAYSCALE if grayscale else cv.IMREAD_COLOR
+    image = cv.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+    if image is None:
+        raise ValueError(f"Could not load image: {source}")
+    return image
+
+def to_gray(image):
+    """Single-channel view of a gray, BGR or BGRA image."""
+    if image.ndim == 2:
+        return image
+    code = cv.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv.COLOR_BGR2GRAY
+    return cv.cvtColor(image, code)
+
+def to_bgr(image):
+    """3-channel image for consumers that need one (PaddleOCR)."""
+    return cv.cvtColor(image, cv.COLOR_GRAY2BGR) if image.ndim == 2 else image
@@ -1,27 +1,152 @@
+import threading
+
 import cv2
 import numpy as np
 
+from src.utils.constants import NORMALIZE_PROFILES as PROFILES
+
+# Laplacian kernel for Immerkaer's fast noise-variance estimate
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+_NOISE_CROP = 1024
+
 class ImageNormalizer:
+    """
+    Grayscale + CLAHE + profile-dependent denoising. run() returns a
+    3-channel image (a fresh copy); with lean=True it returns the
+    single-channel result instead, written over the input's gray buffer.
+    """
+
+    def __init__(self, profile="quality", clip_limit=2.0, tile_grid_size=(8, 8),
+                 denoise_h=10, template_window_size=7, search_window_size=21,
+                 median_ksize=3, noise_threshold=3.0, lean=False):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown normalization profile: {profile}")
+
+        self.profile = profile
+        self.clip_limit = clip_limit
+        self.tile_grid_size = tuple(tile_grid_size)
+        self.denoise_h = denoise_h
+        self.template_window_size = template_window_size
+        self.search_window_size = search_window_size
+        self.median_ksize = median_ksize
+        self.noise_threshold = noise_threshold
+        self.lean = lean
+
+        # Lean mode: one denoising scratch buffer per thread, reused across pages
+        self._buffers = {}
+        self._buffers_lock = threading.Lock()
+
+    def config(self):
+        # Everything that changes the output image (used for OCR cache keys)
+        return {
+            "profile": self.profile,
+            "clip_limit": self.clip_limit,
+            "tile_grid_size": list(self.tile_grid_size),
+            "denoise_h": self.denoise_h,
+            "template_window_size": self.template_window_size,
+            "search_window_size": self.search_window_size,
+            "median_ksize": self.median_ksize,
+            "noise_threshold": self.noise_threshold
+        }
+
     def run(self, image):
+        if self.lean:
+            return self._run_lean(image)
+
+        enhanced = self.enhance(image)
+
+        # Denoising according to profile
+        denoised = self.denoise(enhanced)
+
+        # Convert back to 3-channel (OCR expects this)
+        final = cv2.cvtColor(denoised, cv2.COLOR_GRAY2BGR)
+
+        return final
+
+    def release_buffers(self):
+        """Drop the reusable scratch buffers (they are re-created on demand)."""
+        with self._buffers_lock:
+            self._buffers.clear()
+
+    def _run_lean(self, image):
+        """
+        run() without the intermediate copies: CLAHE and the median filter
+        work in place on the gray page, NL-means writes to the thread's
+        scratch buffer and is copied back. A BGR input costs one gray
+        conversion; a gray input is overwritten.
+        """
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        clahe = cv2.createCLAHE(clipLimit=self.clip_limit, tileGridSize=self.tile_grid_size)
+        clahe.apply(gray, dst=gray)
+
+        if self.profile == "fast":
+            cv2.medianBlur(gray, self.median_ksize, dst=gray)
+        elif self.profile == "quality" or self.estimate_noise(gray) >= self.noise_threshold:
+            scratch = self._scratch(gray.shape)
+            cv2.fastNlMeansDenoising(
+                gray, scratch,
+                h=self.denoise_h,
+                templateWindowSize=self.template_window_size,
+                searchWindowSize=self.search_window_size
+            )
+            np.copyto(gray, scratch)
+
+        return gray
+
+    def _scratch(self, shape):
+        size = shape[0] * shape[1]
+        key = threading.get_ident()
+        with self._buffers_lock:
+            buffer = self._buffers.get(key)
+            if buffer is None or buffer.size < size:
+                buffer = np.empty(size, dtype=np.uint8)
+                self._buffers[key] = buffer
+        return buffer[:size].reshape(shape)
+
+    def enhance(self, image):
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
         # Adaptive contrast enhancement
         clahe = cv2.createCLAHE(
-            clipLimit=2.0,
-            tileGridSize=(8, 8)
+            clipLimit=self.clip_limit,
+            tileGridSize=self.tile_grid_size
         )
-        enhanced = clahe.apply(gray)
+        return clahe.apply(gray)
+
+    def denoise(self, gray):
+        if self.profile == "fast":
+            return cv2.medianBlur(gray, self.median_ksize)
+
+        if self.profile == "auto" and self.estimate_noise(gray) < self.noise_threshold:
+            return gray
 
         # Light denoising (safe for text)
-        denoised = cv2.fastNlMeansDenoising(
-            enhanced,
-            h=10,
-            templateWindowSize=7,
-            searchWindowSize=21
+        return cv2.fastNlMeansDenoising(
+            gray,
+            h=self.denoise_h,
+            templateWindowSize=self.template_window_size,
+            searchWindowSize=self.search_window_size
         )
 
-        # Convert back to 3-channel (OCR expects this)
-        final = cv2.cvtColor(denoised, cv2.COLOR_GRAY2BGR)
+    def estimate_noise(self, gray):
+        """
+        Noise sigma (grey levels) from the Laplacian residual, ignoring
+        pixels near edges so the text strokes themselves do not count as
+        noise. Measured on a central crop of at most _NOISE_CROP pixels
+        square (cropped, not resized: downscaling would average the noise
+        away), so the cost is bounded at a few tens of ms per page.
+        """
+        h, w = gray.shape[:2]
+        top, left = max(0, (h - _NOISE_CROP) // 2), max(0, (w - _NOISE_CROP) // 2)
+        gray = gray[top:top + _NOISE_CROP, left:left + _NOISE_CROP]
 
-        return final
+        residual = np.abs(cv2.filter2D(gray, cv2.CV_32F, _NOISE_KERNEL))
+
+        edges = cv2.dilate(cv2.Canny(gray, 100, 200), np.ones((3, 3), np.uint8))
+        flat = residual[edges == 0]
+        if flat.size == 0:
+            return 0.0
+
+        return float(np.sqrt(np.pi / 2) * flat.mean() / 6)
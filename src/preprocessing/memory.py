@@ -0,0 +1,85 @@
+"""
+Memory Module
+Resident-memory budget for one worker process.
+
+    after_page()     called once a page is finished: over budget, the
+                     registered buffers are dropped and freed heap is handed
+                     back to the OS (gc + glibc malloc_trim)
+    admit()/done()   admission control where several pages are in flight
+                     (StagedPipeline): admit() holds a new page back while
+                     RSS is over budget and other pages are still in flight
+
+RSS is read from /proc/self/statm; elsewhere the budget is inactive.
+"""
+import ctypes
+import gc
+import os
+import threading
+
+_PAGE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb():
+    """Current resident set size in MB (None when it cannot be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_BYTES / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _malloc_trim():
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MemoryBudget:
+
+    def __init__(self, limit_mb, poll_s=0.05):
+        self.limit_mb = limit_mb
+        self.poll_s = poll_s
+        self.trims = 0
+        self._release = []
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def on_trim(self, release):
+        """Register a callable that frees reusable buffers."""
+        self._release.append(release)
+
+    def over(self):
+        rss = rss_mb()
+        return rss is not None and rss > self.limit_mb
+
+    def trim(self):
+        for release in self._release:
+            release()
+        gc.collect()
+        _malloc_trim()
+        self.trims += 1
+
+    def after_page(self):
+        if self.over():
+            self.trim()
+
+    def admit(self):
+        with self._cond:
+            while self._in_flight > 0 and self.over():
+                self._cond.wait(self.poll_s)
+            self._in_flight += 1
+
+    def done(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+        self.after_page()
+
+    def stats(self):
+        rss = rss_mb()
+        return {
+            "limit_mb": self.limit_mb,
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "trims": self.trims
+        }
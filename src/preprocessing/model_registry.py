@@ -0,0 +1,68 @@
+"""
+Model Registry Module
+Lazily loads heavy models (PaddleOCR pipeline and modules, YOLO) once per process and shares them
+
+Nothing heavy is imported or loaded until a model is first requested, so
+importing the pipeline modules (and `run_pipeline.py --help`) stays cheap.
+Instances are keyed by model name + settings + slot: callers with the same
+settings share one instance, while threads that must not share a predictor
+(the staged pipeline's OCR workers) ask for different slots.
+"""
+import threading
+
+_models = {}
+_lock = threading.Lock()
+
+
+def _load_paddleocr(lang="en", use_textline_orientation=True):
+    from paddleocr import PaddleOCR
+    return PaddleOCR(
+        use_textline_orientation=use_textline_orientation,
+        lang=lang
+    )
+
+
+def _load_text_detection(model_name=None):
+    from paddleocr import TextDetection
+    return TextDetection(model_name=model_name) if model_name else TextDetection()
+
+
+def _load_text_recognition(model_name=None):
+    from paddleocr import TextRecognition
+    return TextRecognition(model_name=model_name) if model_name else TextRecognition()
+
+
+def _load_yolo(model_path):
+    from ultralytics import YOLO
+    return YOLO(model_path)
+
+
+LOADERS = {
+    "paddleocr": _load_paddleocr,
+    "text_detection": _load_text_detection,
+    "text_recognition": _load_text_recognition,
+    "yolo": _load_yolo,
+}
+
+
+def get_model(name, slot=0, **settings):
+    key = (name, slot, tuple(sorted(settings.items())))
+
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = LOADERS[name](**settings)
+                _models[key] = model
+    return model
+
+
+def is_loaded(name):
+    return any(key[0] == name for key in _models)
+
+
+def clear():
+    """Drop every cached model (tests / memory pressure)."""
+    with _lock:
+        _models.clear()
@@ -0,0 +1,160 @@
+"""
+OCR Cache Module
+Persistent, content-addressed cache of OCR token lists
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Bump when the token format or preprocessing semantics change
+CACHE_VERSION = 1
+
+
+class OCRCache:
+    """
+    On-disk cache in front of normalize + OCR.
+
+    Key    = sha256(image bytes) + sha256(normalizer/OCR settings)
+    Value  = zlib-compressed JSON {"page_size": [h, w], "tokens": [...]}
+    Store  = single SQLite file (safe to share between worker processes)
+
+    Entries are evicted least-recently-used first once the payload total
+    exceeds `max_size_mb`. Hits only read: their access times are buffered
+    in memory and written in one transaction every `flush_every` hits or
+    `flush_interval_s` seconds (and on put() / close()), so workers sharing
+    the cache do not take the SQLite write lock on every lookup.
+    """
+
+    def __init__(self, cache_dir, max_size_mb=1024, flush_every=64, flush_interval_s=30.0):
+        self.path = os.path.join(cache_dir, "ocr_cache.sqlite")
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = None
+        self.flush_every = flush_every
+        self.flush_interval_s = flush_interval_s
+        self._touched = {}  # key -> last access time not yet written
+        self._last_flush = time.monotonic()
+        # One connection per process, shared by the staged pipeline's threads
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def make_key(image_bytes, settings):
+        settings_blob = json.dumps(
+            {"version": CACHE_VERSION, **settings}, sort_keys=True
+        ).encode("utf-8")
+        h = hashlib.sha256(image_bytes)
+        h.update(hashlib.sha256(settings_blob).digest())
+        return h.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db().execute(
+                "SELECT payload FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._touched[key] = time.time()
+            if (len(self._touched) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval_s):
+                with self._db() as conn:
+                    self._flush_access(conn)
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, value):
+        payload = zlib.compress(
+            json.dumps(value, separators=(",", ":")).encode("utf-8")
+        )
+        with self._lock, self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            self._flush_access(conn)
+            self._evict(conn)
+
+    def stats(self):
+        with self._lock:
+            count, total = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "entries": count,
+            "size_bytes": total,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                with self._conn as conn:
+                    self._flush_access(conn)
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------
+
+    def _db(self):
+        # Opened lazily so each (spawned) worker gets its own connection
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " payload BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _flush_access(self, conn):
+        """Write the buffered hit times (inside the caller's transaction)."""
+        if self._touched:
+            conn.executemany(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                [(t, key) for key, t in self._touched.items()]
+            )
+            self._touched.clear()
+        self._last_flush = time.monotonic()
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Trim to 90% of the cap so we do not evict on every insert
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        )
+        stale = []
+        for key, size in rows:
+            if total <= target:
+                break
+            stale.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
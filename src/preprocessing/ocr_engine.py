@@ -1,37 +1,192 @@
-from paddleocr import PaddleOCR
+import cv2
+import numpy as np
+
+from .image_loader import to_bgr
+from .model_registry import get_model
 
 class OCREngine:
-    def __init__(self):
-        self.ocr = PaddleOCR(
-            use_textline_orientation=True,  # Updated parameter name
-            lang="en"
+    """
+    PaddleOCR wrapper. The model is fetched from the model registry on first
+    use, so building an OCREngine (or a Preprocessor) is free for code paths
+    that never OCR, and engines with the same settings share one model.
+    """
+
+    def __init__(self, lang="en", use_textline_orientation=True, batch_size=4, slot=0,
+                 det_model=None, rec_model=None):
+        self.lang = lang
+        self.use_textline_orientation = use_textline_orientation
+        self.batch_size = batch_size
+        self.slot = slot
+
+        # Standalone detection / recognition models for region-of-interest
+        # OCR (None = PaddleOCR's default model for the module)
+        self.det_model = det_model
+        self.rec_model = rec_model
+
+    @property
+    def ocr(self):
+        return get_model(
+            "paddleocr",
+            slot=self.slot,
+            lang=self.lang,
+            use_textline_orientation=self.use_textline_orientation  # Updated parameter name
+        )
+
+    @property
+    def detector(self):
+        return get_model("text_detection", slot=self.slot, model_name=self.det_model)
+
+    @property
+    def recognizer(self):
+        return get_model("text_recognition", slot=self.slot, model_name=self.rec_model)
+
+    def warmup(self, roi=False):
+        """
+        Load the models now instead of on the first page: the full PaddleOCR
+        pipeline, or with `roi` the standalone detector and recognizer that
+        detect() / recognize_regions() use.
+        """
+        if roi:
+            get_model("text_detection", slot=self.slot, model_name=self.det_model)
+            get_model("text_recognition", slot=self.slot, model_name=self.rec_model)
+        else:
+            get_model("paddleocr", slot=self.slot, lang=self.lang,
+                      use_textline_orientation=self.use_textline_orientation)
+
+    def clone(self, slot):
+        """
+        Engine with the same settings but its own model instance (PaddleOCR
+        predictors must not be shared between threads).
+        """
+        return OCREngine(
+            lang=self.lang,
+            use_textline_orientation=self.use_textline_orientation,
+            batch_size=self.batch_size,
+            slot=slot,
+            det_model=self.det_model,
+            rec_model=self.rec_model
         )
 
+    def config(self):
+        # Everything that changes the OCR output (used for OCR cache keys)
+        return {
+            "engine": "paddleocr",
+            "lang": self.lang,
+            "use_textline_orientation": self.use_textline_orientation,
+            "det_model": self.det_model,
+            "rec_model": self.rec_model
+        }
+
     def run(self, image):
-        raw_results = self.ocr.ocr(image)
-        ocr_outputs = []
+        # PaddleOCR wants 3 channels: gray pages (lean mode) are expanded
+        # only for the duration of the call
+        raw_results = self.ocr.ocr(to_bgr(image))
 
         if raw_results is None:
-            return ocr_outputs
+            return []
 
         # Handle new PaddleOCR v5 format
         if isinstance(raw_results, list) and len(raw_results) > 0:
             # Get the first result (single image case)
-            result = raw_results[0]
-
-            # Extract text detection results
-            if 'rec_texts' in result and 'rec_polys' in result and 'rec_scores' in result:
-                rec_texts = result['rec_texts']
-                rec_polys = result['rec_polys']
-                rec_scores = result['rec_scores']
-
-                # Combine the results
-                for text, bbox, conf in zip(rec_texts, rec_polys, rec_scores):
-                    if text and len(bbox) > 0:
-                        ocr_outputs.append({
-                            "text": str(text).strip(),
-                            "bbox": bbox.tolist() if hasattr(bbox, 'tolist') else bbox,
-                            "confidence": float(conf)
-                        })
+            return self._parse_result(raw_results[0])
+
+        return []
+
+    def run_batch(self, images, batch_size=None):
+        """
+        OCR several pages, `batch_size` images per PaddleOCR call (amortizes
+        the per-call pipeline overhead). Returns one token list per image,
+        in input order.
+        """
+        batch_size = batch_size or self.batch_size
+        outputs = []
+
+        for start in range(0, len(images), batch_size):
+            chunk = [to_bgr(image) for image in images[start:start + batch_size]]
+            raw_results = self.ocr.ocr(chunk) or []
+
+            # PaddleOCR returns one result per input image
+            raw_results = list(raw_results)
+            if len(raw_results) != len(chunk):
+                raise RuntimeError(
+                    f"OCR returned {len(raw_results)} results for {len(chunk)} images"
+                )
+            outputs.extend(self._parse_result(result) for result in raw_results)
+
+        return outputs
+
+    # ------------------------------------------------------------
+    # Region-of-interest OCR (detect the whole page, recognize crops)
+    # ------------------------------------------------------------
+
+    def detect(self, image):
+        """Text boxes only (no recognition): list of 4-point polygons."""
+        results = list(self.detector.predict(to_bgr(image)))
+        if not results:
+            return []
+        return [np.asarray(poly).tolist() for poly in results[0]["dt_polys"]]
+
+    def recognize_regions(self, image, polys, batch_size=None):
+        """
+        Recognize the given detection boxes of `image`. Returns tokens in the
+        same format as run(), in the order of `polys` (empty texts dropped).
+        """
+        if not polys:
+            return []
+
+        crops = [to_bgr(_crop_quad(image, poly)) for poly in polys]
+        results = self.recognizer.predict(crops, batch_size=batch_size or 8 * self.batch_size)
+
+        tokens = []
+        for poly, result in zip(polys, results):
+            text = str(result["rec_text"]).strip()
+            if text:
+                tokens.append({
+                    "text": text,
+                    "bbox": poly,
+                    "confidence": float(result["rec_score"])
+                })
+        return tokens
+
+    def _parse_result(self, result):
+        ocr_outputs = []
+
+        # Extract text detection results
+        if result and 'rec_texts' in result and 'rec_polys' in result and 'rec_scores' in result:
+            rec_texts = result['rec_texts']
+            rec_polys = result['rec_polys']
+            rec_scores = result['rec_scores']
+
+            # Combine the results
+            for text, bbox, conf in zip(rec_texts, rec_polys, rec_scores):
+                if text and len(bbox) > 0:
+                    ocr_outputs.append({
+                        "text": str(text).strip(),
+                        "bbox": bbox.tolist() if hasattr(bbox, 'tolist') else bbox,
+                        "confidence": float(conf)
+                    })
 
         return ocr_outputs
+
+
+def _crop_quad(image, poly):
+    """
+    Perspective-rectified crop of one text box (as PaddleOCR crops boxes
+    for its recognizer; tall boxes are turned to read horizontally).
+    """
+    quad = np.asarray(poly, dtype=np.float32)
+    width = int(max(np.linalg.norm(quad[0] - quad[1]), np.linalg.norm(quad[2] - quad[3])))
+    height = int(max(np.linalg.norm(quad[0] - quad[3]), np.linalg.norm(quad[1] - quad[2])))
+    width, height = max(width, 1), max(height, 1)
+
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    crop = cv2.warpPerspective(
+        image,
+        cv2.getPerspectiveTransform(quad, target),
+        (width, height),
+        flags=cv2.INTER_CUBIC,
+        borderMode=cv2.BORDER_REPLICATE
+    )
+    if height >= 1.5 * width:
+        crop = np.rot90(crop)
+    return crop
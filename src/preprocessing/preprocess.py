@@ -1,20 +1,344 @@
-import cv2
+import functools
+import threading
+
+import numpy as np
+
+from src.layout.regions import select_regions
+from src.layout.token_table import TokenTable
+from src.reasoning.document_gate import DocumentGate, is_rejected
+from src.utils.telemetry import NULL_TRACE
+from .image_loader import read_image_bytes, decode_image, to_gray
 from .image_normalizer import ImageNormalizer
+from .orientation import OrientationCorrector
 from .ocr_engine import OCREngine
+from .ocr_cache import OCRCache
+from .visual_detector import VisualDetector
 
 class Preprocessor:
-    def __init__(self):
-        self.normalizer = ImageNormalizer()
-        self.ocr_engine = OCREngine()
+    """
+    load -> normalize -> recognize, each taking and returning a page state
+    dict so the staged pipeline can run the steps on separate workers.
+    run() chains them for the single-page path.
+
+    With roi_ocr, recognize() runs text detection on the whole page but
+    recognition only on the regions chosen by select_regions; the other
+    boxes are kept in page["pending"] until complete() recognizes them.
+
+    With document_gate (opt-in until it has been checked on real scans),
+    normalize() first classifies the page from a thumbnail; rejected pages
+    (blank, photo, ...) skip normalization and OCR and come out with no
+    tokens and page["gate"] saying why.
+
+    With lean_memory, pages are decoded straight to one gray channel,
+    normalized in place, expanded to BGR only inside the OCR call, and
+    dropped once OCR is done: results carry page_size but no image (the ROI
+    fallback reloads the page if it needs it).
+
+    With detect_visuals, recognize() also runs YOLO signature / stamp
+    detection on the normalized page, on a second thread while OCR runs,
+    and stores the boxes in page["visuals"] (and the OCR cache).
+    """
+
+    def __init__(self, ocr_cache_dir=None, ocr_cache_max_mb=1024, ocr_batch_size=4,
+                 normalize_profile="quality", correct_orientation=False, roi_ocr=False,
+                 document_gate=False, lean_memory=False, detect_visuals=False,
+                 visual_batch_size=8):
+        # Opt-in: with it, pages are turned upright before OCR and
+        # PaddleOCR's per-line orientation classifier is skipped. The page
+        # detector still misses some 180 degree pages, so by default the
+        # classifier stays on and pages are OCRed as they are.
+        self.orientation = OrientationCorrector() if correct_orientation else None
+        self.lean_memory = lean_memory
+        self.normalizer = ImageNormalizer(profile=normalize_profile, lean=lean_memory)
+        self.ocr_engine = OCREngine(
+            use_textline_orientation=not correct_orientation,
+            batch_size=ocr_batch_size
+        )
+        self.roi_ocr = roi_ocr
+        self.gate = DocumentGate() if document_gate else None
+        self.visual_detector = VisualDetector(batch_size=visual_batch_size) if detect_visuals else None
+        self.cache = OCRCache(ocr_cache_dir, ocr_cache_max_mb) if ocr_cache_dir else None
+
+    def cache_settings(self):
+        return {
+            "orientation": self.orientation.config() if self.orientation else None,
+            "normalizer": self.normalizer.config(),
+            "ocr": self.ocr_engine.config(),
+            "roi_ocr": self.roi_ocr,
+            "gate": self.gate.config() if self.gate else None,
+            "visuals": self.visual_detector.config() if self.visual_detector else None,
+            # Decoding to gray directly rounds a few pixels differently
+            "lean_memory": self.lean_memory
+        }
+
+    def warmup(self, ocr_engine=None, visual_detector=None, infer=False):
+        """
+        Load the models recognize() will use now instead of on the first
+        page. With infer, also run a blank page through them: the first
+        inference call pays for its own allocations and kernel set-up.
+        """
+        engine = ocr_engine or self.ocr_engine
+        detector = visual_detector or self.visual_detector
+        blank = np.full((64, 256, 3), 255, dtype=np.uint8)
+
+        engine.warmup(roi=self.roi_ocr)
+        if infer and self.roi_ocr:
+            engine.detect(blank)
+            engine.recognize_regions(blank, [[[0, 0], [255, 0], [255, 63], [0, 63]]])
+        elif infer:
+            engine.run(blank)
+
+        if detector is not None:
+            detector.load()
+            if infer:
+                detector.detect(blank)
+
+    def run(self, image_path, trace=NULL_TRACE):
+        with trace.span("load"):
+            page = self.load(image_path)
+        with trace.span("normalize"):
+            page = self.normalize(page)
+        with trace.span("ocr"):
+            page = self.recognize(page)
+
+        return self._result(page)
+
+    def run_batch(self, image_paths, batch_size=None):
+        """
+        run() for several pages; cache misses share batched OCR calls.
+        Results are in input order.
+        """
+        pages = [self.normalize(self.load(path)) for path in image_paths]
+        pages = self.recognize_batch(pages, batch_size=batch_size)
+        return [self._result(page) for page in pages]
+
+    # ------------------------------------------------------------
+    # Steps
+    # ------------------------------------------------------------
+
+    def load(self, image_path):
+        data = read_image_bytes(image_path)
+        gray = self.lean_memory
+        return self._load(
+            image_path, data,
+            decode=lambda: decode_image(data, image_path, grayscale=gray),
+            reload=lambda: decode_image(read_image_bytes(image_path), image_path, grayscale=gray)
+        )
+
+    def load_bytes(self, data, source="<bytes>"):
+        """load() for an encoded image already in memory (e.g. an upload)."""
+        decode = functools.partial(decode_image, data, source, grayscale=self.lean_memory)
+        return self._load(source, data, decode=decode, reload=decode)
+
+    def load_rendered(self, source, cache_data, render):
+        """
+        load() for pages that are not image files (PDF pages). `cache_data`
+        identifies the page for the OCR cache and `render()` produces the
+        image; it is not called on a cache hit.
+        """
+        if self.lean_memory:
+            def decode():
+                return to_gray(render())
+        else:
+            decode = render
+        return self._load(source, cache_data, decode=decode, reload=decode)
+
+    def _load(self, source, cache_data, decode, reload):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = OCRCache.make_key(cache_data, self.cache_settings())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                # Warm path: no decode, no normalization, no OCR
+                return {
+                    "path": source,
+                    "image": None,
+                    "page_size": tuple(cached["page_size"]),
+                    "ocr": cached["tokens"],
+                    "pending": cached.get("pending", []),
+                    "gate": cached.get("gate"),
+                    "visuals": cached.get("visuals"),
+                    "reload": reload,
+                    "cache_key": cache_key,
+                    "cache_hit": True
+                }
+
+        return {
+            "path": source,
+            "image": decode(),
+            "pending": [],
+            "gate": None,
+            "visuals": None,
+            "reload": reload,
+            "cache_key": cache_key,
+            "cache_hit": False
+        }
+
+    def normalize(self, page):
+        if page["cache_hit"]:
+            return page
+
+        if self.gate is not None:
+            page["gate"] = self.gate.classify(page["image"])
+            if is_rejected(page["gate"]):
+                self._reject(page)
+                return page
+
+        page["image"] = self._normalize_image(page["image"])
+        page["page_size"] = page["image"].shape[:2]
+        return page
+
+    def recognize(self, page, ocr_engine=None, visual_detector=None):
+        if page["cache_hit"]:
+            return page
+        if is_rejected(page["gate"]):
+            self._store(page)
+            return page
+
+        visuals = self._detect_visuals_async([page], visual_detector)
+        engine = ocr_engine or self.ocr_engine
+        if self.roi_ocr:
+            self._recognize_regions(page, engine)
+        else:
+            page["ocr"] = engine.run(page["image"])
+        visuals()
+        self._store(page)
+        self._release_image(page)
+        return page
+
+    def recognize_batch(self, pages, ocr_engine=None, batch_size=None, visual_detector=None):
+        if self.roi_ocr:
+            # Detection and crop recognition are already batched per page
+            return [self.recognize(page, ocr_engine, visual_detector) for page in pages]
+
+        for page in pages:
+            if not page["cache_hit"] and is_rejected(page["gate"]):
+                self._store(page)
+
+        todo = [page for page in pages if not page["cache_hit"] and not is_rejected(page["gate"])]
+        if todo:
+            visuals = self._detect_visuals_async(todo, visual_detector)
+            engine = ocr_engine or self.ocr_engine
+            results = engine.run_batch([page["image"] for page in todo], batch_size=batch_size)
+            visuals()
+            for page, tokens in zip(todo, results):
+                page["ocr"] = tokens
+                self._store(page)
+                self._release_image(page)
+        return pages
+
+    def complete(self, page, ocr_engine=None):
+        """
+        ROI-mode fallback: recognize the boxes recognize() skipped and add
+        them to page["ocr"]. A page that came from the OCR cache has no
+        image, so it is loaded and normalized again first.
+        """
+        if not page.get("pending"):
+            return page
+
+        image = page["image"]
+        if image is None:
+            image = self._normalize_image(page["reload"]())
+
+        engine = ocr_engine or self.ocr_engine
+        page["ocr"] = page["ocr"] + engine.recognize_regions(image, page["pending"])
+        page["pending"] = []
+        self._store(page)
+        return page
+
+    # ------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------
+
+    def _normalize_image(self, image):
+        if self.orientation is not None:
+            image = self.orientation.run(image)
+        return self.normalizer.run(image)
+
+    def _detect_visuals_async(self, pages, detector=None):
+        """
+        Start signature / stamp detection of `pages` next to OCR (YOLO and
+        Paddle inference both release the GIL). Returns a wait() that fills
+        page["visuals"] and re-raises a detection error.
+        """
+        detector = detector or self.visual_detector
+        if detector is None:
+            return lambda: None
+
+        images = [page["image"] for page in pages]
+        outcome = {}
+
+        def work():
+            try:
+                outcome["visuals"] = detector.detect_batch(images)
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=work, name="visual-detection", daemon=True)
+        thread.start()
+
+        def wait():
+            thread.join()
+            if "error" in outcome:
+                raise outcome["error"]
+            for page, visuals in zip(pages, outcome["visuals"]):
+                page["visuals"] = visuals
+
+        return wait
+
+    def _release_image(self, page):
+        if self.lean_memory:
+            page["image"] = None
+
+    @staticmethod
+    def _reject(page):
+        page["page_size"] = page["image"].shape[:2]
+        page["image"] = None
+        page["ocr"] = []
+        page["pending"] = []
 
-    def run(self, image_path):
-        image = cv2.imread(image_path)
+    def _recognize_regions(self, page, engine):
+        polys = engine.detect(page["image"])
+        if self.gate is not None:
+            verdict = self.gate.classify_detections(polys)
+            if is_rejected(verdict):
+                page["gate"] = verdict
+                self._reject(page)
+                return
+        boxes = TokenTable(
+            texts=[""] * len(polys),
+            quads=polys or np.empty((0, 4, 2)),
+            confidences=[0.0] * len(polys)
+        )
+        wanted = np.zeros(len(polys), dtype=bool)
+        wanted[select_regions(boxes, page["page_size"][0])] = True
 
-        norm_image = self.normalizer.run(image)
+        page["ocr"] = engine.recognize_regions(
+            page["image"], [poly for poly, w in zip(polys, wanted) if w]
+        )
+        page["pending"] = [poly for poly, w in zip(polys, wanted) if not w]
 
-        ocr_results = self.ocr_engine.run(norm_image)
+    def _store(self, page):
+        if self.cache is not None:
+            self.cache.put(page["cache_key"], {
+                "page_size": list(page["page_size"]),
+                "tokens": page["ocr"],
+                "pending": page["pending"],
+                "gate": page["gate"],
+                "visuals": page["visuals"]
+            })
 
+    @staticmethod
+    def _result(page):
         return {
-            "image": norm_image,
-            "ocr": ocr_results
+            "path": page["path"],
+            "cache_key": page["cache_key"],
+            "pending": page["pending"],
+            "gate": page["gate"],
+            "visuals": page["visuals"],
+            "reload": page["reload"],
+            "image": page["image"],
+            "page_size": page["page_size"],
+            "ocr": page["ocr"],
+            "cache_hit": page["cache_hit"]
         }
@@ -1,39 +1,99 @@
 import os
 import cv2
-from ultralytics import YOLO
+import numpy as np
+
+from .image_loader import to_bgr
+from .model_registry import get_model
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 
 MODEL_PATH = os.path.join(BASE_DIR, "models", "signature_stamp.pt")
 
-model = YOLO(MODEL_PATH)
-
 CLASS_MAP = {
     0: "signature",
     1: "stamp"
 }
 
+
+def get_detector(slot=0, model_path=MODEL_PATH):
+    # Loaded on first detection, once per process and slot (see model_registry)
+    return get_model("yolo", slot=slot, model_path=model_path)
+
+
+class VisualDetector:
+    """
+    YOLO signature / stamp detection on already-decoded page arrays (BGR or
+    gray), so it needs no disk read of its own. detect_batch() runs
+    `batch_size` pages per inference call. Like OCREngine, the model comes
+    from the registry on first use and each thread running detections
+    should use its own clone(slot).
+    """
+
+    def __init__(self, conf=0.25, batch_size=8, slot=0, model_path=MODEL_PATH):
+        self.conf = conf
+        self.batch_size = batch_size
+        self.slot = slot
+        self.model_path = model_path
+
+    @property
+    def model(self):
+        return get_detector(self.slot, self.model_path)
+
+    def load(self):
+        """Load the model now instead of on the first detection."""
+        get_detector(self.slot, self.model_path)
+
+    def clone(self, slot):
+        return VisualDetector(conf=self.conf, batch_size=self.batch_size, slot=slot,
+                              model_path=self.model_path)
+
+    def config(self):
+        # Everything that changes the detections (used for OCR cache keys)
+        return {
+            "model_path": os.path.basename(self.model_path),
+            "conf": self.conf
+        }
+
+    def detect(self, image):
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images, batch_size=None):
+        """One detection list per image, in input order."""
+        batch_size = batch_size or self.batch_size
+        outputs = []
+
+        for start in range(0, len(images), batch_size):
+            chunk = [to_bgr(image) for image in images[start:start + batch_size]]
+            results = self.model(chunk, conf=self.conf, verbose=False)
+            outputs.extend(_parse_boxes(result) for result in results)
+
+        return outputs
+
+
+def _parse_boxes(result):
+    # Whole tensors to NumPy at once instead of one .item() per box field
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return []
+
+    class_ids = boxes.cls.cpu().numpy().astype(np.int64).tolist()
+    confidences = boxes.conf.cpu().numpy().tolist()
+    # int() truncation, as the per-box conversion did
+    bboxes = boxes.xyxy.cpu().numpy().astype(np.int64).tolist()
+
+    return [
+        {"type": CLASS_MAP[cls_id], "confidence": conf, "bbox": bbox}
+        for cls_id, conf, bbox in zip(class_ids, confidences, bboxes)
+    ]
+
+
 def detect_visuals(image_name):
+    """Detections for an image in data/processed (prefer VisualDetector on arrays)."""
     img_path = os.path.join(PROCESSED_DIR, image_name)
     img = cv2.imread(img_path)
 
     if img is None:
         raise ValueError(f"Image not found: {image_name}")
 
-    results = model(img, conf=0.25)[0]
-
-    detections = []
-
-    for box in results.boxes:
-        cls_id = int(box.cls[0])
-        conf = float(box.conf[0])
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-        detections.append({
-            "type": CLASS_MAP[cls_id],
-            "confidence": conf,
-            "bbox": [x1, y1, x2, y2]
-        })
-
-    return detections
+    return VisualDetector().detect(img)
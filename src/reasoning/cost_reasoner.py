@@ -1,5 +1,122 @@
 """
 Cost Reasoner Module
 Handles cost reasoning and validation
+
+Chooses the quoted cost among the cost candidates (src/candidates/cost.py)
+and cross-checks it against the asset master: when the model name matched
+a master asset, candidates inside that asset's [min_cost, max_cost] are
+preferred and the result says whether the chosen cost falls in it.
 """
-pass
+import csv
+
+from src.extraction.top_k import TopK
+from src.utils.constants import ASSET_MASTER_CSV
+
+
+def load_cost_ranges(csv_path=ASSET_MASTER_CSV):
+    """
+    (min_cost, max_cost) per asset master row, in file order (the row ids
+    MasterIndex.query returns); None where a bound is missing.
+    """
+    def bound(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [(bound(row.get("min_cost")), bound(row.get("max_cost"))) for row in csv.DictReader(f)]
+
+
+class CostReasoner:
+    """
+    Candidates are ranked by their score; with a master asset (the model's
+    top master match scoring at least `min_match_score`), those inside its
+    cost range gain `range_bonus` and the others lose `range_penalty`. The
+    `top_k` best distinct amounts come back as "alternatives".
+    """
+
+    def __init__(self, asset_master_csv=ASSET_MASTER_CSV, score_threshold=0.5, top_k=5,
+                 min_match_score=80, range_bonus=0.15, range_penalty=0.3):
+        self.cost_ranges = load_cost_ranges(asset_master_csv)
+        self.score_threshold = score_threshold
+        self.top_k = top_k
+        self.min_match_score = min_match_score
+        self.range_bonus = range_bonus
+        self.range_penalty = range_penalty
+
+    def resolve(self, candidates, model_result=None):
+        master = self._master_range(model_result)
+
+        top = TopK(self.top_k)
+        for i, candidate in enumerate(candidates):
+            score = candidate.confidence
+            if master is not None:
+                if master["min_cost"] <= candidate.value <= master["max_cost"]:
+                    score += self.range_bonus
+                else:
+                    score -= self.range_penalty
+            score = round(max(0.0, min(score, 1.0)), 3)
+            top.push(score, (i,), candidate.value, {
+                "cost": candidate.value,
+                "score": score,
+                "source": candidate.source,
+                "bbox": candidate.bbox
+            })
+
+        ranking = {
+            "num_candidates": len(candidates),
+            "alternatives": [
+                {key: alt[key] for key in ("cost", "score", "source")} for alt in top.items()
+            ]
+        }
+        best = top.best()
+
+        if best is None:
+            return {
+                "cost": None,
+                "confidence": 0.0,
+                "reason": "no_candidates",
+                "master_range": master,
+                **ranking
+            }
+
+        if master is not None:
+            master["within_range"] = master["min_cost"] <= best["cost"] <= master["max_cost"]
+
+        if best["score"] < self.score_threshold:
+            return {
+                "cost": None,
+                "confidence": round(best["score"], 2),
+                "reason": "low_confidence",
+                "master_range": master,
+                **ranking
+            }
+
+        return {
+            "cost": best["cost"],
+            "confidence": round(best["score"], 2),
+            "reason": best["source"],
+            "bbox": best["bbox"],
+            "master_range": master,
+            **ranking
+        }
+
+    def _master_range(self, model_result):
+        """Cost range of the model's matched master asset, or None."""
+        matches = (model_result or {}).get("master_matches") or []
+        if not matches or matches[0]["score"] < self.min_match_score:
+            return None
+
+        row = matches[0]["row"]
+        if row >= len(self.cost_ranges):
+            return None
+        min_cost, max_cost = self.cost_ranges[row]
+        if min_cost is None or max_cost is None:
+            return None
+
+        return {
+            "asset": matches[0]["match"],
+            "min_cost": min_cost,
+            "max_cost": max_cost
+        }
@@ -1,5 +1,107 @@
 """
 Document Gate Module
 Handles document-level gating and validation
+
+Decides from a 512 px thumbnail (a few ms) whether a page can be a
+quotation, so blank pages, bleed-through backs, ID-card copies and photos
+skip normalization, OCR and the resolvers. With ROI OCR the text-detection
+pass gives a second, still recognition-free check.
+
+Every rule rejects; a page that passes them all is treated as a quotation.
+The thresholds sit well outside the range seen on the quotation pages of
+data/train (benchmarks/bench_document_gate.py), because rejecting a real
+quotation costs far more than OCRing a stray page.
 """
-pass
+import cv2
+import numpy as np
+
+
+def is_rejected(verdict):
+    """True when a gate verdict turns the page away (None: page was not gated)."""
+    return verdict is not None and verdict["label"] != "quotation"
+
+
+class DocumentGate:
+
+    def __init__(self, thumb_size=512, min_contrast=10.0, min_glyphs=40,
+                 min_text_spread=0.12, max_dark_fraction=0.5, min_text_boxes=8):
+        self.thumb_size = thumb_size
+        self.min_contrast = min_contrast
+        self.min_glyphs = min_glyphs
+        self.min_text_spread = min_text_spread
+        self.max_dark_fraction = max_dark_fraction
+        self.min_text_boxes = min_text_boxes
+
+    def config(self):
+        # Everything that changes the verdict (used for OCR cache keys)
+        return {
+            "thumb_size": self.thumb_size,
+            "min_contrast": self.min_contrast,
+            "min_glyphs": self.min_glyphs,
+            "min_text_spread": self.min_text_spread,
+            "max_dark_fraction": self.max_dark_fraction,
+            "min_text_boxes": self.min_text_boxes
+        }
+
+    def classify(self, image):
+        """{"label": "quotation" | "other", "reason", "features"} from a thumbnail."""
+        features = self.features(image)
+
+        if features["contrast"] < self.min_contrast:
+            reason = "blank"
+        elif features["glyphs"] < self.min_glyphs:
+            reason = "too_little_text"
+        elif features["text_spread"] < self.min_text_spread:
+            reason = "small_text_region"
+        elif features["dark_fraction"] > self.max_dark_fraction:
+            reason = "photo"
+        else:
+            reason = None
+
+        return self._verdict(reason, features)
+
+    def classify_detections(self, polys):
+        """Second check on a detection-only OCR pass (ROI mode)."""
+        features = {"text_boxes": len(polys)}
+        reason = "too_few_text_boxes" if len(polys) < self.min_text_boxes else None
+        return self._verdict(reason, features)
+
+    @staticmethod
+    def _verdict(reason, features):
+        return {
+            "label": "other" if reason else "quotation",
+            "reason": reason or "passed",
+            "features": features
+        }
+
+    def features(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        scale = self.thumb_size / max(gray.shape[:2])
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        height, width = gray.shape
+
+        ink = cv2.adaptiveThreshold(gray, 1, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                    cv2.THRESH_BINARY_INV, 15, 12)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        w = stats[1:, cv2.CC_STAT_WIDTH]
+        h = stats[1:, cv2.CC_STAT_HEIGHT]
+
+        # Character-sized components at thumbnail scale
+        glyph = (h >= 3) & (h <= 25) & (w <= 3 * h + 6)
+        spread = 0.0
+        if glyph.sum() > 5:
+            x = stats[1:, cv2.CC_STAT_LEFT][glyph] + w[glyph] / 2
+            y = stats[1:, cv2.CC_STAT_TOP][glyph] + h[glyph] / 2
+            x_lo, x_hi = np.percentile(x, [5, 95])
+            y_lo, y_hi = np.percentile(y, [5, 95])
+            spread = (x_hi - x_lo) / width * (y_hi - y_lo) / height
+
+        return {
+            "contrast": round(float(gray.std()), 2),
+            "glyphs": int(glyph.sum()),
+            # Share of the page the text covers (an ID card copy is a small island)
+            "text_spread": round(float(spread), 3),
+            # Large solid dark areas: photographs rather than paper
+            "dark_fraction": round(float((cv2.blur(gray, (15, 15)) < 80).mean()), 3)
+        }
@@ -0,0 +1,441 @@
+"""
+Service Module
+Long-running extraction service with warm models and micro-batched OCR
+
+A run_pipeline.py call pays for interpreter start-up and model loading
+before its first page. The service builds one Pipeline, loads its models
+and runs a blank page through them before it takes extraction requests,
+then serves pages over HTTP on a TCP port or a Unix socket:
+
+    POST /extract   the encoded image itself as the body, or, when the
+                    service has a root directory, {"path": "..."}
+                    (application/json) for a file under that root
+    GET  /health    200 once the models are warm, 503 while starting
+    GET  /metrics   Prometheus text: per-stage latency histograms (the
+                    whole request is the "request" stage), page counts per
+                    status, OCR batch counts
+
+Each request loads and normalizes its page on its own handler thread (at
+most `normalize_workers` at a time). The normalized page goes to an OCR
+batcher: a worker takes the oldest waiting page, collects more for up to
+`batch_wait_ms` after that page arrived (or until the OCR batch is full)
+and runs them through one OCR call. Concurrent requests share inference
+calls, and a lone request waits at most the budget. Field extraction runs
+back on the request thread.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+from src.pipeline import Pipeline
+from src.reasoning.document_gate import is_rejected
+from src.utils.telemetry import TelemetryExporter
+
+log = logging.getLogger(__name__)
+
+# Tells OCR batcher workers to exit
+_STOP = object()
+
+
+class _OCRBatcher:
+    """
+    OCR worker threads fed from one queue of normalized pages. Each worker
+    owns an OCR engine and visual detector slot (PaddleOCR predictors are
+    not safe to share between threads).
+    """
+
+    def __init__(self, preprocessor, engines, detectors, batch_size, wait_s):
+        self.preprocessor = preprocessor
+        self.engines = engines
+        self.detectors = detectors
+        self.batch_size = batch_size
+        self.wait_s = wait_s
+        self.queue = queue.Queue()
+
+        self.batches = 0
+        self.pages = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        for worker_id in range(len(self.engines)):
+            threading.Thread(
+                target=self._loop,
+                args=(worker_id,),
+                name=f"ocr-{worker_id}",
+                daemon=True
+            ).start()
+
+    def stop(self):
+        for _ in self.engines:
+            self.queue.put(_STOP)
+
+    def submit(self, page):
+        """Queue a normalized page; the Future resolves to the recognized page."""
+        future = Future()
+        self.queue.put((page, future, time.perf_counter()))
+        return future
+
+    def _loop(self, worker_id):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+
+            # The budget runs from the first page's arrival, so a page that
+            # already waited for a busy worker takes only what is queued
+            batch = [item]
+            deadline = item[2] + self.wait_s
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self.queue.put(_STOP)  # exit after this batch
+                    break
+                batch.append(item)
+
+            self._run(batch, worker_id)
+
+    def _run(self, batch, worker_id):
+        pages = [page for page, _, _ in batch]
+        start = time.perf_counter()
+        for page, _, queued in batch:
+            page["trace"].add_span("ocr_queue", (start - queued) * 1000)
+
+        try:
+            self.preprocessor.recognize_batch(
+                pages,
+                ocr_engine=self.engines[worker_id],
+                batch_size=self.batch_size,
+                visual_detector=self.detectors[worker_id]
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.batches += 1
+            self.pages += len(batch)
+        for page, future, _ in batch:
+            page["trace"].add_span("ocr", elapsed_ms / len(batch))
+            page["ocr_batch_size"] = len(batch)
+            future.set_result(page)
+
+
+class ExtractionService:
+    """
+    Warm Pipeline + OCR batcher shared by all requests:
+
+        service = ExtractionService(batch_wait_ms=20, normalize_profile="fast")
+        service.warmup()
+        result = service.extract(path="quotation.png")
+
+    Pipeline options are the usual ones (OCR cache, normalize profile, ROI
+    OCR, gate, ...); telemetry is always on since it feeds /metrics. Give
+    `exporter` (a TelemetryExporter) to also write traces / a metrics
+    file; the service closes it in close().
+    """
+
+    def __init__(self, ocr_workers=1, normalize_workers=None, extract_workers=2,
+                 batch_wait_ms=20, exporter=None, **pipeline_options):
+        pipeline_options = dict(pipeline_options or {})
+        pipeline_options["telemetry"] = True
+        self.pipeline = Pipeline(**pipeline_options)
+        self.preprocessor = self.pipeline.preprocessor
+        self.memory_budget = self.pipeline.memory_budget
+        self.exporter = exporter or TelemetryExporter()
+
+        engine = self.preprocessor.ocr_engine
+        detector = self.preprocessor.visual_detector
+        self.batcher = _OCRBatcher(
+            self.preprocessor,
+            engines=[engine] + [engine.clone(slot=i) for i in range(1, ocr_workers)],
+            detectors=[
+                detector.clone(slot=i) if detector is not None else None
+                for i in range(ocr_workers)
+            ],
+            batch_size=engine.batch_size,
+            wait_s=batch_wait_ms / 1000
+        )
+        # ROI-mode fallback OCR during extraction: one engine per concurrent
+        # extraction (loaded lazily, only if a page needs the fallback)
+        self._fallback_engines = queue.Queue()
+        for i in range(extract_workers):
+            self._fallback_engines.put(engine.clone(slot=ocr_workers + i))
+        self._normalize_slots = threading.BoundedSemaphore(normalize_workers or os.cpu_count() or 1)
+
+        self.ready = False
+        self.started = time.time()
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def warmup(self):
+        """Load every OCR / detection slot, run a blank page through it, start the batcher."""
+        for engine, detector in zip(self.batcher.engines, self.batcher.detectors):
+            self.preprocessor.warmup(engine, detector, infer=True)
+        self.batcher.start()
+        self.ready = True
+
+    def close(self):
+        self.ready = False
+        self.batcher.stop()
+        self.exporter.close()
+
+    # ------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------
+
+    def extract(self, path=None, data=None):
+        """
+        Extract one page from a readable `path` or the encoded image `data`.
+        Raises like Pipeline.run() (OSError / ValueError for unreadable
+        input); handle() turns errors into results.
+        """
+        trace = self.pipeline.new_trace()
+        source = path if data is None else "<upload>"
+        start = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            result = self._extract(path, data, source, trace)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        self._record(result, trace, start)
+        return result
+
+    def handle(self, path=None, data=None):
+        """extract() for the HTTP handler: (HTTP status, result)."""
+        start = time.perf_counter()
+        try:
+            return 200, self.extract(path, data)
+        except Exception as e:
+            result = {
+                "status": "error",
+                "image": path if data is None else "<upload>",
+                "error": f"{type(e).__name__}: {e}"
+            }
+            self._record(result, None, start)
+            # Unreadable / undecodable input is the caller's problem
+            return 400 if isinstance(e, (OSError, ValueError)) else 500, result
+
+    def _extract(self, path, data, source, trace):
+        preprocessor = self.preprocessor
+        if self.memory_budget is not None:
+            self.memory_budget.admit()
+        try:
+            with self._normalize_slots:
+                with trace.span("load"):
+                    if data is None:
+                        page = preprocessor.load(path)
+                    else:
+                        page = preprocessor.load_bytes(data, source)
+                with trace.span("normalize"):
+                    page = preprocessor.normalize(page)
+
+            if page["cache_hit"] or is_rejected(page["gate"]):
+                # Nothing to recognize (cache hits return at once)
+                page = preprocessor.recognize(page)
+            else:
+                page["trace"] = trace
+                page = self.batcher.submit(page).result()
+
+            engine = self._fallback_engines.get()
+            try:
+                result = self.pipeline.extract(page, source, ocr_engine=engine, trace=trace)
+            finally:
+                self._fallback_engines.put(engine)
+        finally:
+            if self.memory_budget is not None:
+                self.memory_budget.done()
+
+        if "ocr_batch_size" in page:
+            result["ocr_batch_size"] = page["ocr_batch_size"]
+        return result
+
+    def _record(self, result, trace, start):
+        latency_ms = (time.perf_counter() - start) * 1000
+        result["latency_ms"] = round(latency_ms, 2)
+        if trace is None:
+            trace = self.pipeline.new_trace()
+        trace.add_span("request", latency_ms)
+        self.exporter.add(result, trace.to_dict())
+
+    # ------------------------------------------------------------
+    # Health / metrics
+    # ------------------------------------------------------------
+
+    def health(self):
+        batches = self.batcher.batches
+        return {
+            "status": "ok" if self.ready else "starting",
+            "uptime_s": round(time.time() - self.started, 1),
+            "in_flight": self.in_flight,
+            "ocr_queue": self.batcher.queue.qsize(),
+            "ocr_batches": batches,
+            "mean_ocr_batch_size": round(self.batcher.pages / batches, 2) if batches else None,
+            "memory": self.memory_budget.stats() if self.memory_budget is not None else None
+        }
+
+    def metrics(self):
+        lines = [
+            "# HELP extraction_service_ready 1 once the models are loaded and warm.",
+            "# TYPE extraction_service_ready gauge",
+            f"extraction_service_ready {int(self.ready)}",
+            "# HELP extraction_service_in_flight Requests being processed.",
+            "# TYPE extraction_service_in_flight gauge",
+            f"extraction_service_in_flight {self.in_flight}",
+            "# HELP extraction_service_ocr_batches_total OCR calls made by the batcher.",
+            "# TYPE extraction_service_ocr_batches_total counter",
+            f"extraction_service_ocr_batches_total {self.batcher.batches}",
+            "# HELP extraction_service_ocr_batch_pages_total Pages recognized by the batcher.",
+            "# TYPE extraction_service_ocr_batch_pages_total counter",
+            f"extraction_service_ocr_batch_pages_total {self.batcher.pages}",
+        ]
+        return self.exporter.prometheus_text() + "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------
+# HTTP front end
+# ------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "QuotationExtraction/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._send_json(200 if service.ready else 503, service.health())
+        elif self.path == "/metrics":
+            self._send(200, service.metrics().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        if self.path != "/extract":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.server.max_upload_bytes:
+            self.close_connection = True  # body left unread
+            self._send_json(413, {"error": f"body larger than {self.server.max_upload_bytes} bytes"})
+            return
+        body = self.rfile.read(length)
+        if not service.ready:
+            self._send_json(503, {"error": "models are still loading"})
+            return
+
+        if self.headers.get_content_type() == "application/json":
+            if self.server.root is None:
+                self._send_json(403, {"error": "path requests are disabled (no --root); "
+                                               "post the image bytes instead"})
+                return
+            try:
+                path = json.loads(body)["path"]
+                path = _resolve_under_root(self.server.root, path)
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {"error": 'expected a JSON body {"path": ...}'})
+                return
+            if path is None:
+                # Same answer whether or not the file exists
+                self._send_json(403, {"error": "path is outside the service root"})
+                return
+            status, result = service.handle(path=path)
+        elif body:
+            status, result = service.handle(data=body)
+        else:
+            self._send_json(400, {"error": "empty body"})
+            return
+        self._send_json(status, result)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Unix-socket clients have no address; requests are logged at DEBUG
+        log.debug("%s", format % args)
+
+
+def _resolve_under_root(root, path):
+    """
+    Real path of `path` (relative to `root`, or absolute), or None when it
+    resolves outside `root` (symlinks followed, ".." included).
+    """
+    if not isinstance(path, str) or not path or "\0" in path:
+        raise ValueError("path must be a non-empty string")
+    full = os.path.realpath(os.path.join(root, path))
+    return full if os.path.commonpath([root, full]) == root else None
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(address, service, max_upload_mb=32, root=None):
+    """
+    HTTP server for `service` on "host:port" or "unix:/path/to.sock" (a
+    stale socket file is replaced). Requests run on their own threads.
+
+    JSON {"path": ...} requests are only accepted with `root`, and only for
+    files under it; otherwise clients upload the image bytes.
+    """
+    if address.startswith("unix:"):
+        socket_path = address[len("unix:"):]
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        host, _, port = address.rpartition(":")
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _Handler)
+        server.daemon_threads = True
+
+    server.service = service
+    server.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+    server.root = os.path.realpath(root) if root else None
+    return server
+
+
+def serve(address, service, max_upload_mb=32, root=None):
+    """Serve until interrupted, warming the models in the background first."""
+    server = make_server(address, service, max_upload_mb, root)
+
+    # /health answers 503 while this runs
+    def warm():
+        start = time.perf_counter()
+        try:
+            service.warmup()
+        except Exception:
+            log.exception("Model warm-up failed")
+            server.shutdown()
+            return
+        log.info("Models warm after %.1fs; serving on %s", time.perf_counter() - start, address)
+
+    threading.Thread(target=warm, name="warmup", daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if address.startswith("unix:"):
+            os.unlink(address[len("unix:"):])
@@ -0,0 +1,280 @@
+"""
+Staged Pipeline Module
+Streams pages through overlapping decode -> normalize -> OCR -> extract stages
+
+Each stage is a pool of threads reading from a bounded queue and writing to
+the next one. OpenCV and the Paddle inference runtime release the GIL, so
+disk reads, denoising and OCR of different pages run at the same time; the
+bounded queues give backpressure so a fast stage cannot pile decoded images
+up in memory ahead of a slow one.
+"""
+import os
+import queue
+import threading
+import time
+
+from src.pipeline import Pipeline
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+
+class _Stage:
+    """
+    `workers` threads applying `fn` to pages from `in_q`. With
+    batch_size > 1, `fn` takes a list and each worker drains up to that many
+    pages already waiting in the queue (it never waits to fill a batch).
+    """
+
+    def __init__(self, name, fn, workers, in_q, out_q, batch_size=1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.in_q = in_q
+        self.out_q = out_q
+        self.batch_size = batch_size
+        self.next_workers = 1
+
+        self.items = 0
+        self.busy_s = 0.0
+        self._remaining = workers
+        self._lock = threading.Lock()
+
+    def start(self):
+        for worker_id in range(self.workers):
+            threading.Thread(
+                target=self._loop,
+                args=(worker_id,),
+                name=f"{self.name}-{worker_id}",
+                daemon=True
+            ).start()
+
+    def _loop(self, worker_id):
+        done = False
+        while not done:
+            page = self.in_q.get()
+            if page is _DONE:
+                break
+
+            batch = [page]
+            while len(batch) < self.batch_size:
+                try:
+                    page = self.in_q.get_nowait()
+                except queue.Empty:
+                    break
+                if page is _DONE:
+                    done = True
+                    break
+                batch.append(page)
+
+            self._process(batch, worker_id)
+
+            # Blocks while the next stage is saturated (backpressure)
+            for page in batch:
+                self.out_q.put(page)
+
+        # Last worker out closes the stream for every worker downstream
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+        if last:
+            for _ in range(self.next_workers):
+                self.out_q.put(_DONE)
+
+    def _process(self, batch, worker_id):
+        live = [page for page in batch if "error" not in page]
+        if not live:
+            return
+
+        start = time.perf_counter()
+        try:
+            if self.batch_size > 1:
+                self.fn(live, worker_id)
+            else:
+                self.fn(live[0], worker_id)
+        except Exception as e:
+            for page in live:
+                page["error"] = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+
+        for page in live:
+            page["stage_ms"][self.name] = round(elapsed * 1000 / len(live), 2)
+            page["trace"].add_span(self.name, elapsed * 1000 / len(live))
+        with self._lock:
+            self.items += len(live)
+            self.busy_s += elapsed
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "pages": self.items,
+            "busy_s": round(self.busy_s, 3)
+        }
+
+
+class StagedPipeline:
+    """
+    Streaming multi-page runner. Results come back in completion order:
+
+        staged = StagedPipeline(normalize_workers=12, ocr_workers=2)
+        for result in staged.run(paths):
+            ...
+
+    With memory_budget_mb (a pipeline option), a page only enters the
+    decode stage while the process is under budget or nothing else is in
+    flight, so memory pressure lowers read-ahead instead of growing RSS.
+    """
+
+    def __init__(self, decode_workers=2, normalize_workers=None, ocr_workers=1,
+                 extract_workers=1, queue_size=8, **pipeline_options):
+        cpus = os.cpu_count() or 2
+        self.decode_workers = decode_workers
+        self.normalize_workers = normalize_workers or max(1, cpus - decode_workers - ocr_workers)
+        self.ocr_workers = ocr_workers
+        self.extract_workers = extract_workers
+        self.queue_size = queue_size
+
+        self.pipeline = Pipeline(**pipeline_options)
+        self.preprocessor = self.pipeline.preprocessor
+        self.memory_budget = self.pipeline.memory_budget
+
+        # PaddleOCR predictors are not safe to share between threads
+        engine = self.preprocessor.ocr_engine
+        self.ocr_engines = [engine] + [engine.clone(slot=i) for i in range(1, ocr_workers)]
+        # Signature / stamp detection runs inside the OCR stage, next to
+        # each OCR call on the same decoded pages (one YOLO slot per worker)
+        detector = self.preprocessor.visual_detector
+        self.visual_detectors = [
+            detector.clone(slot=i) if detector is not None else None
+            for i in range(ocr_workers)
+        ]
+        # ROI-mode fallback OCR runs in the extract stage (models load lazily,
+        # so these cost nothing unless a page actually needs the fallback)
+        self.fallback_engines = [
+            engine.clone(slot=ocr_workers + i) for i in range(extract_workers)
+        ]
+
+        self._stages = []
+
+    # ------------------------------------------------------------
+    # Stage functions
+    # ------------------------------------------------------------
+
+    def _decode(self, page, worker_id):
+        if self.memory_budget is not None:
+            # Over budget: wait for pages in flight to finish first
+            self.memory_budget.admit()
+            page["admitted"] = True
+        if "render" in page:
+            # Rasterized page (e.g. PDF): rendered only on an OCR cache miss
+            page.update(self.preprocessor.load_rendered(
+                page["path"], page.pop("cache_data"), page.pop("render")
+            ))
+        else:
+            page.update(self.preprocessor.load(page["path"]))
+        return page
+
+    def _normalize(self, page, worker_id):
+        return self.preprocessor.normalize(page)
+
+    def _ocr(self, pages, worker_id):
+        return self.preprocessor.recognize_batch(
+            pages,
+            ocr_engine=self.ocr_engines[worker_id],
+            visual_detector=self.visual_detectors[worker_id]
+        )
+
+    def _extract(self, page, worker_id):
+        page["result"] = self.pipeline.extract(
+            page, page["path"], ocr_engine=self.fallback_engines[worker_id],
+            trace=page["trace"]
+        )
+        page["image"] = None  # release the page buffer as early as possible
+        return page
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def run(self, image_paths, stop=None):
+        """
+        `image_paths` may be any iterable (it is consumed lazily) of image
+        paths or page dicts ({"path", "page"} plus, for rasterized pages,
+        "render" and "cache_data"). Setting the `stop` event stops feeding
+        new pages; pages already in flight still come out. If iterating
+        `image_paths` raises, the pages fed before it still come out and
+        the exception is then re-raised here.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(5)]
+        ocr_batch = self.preprocessor.ocr_engine.batch_size
+        plan = [
+            ("decode", self._decode, self.decode_workers, 1),
+            ("normalize", self._normalize, self.normalize_workers, 1),
+            ("ocr", self._ocr, self.ocr_workers, ocr_batch),
+            ("extract", self._extract, self.extract_workers, 1),
+        ]
+        self._stages = [
+            _Stage(name, fn, workers, queues[i], queues[i + 1], batch_size)
+            for i, (name, fn, workers, batch_size) in enumerate(plan)
+        ]
+        for stage, downstream in zip(self._stages, self._stages[1:]):
+            stage.next_workers = downstream.workers
+
+        for stage in self._stages:
+            stage.start()
+
+        feed_error = []
+
+        def feed():
+            # The end markers go down even when the input iterable fails,
+            # or run() would wait on the output queue forever
+            try:
+                for item in image_paths:
+                    if stop is not None and stop.is_set():
+                        break
+                    page = dict(item) if isinstance(item, dict) else {"path": item}
+                    page["submitted"] = time.perf_counter()
+                    page["stage_ms"] = {}
+                    page["trace"] = self.pipeline.new_trace()
+                    queues[0].put(page)
+            except BaseException as e:
+                feed_error.append(e)
+            finally:
+                for _ in range(self.decode_workers):
+                    queues[0].put(_DONE)
+
+        threading.Thread(target=feed, name="feed", daemon=True).start()
+
+        out_q = queues[-1]
+        while True:
+            page = out_q.get()
+            if page is _DONE:
+                break
+            yield self._finish(page)
+
+        if feed_error:
+            raise feed_error[0]
+
+    def stage_stats(self):
+        return {stage.name: stage.stats() for stage in self._stages}
+
+    def _finish(self, page):
+        if page.pop("admitted", False):
+            self.memory_budget.done()
+
+        if "error" in page:
+            result = {
+                "status": "error",
+                "image": page["path"],
+                "error": page["error"]
+            }
+        else:
+            result = page["result"]
+
+        if "page" in page:
+            result["page"] = page["page"]
+        result["latency_ms"] = round((time.perf_counter() - page["submitted"]) * 1000, 2)
+        result["stage_ms"] = page["stage_ms"]
+        if page["trace"].enabled:
+            result["trace"] = page["trace"].to_dict()
+        return result
@@ -2,4 +2,19 @@
 Constants Module
 Defines project-wide constants and configurations
 """
-pass
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MASTERS_DIR = os.path.join(BASE_DIR, "data", "masters")
+DEALER_MASTER_CSV = os.path.join(MASTERS_DIR, "dealer_master.csv")
+ASSET_MASTER_CSV = os.path.join(MASTERS_DIR, "asset_master.csv")
+
+# Memory-mapped fuzzy-match indexes built from the master CSVs
+MASTER_INDEX_DIR = os.path.join(MASTERS_DIR, ".index")
+
+# ImageNormalizer profiles (kept here so the CLI can list them without cv2):
+# quality: CLAHE + full-resolution NL-means (original behaviour)
+# fast:    CLAHE + 3x3 median (edge-preserving, ~100x cheaper than NL-means)
+# auto:    CLAHE, then NL-means only when the estimated noise calls for it
+NORMALIZE_PROFILES = ("quality", "fast", "auto")
@@ -1,5 +1,244 @@
 """
 Fuzzy Match Utilities Module
 Handles fuzzy string matching operations
+
+MasterIndex answers "which master rows look like this OCR string?" without
+scanning the whole master:
+
+1. Blocking  - every name is normalized (normalize_text) and split into
+               character trigrams; an inverted index maps trigram -> rows.
+               A query only looks at rows sharing trigrams with it.
+2. Re-rank   - the best-overlapping rows are scored with rapidfuzz and the
+               top-k returned.
+
+Blocking makes this an approximation of scanning every row with the same
+scorer. For master names with a character error or two it finds the same
+best score as the scan (tests/test_fuzzy_match.py); with heavier noise the
+scan can prefer a row the index never scores, typically a much shorter name
+sharing one word with the query, which WRatio's partial-token path scores
+85.5. benchmarks/bench_master_match.py reports the agreement rate.
+
+The index is a handful of flat .npy arrays. save() writes them once and
+load() memory-maps them, so worker processes share one copy through the
+OS page cache instead of each building their own.
 """
-pass
+import csv
+import os
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from src.utils.text_normalize import normalize_text
+
+# normalize_text output alphabet: space, A-Z, 0-9 -> codes 0..36
+_ALPHABET = " ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+_CODE = {ch: i for i, ch in enumerate(_ALPHABET)}
+_BASE = len(_ALPHABET)
+NUM_TRIGRAMS = _BASE ** 3
+
+_ARRAYS = ("offsets", "postings", "names_blob", "names_offsets",
+           "labels_blob", "labels_offsets")
+
+
+def trigram_codes(normalized):
+    """Unique trigram ids of an already-normalized string (space padded)."""
+    codes = [_CODE[ch] for ch in f" {normalized} " if ch in _CODE]
+    return sorted({
+        (a * _BASE + b) * _BASE + c
+        for a, b, c in zip(codes, codes[1:], codes[2:])
+    })
+
+
+def _pack(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+class MasterIndex:
+    def __init__(self, arrays):
+        self.offsets = arrays["offsets"]
+        self.postings = arrays["postings"]
+        self._names_blob = arrays["names_blob"]
+        self._names_offsets = arrays["names_offsets"]
+        self._labels_blob = arrays["labels_blob"]
+        self._labels_offsets = arrays["labels_offsets"]
+
+    # ------------------------------------------------------------
+    # Build / persist
+    # ------------------------------------------------------------
+
+    @classmethod
+    def build(cls, labels):
+        """Index a list of display strings (e.g. dealer names)."""
+        names = [normalize_text(label) for label in labels]
+
+        rows, codes = [], []
+        for row, name in enumerate(names):
+            tri = trigram_codes(name)
+            rows.extend([row] * len(tri))
+            codes.extend(tri)
+
+        rows = np.asarray(rows, dtype=np.int32)
+        codes = np.asarray(codes, dtype=np.int64)
+        order = np.argsort(codes, kind="stable")
+
+        offsets = np.zeros(NUM_TRIGRAMS + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(codes, minlength=NUM_TRIGRAMS))
+
+        names_blob, names_offsets = _pack(names)
+        labels_blob, labels_offsets = _pack(labels)
+
+        return cls({
+            "offsets": offsets,
+            "postings": rows[order],
+            "names_blob": names_blob,
+            "names_offsets": names_offsets,
+            "labels_blob": labels_blob,
+            "labels_offsets": labels_offsets
+        })
+
+    @classmethod
+    def from_csv(cls, csv_path, columns):
+        """One entry per CSV row; the label joins `columns` with spaces."""
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            labels = [
+                " ".join(row[c].strip() for c in columns if row.get(c))
+                for row in csv.DictReader(f)
+            ]
+        return cls.build(labels)
+
+    def save(self, index_dir):
+        os.makedirs(index_dir, exist_ok=True)
+        arrays = {
+            "offsets": self.offsets,
+            "postings": self.postings,
+            "names_blob": self._names_blob,
+            "names_offsets": self._names_offsets,
+            "labels_blob": self._labels_blob,
+            "labels_offsets": self._labels_offsets
+        }
+        # Write-then-rename, postings last: load_or_build treats postings.npy
+        # as the "index complete" marker, and concurrent workers may race to
+        # build the same (deterministic) index.
+        for name in sorted(arrays, key=lambda n: n == "postings"):
+            path = os.path.join(index_dir, f"{name}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, arrays[name])
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, index_dir, mmap=True):
+        mode = "r" if mmap else None
+        return cls({
+            name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode=mode)
+            for name in _ARRAYS
+        })
+
+    @classmethod
+    def load_or_build(cls, csv_path, columns, index_dir):
+        """
+        Memory-map the saved index, rebuilding it first if it is missing or
+        older than the CSV.
+        """
+        marker = os.path.join(index_dir, "postings.npy")
+        if (not os.path.exists(marker)
+                or os.path.getmtime(marker) < os.path.getmtime(csv_path)):
+            cls.from_csv(csv_path, columns).save(index_dir)
+        return cls.load(index_dir)
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._names_offsets) - 1
+
+    def name(self, row):
+        return self._decode(self._names_blob, self._names_offsets, row)
+
+    def label(self, row):
+        return self._decode(self._labels_blob, self._labels_offsets, row)
+
+    def candidates(self, normalized, limit=50, max_df=0.05, max_edits=2, shortlist=300):
+        """
+        Rows sharing the most trigrams with the query.
+
+        Rows are pooled from the query's rare trigrams: those in at most
+        `max_df` of all rows, and at least the 3 * max_edits + 1 rarest. A
+        character error touches at most three of the query's trigrams, so a
+        name the query matches up to `max_edits` errors shares one of these
+        even when the errors hit its only distinctive word. The `shortlist`
+        pooled rows sharing the most of them are then ranked by all shared
+        trigrams, common ones ("TRA", "ORS", ...) included.
+        """
+        codes = np.asarray(trigram_codes(normalized), dtype=np.int64)
+        if not len(codes):
+            return np.empty(0, dtype=np.int64)
+
+        starts = self.offsets[codes]
+        ends = self.offsets[codes + 1]
+        order = np.argsort(ends - starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+        df = ends - starts
+
+        present = df > 0
+        pooled = present & ((df <= max_df * len(self)) | (np.arange(len(df)) <= 3 * max_edits))
+        if not pooled.any():
+            return np.empty(0, dtype=np.int64)
+
+        hits = [self.postings[s:e] for s, e in zip(starts[pooled].tolist(), ends[pooled].tolist())]
+        counts = np.bincount(np.concatenate(hits), minlength=len(self))
+        rows = np.flatnonzero(counts)
+        counts = counts[rows]
+        # A name has about len(name) trigrams. Ties on the pooled ones go to
+        # names about as long as the query; the final ranking is the
+        # Dice-style overlap shared / (query trigrams + name trigrams).
+        lengths = self._names_offsets[rows + 1] - self._names_offsets[rows]
+        if len(rows) > shortlist:
+            gap = np.abs(lengths - len(normalized)) / (lengths + len(normalized))
+            keep = np.argpartition(gap - counts, shortlist - 1)[:shortlist]
+            rows, counts, lengths = rows[keep], counts[keep], lengths[keep]
+
+        # Posting lists are sorted by row, so membership is a binary search
+        keys = rows.astype(self.postings.dtype)
+        for s, e in zip(starts[present & ~pooled].tolist(), ends[present & ~pooled].tolist()):
+            posting = self.postings[s:e]
+            pos = np.minimum(np.searchsorted(posting, keys), e - s - 1)
+            counts = counts + (posting[pos] == keys)
+
+        if len(rows) > limit:
+            keep = np.argpartition(-counts / (len(codes) + lengths), limit - 1)[:limit]
+            rows = rows[keep]
+        return rows
+
+    def query(self, text, k=5, limit=50, scorer=fuzz.WRatio, score_cutoff=0):
+        """
+        Top-k master rows for `text`:
+            [{"row": int, "match": label, "score": 0..100}, ...]
+        """
+        normalized = normalize_text(text)
+        rows = self.candidates(normalized, limit=limit)
+        if not len(rows):
+            return []
+
+        choices = [self.name(row) for row in rows.tolist()]
+        ranked = process.extract(
+            normalized, choices, scorer=scorer, limit=k, score_cutoff=score_cutoff
+        )
+
+        return [
+            {
+                "row": int(rows[i]),
+                "match": self.label(int(rows[i])),
+                "score": round(float(score), 2)
+            }
+            for _, score, i in ranked
+        ]
+
+    @staticmethod
+    def _decode(blob, offsets, row):
+        return bytes(blob[offsets[row]:offsets[row + 1]]).decode("utf-8")
@@ -1,5 +1,31 @@
 """
 Geometry Utilities Module
 Handles geometric operations and calculations
+
+Batched NumPy versions of the box helpers. Quads are (N, 4, 2) arrays of
+corner points, rects are (N, 4) arrays of [x_min, y_min, x_max, y_max], so
+TokenTable derives a page's geometry in one call per quantity instead of a
+quad_to_rect call per token.
 """
-pass
+import numpy as np
+
+X_MIN, Y_MIN, X_MAX, Y_MAX = 0, 1, 2, 3
+
+
+def as_quads(quads):
+    return np.asarray(quads, dtype=np.float64).reshape(-1, 4, 2)
+
+
+def quads_to_rects(quads):
+    """(N, 4, 2) quads -> (N, 4) axis-aligned rects."""
+    quads = as_quads(quads)
+    return np.concatenate([quads.min(axis=1), quads.max(axis=1)], axis=1)
+
+
+def quad_centers(quads):
+    """(N, 4, 2) quads -> (N, 2) centers (mean of the four corners)."""
+    return as_quads(quads).mean(axis=1)
+
+
+def rect_heights(rects):
+    return rects[:, Y_MAX] - rects[:, Y_MIN]
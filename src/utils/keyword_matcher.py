@@ -0,0 +1,106 @@
+"""
+Keyword Matcher Module
+Compiled multi-keyword substring matching for the extraction dictionaries
+"""
+import re
+from collections import Counter
+
+
+def _trie_regex(keywords):
+    """
+    Fold the keywords into a prefix trie and emit it as a regex, e.g.
+    ["auto", "automobiles", "automotive"] -> auto(?:mo(?:biles|tive))?
+
+    The regex engine then walks the trie once per text position instead of
+    trying every keyword in turn, so the cost stays flat as lists grow.
+    Optional tails are greedy, so the match at a position is the longest
+    keyword starting there.
+    """
+    trie = {}
+    for word in keywords:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = (body if len(branches) > 1 else "(?:" + body + ")") + "?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of every keyword (plain substrings, overlaps
+    included) in one pass over the text. Matching is case-sensitive; pass
+    lowercased keywords and text (or uppercased) as the callers already do.
+
+    Compile once at import time and share:
+        DEALER_KEYWORDS = KeywordMatcher(KEYWORDS)
+        DEALER_KEYWORDS.hits("abc tractors pvt ltd")
+        -> {"tractor": 4, "tractors": 4, "pvt": 13, "ltd": 17}
+    """
+
+    def __init__(self, keywords):
+        keywords = [k for k in keywords if k]
+        self.keywords = list(dict.fromkeys(keywords))
+
+        # Duplicate list entries keep counting once per listing in count()
+        self.weights = Counter(keywords)
+
+        if self.keywords:
+            trie = _trie_regex(self.keywords)
+            self._any = re.compile(trie)
+            self._scan = re.compile("(?=(" + trie + "))")
+        else:
+            self._any = self._scan = re.compile("(?!)")
+
+        # Every keyword starting where a longer one starts is a prefix of it;
+        # look up each keyword's proper prefixes instead of comparing all
+        # pairs, listing them in keyword order
+        position = {k: i for i, k in enumerate(self.keywords)}
+        self._prefixes = {
+            longer: sorted((longer[:n] for n in range(1, len(longer)) if longer[:n] in position),
+                           key=position.get)
+            for longer in self.keywords
+        }
+
+    def find_all(self, text):
+        """All (start, keyword) occurrences, ordered by start position."""
+        found = []
+        for m in self._scan.finditer(text):
+            start = m.start()
+            longest = m.group(1)
+            for k in self._prefixes[longest]:
+                found.append((start, k))
+            found.append((start, longest))
+        return found
+
+    def hits(self, text):
+        """{keyword: first start position} for every keyword in the text."""
+        first = {}
+        for start, k in self.find_all(text):
+            first.setdefault(k, start)
+        return first
+
+    def starts(self, text):
+        """
+        Start positions of non-overlapping matches: the cheapest scan when
+        only where keywords occur matters (e.g. flagging lines of a page
+        joined into one string).
+        """
+        return [m.start() for m in self._any.finditer(text)]
+
+    def search(self, text):
+        """True if any keyword occurs in the text."""
+        return self._any.search(text) is not None
+
+    def count(self, hits):
+        """Number of list entries matched, given the output of hits()."""
+        return sum(self.weights[k] for k in hits)
@@ -0,0 +1,81 @@
+"""
+Patterns Module
+Compiled regular expressions for the field extractors, built once at import
+
+Extractors run these on every line (or token) of every page, so they are
+compiled here instead of being rebuilt (or looked up in re's cache) per
+call.
+Patterns that run on uppercased text are written in uppercase.
+"""
+import re
+
+# ------------------------------------------------------------
+# Model name (ModelNameResolver)
+# ------------------------------------------------------------
+
+MODEL_BRANDS = r"SWARAJ|MAHINDRA|MF|JD"
+
+# Model code inside a table row, tried in order: brand + code first
+MODEL_TABLE_ROW = (
+    re.compile(rf"\b(?:{MODEL_BRANDS})\s*\d{{3,4}}\s*[A-Z]{{1,3}}\b"),
+    re.compile(r"\b\d{3,4}\s*[A-Z]{1,3}\b"),
+)
+
+# Configuration words dropped from a model span
+MODEL_NOISE = re.compile(r"\b(?:HP|WD|CYLINDER|CATG|TRACTOR|PTO|TYRE|SIZE|X)\b")
+DIGIT = re.compile(r"\d")
+MODEL_BRAND_PREFIX = re.compile(rf"^(?:{MODEL_BRANDS})\s+")
+MODEL_CORE = re.compile(rf"\b(?:{MODEL_BRANDS})?\s*\d{{3,4}}\s*[A-Z]{{1,3}}\b")
+
+
+def collapse_spaces(text):
+    """re.sub(r"\\s+", " ", text).strip() without the regex (str.split uses the same whitespace)."""
+    return " ".join(text.split())
+
+
+# ------------------------------------------------------------
+# Horse power (HPResolver)
+# ------------------------------------------------------------
+
+# 2-3 digit integers or decimals, e.g. "48", "47.5"
+HP_NUMBER = re.compile(r"\b\d{2,3}(?:\.\d+)?\b")
+
+# ------------------------------------------------------------
+# Amounts (cost candidates), on uppercased text
+# ------------------------------------------------------------
+
+# Optional currency marker, then Indian (7,45,000) or western (745,000)
+# grouping or plain digits, paise, a "/-" suffix and a lakh / crore unit.
+# Digits glued to letters or other digits (GSTIN, dates, phone parts) do
+# not count.
+AMOUNT = re.compile(
+    r"(?<![\w.,/])"
+    r"(?:(?P<currency>₹|\bRS\.?|\bINR)\s*)?"
+    r"(?P<number>\d{1,3}(?:,\d{2})*,\d{3}|\d{1,3}(?:,\d{3})+|\d+)"
+    r"(?P<decimals>\.\d+)?"
+    r"(?P<suffix>\s*/-)?"
+    r"(?:\s*(?P<unit>LAKHS?|LACS?|CRORES?|CR)\b)?"
+    r"(?![\w/]|[.,]\d)"
+)
+
+AMOUNT_UNITS = {
+    "LAKH": 1e5, "LAKHS": 1e5, "LAC": 1e5, "LACS": 1e5,
+    "CRORE": 1e7, "CRORES": 1e7, "CR": 1e7
+}
+
+# Lines whose numbers are never costs, on lowercased text. Whole words
+# only: "Automobiles" is not "mob", "Hotel" not "tel", "Shipping" not "pin".
+AMOUNT_EXCLUDED_LINE = re.compile(
+    r"(?<!\w)(?:mob(?:ile)?|phone|ph|tel(?:ephone)?|pin(?:\s*code)?|pincode"
+    r"|a/c|account|ifsc|gstin|dated?)(?!\w)"
+)
+
+# ------------------------------------------------------------
+# Text normalization (normalize_text)
+# ------------------------------------------------------------
+
+# Runs of [A-Z0-9]; everything between two runs becomes one space
+ALNUM_RUN = re.compile(r"[A-Z0-9]+")
+
+# Common OCR digit / letter confusions
+OCR_CONFUSIONS = str.maketrans({"0": "O", "1": "I"})
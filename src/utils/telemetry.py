@@ -0,0 +1,198 @@
+"""
+Telemetry Module
+Per-page timing spans and counters for the extraction pipeline.
+
+A Trace travels with one page: stages wrap their work in `trace.span(name)`
+and add counts with `trace.count(name, n)`. Pipelines built with
+telemetry=True attach `trace.to_dict()` to each result as result["trace"];
+the process writing the results hands them to a TelemetryExporter, which
+writes JSON lines and/or a Prometheus text file. Traces are plain dicts,
+so they come back from pool workers like the rest of the result.
+
+Without telemetry every trace is NULL_TRACE, whose spans and counters do
+nothing.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add_span(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class Trace:
+    """Span durations (ms, summed per name) and counters of one page."""
+
+    enabled = True
+
+    def __init__(self):
+        self.spans_ms = {}
+        self.counters = {}
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def add_span(self, name, ms):
+        self.spans_ms[name] = self.spans_ms.get(name, 0.0) + ms
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        return {
+            "spans_ms": {name: round(ms, 3) for name, ms in self.spans_ms.items()},
+            "counters": dict(self.counters)
+        }
+
+
+class _NullTrace:
+    enabled = False
+    _span = nullcontext()
+
+    def span(self, name):
+        return self._span
+
+    def add_span(self, name, ms):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def to_dict(self):
+        return None
+
+
+NULL_TRACE = _NullTrace()
+
+
+def new_trace(enabled):
+    return Trace() if enabled else NULL_TRACE
+
+
+class TelemetryExporter:
+    """
+    Collects result traces in the process that writes the results.
+
+        jsonl_path       one line per page: image, status, latency, spans, counters
+        prometheus_path  text exposition format (e.g. for node_exporter's
+                         textfile collector): a stage latency histogram, page
+                         counts per status and counter totals. Rewritten
+                         atomically every `flush_every` pages and on close().
+
+    With neither path it only aggregates, for prometheus_text() (the
+    extraction service's /metrics endpoint).
+    """
+
+    def __init__(self, jsonl_path=None, prometheus_path=None, flush_every=100):
+        self.prometheus_path = prometheus_path
+        self.flush_every = flush_every
+        self._jsonl = open(jsonl_path, "w", encoding="utf-8") if jsonl_path else None
+
+        self._pages = {}
+        self._buckets = {}
+        self._span_sum = {}
+        self._span_count = {}
+        self._counters = {}
+        self._added = 0
+        self._lock = threading.Lock()
+
+    def add(self, result, trace):
+        """
+        `trace`: the result's trace dict. Pages that failed before a trace
+        was attached (None) still count towards the page totals.
+        """
+        trace = trace or {"spans_ms": {}, "counters": {}}
+
+        with self._lock:
+            if self._jsonl is not None:
+                record = {
+                    "image": result.get("image"),
+                    "status": result.get("status"),
+                    "latency_ms": result.get("latency_ms"),
+                    **trace
+                }
+                self._jsonl.write(json.dumps(record) + "\n")
+
+            status = result.get("status", "ok")
+            self._pages[status] = self._pages.get(status, 0) + 1
+            for stage, ms in trace["spans_ms"].items():
+                seconds = ms / 1000
+                buckets = self._buckets.setdefault(stage, [0] * len(LATENCY_BUCKETS))
+                for i, bound in enumerate(LATENCY_BUCKETS):
+                    if seconds <= bound:
+                        buckets[i] += 1
+                self._span_sum[stage] = self._span_sum.get(stage, 0.0) + seconds
+                self._span_count[stage] = self._span_count.get(stage, 0) + 1
+            for name, value in trace["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+            self._added += 1
+            if self.prometheus_path and self._added % self.flush_every == 0:
+                self._write_prometheus()
+
+    def close(self):
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+            if self.prometheus_path:
+                self._write_prometheus()
+
+    def prometheus_text(self):
+        """Current totals in the Prometheus text exposition format."""
+        with self._lock:
+            return self._prometheus_text()
+
+    def _write_prometheus(self):
+        # Scrapers must never see a half-written file
+        tmp_path = f"{self.prometheus_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self._prometheus_text())
+        os.replace(tmp_path, self.prometheus_path)
+
+    def _prometheus_text(self):
+        lines = [
+            "# HELP extraction_stage_seconds Time spent in each pipeline stage per page.",
+            "# TYPE extraction_stage_seconds histogram",
+        ]
+        for stage in sorted(self._buckets):
+            for bound, count in zip(LATENCY_BUCKETS, self._buckets[stage]):
+                lines.append(f'extraction_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'extraction_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} '
+                         f'{self._span_count[stage]}')
+            lines.append(f'extraction_stage_seconds_sum{{stage="{stage}"}} {self._span_sum[stage]:.6f}')
+            lines.append(f'extraction_stage_seconds_count{{stage="{stage}"}} {self._span_count[stage]}')
+
+        lines += [
+            "# HELP extraction_pages_total Pages processed, by result status.",
+            "# TYPE extraction_pages_total counter",
+        ]
+        for status in sorted(self._pages):
+            lines.append(f'extraction_pages_total{{status="{status}"}} {self._pages[status]}')
+
+        lines += [
+            "# HELP extraction_items_total Tokens, lines, blocks and candidates seen.",
+            "# TYPE extraction_items_total counter",
+        ]
+        for name in sorted(self._counters):
+            lines.append(f'extraction_items_total{{item="{name}"}} {self._counters[name]}')
+
+        return "\n".join(lines) + "\n"
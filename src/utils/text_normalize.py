@@ -1,15 +1,11 @@
-import re
+from src.utils.patterns import ALNUM_RUN, OCR_CONFUSIONS
 
 def normalize_text(text: str) -> str:
     if not text:
         return ""
 
-    text = text.upper()
-    text = re.sub(r'[^A-Z0-9 ]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    # Keep the A-Z / 0-9 runs, one space between them
+    text = " ".join(ALNUM_RUN.findall(text.upper()))
 
-    # common OCR confusions
-    text = text.replace('0', 'O')
-    text = text.replace('1', 'I')
-
-    return text
+    # common OCR confusions (0 -> O, 1 -> I)
+    return text.translate(OCR_CONFUSIONS)
@@ -0,0 +1,24 @@
+import random
+
+import pytest
+
+from benchmarks.bench_block_grouping import random_layout, reference_group_lines_into_blocks
+from src.layout.block_grouping import group_lines_into_blocks, iter_blocks
+from src.layout.token_table import TokenTable
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_reference_on_random_pages(seed):
+    rng = random.Random(seed)
+    table, lines = random_layout(rng.randint(1, 400), rng)
+    expected = reference_group_lines_into_blocks(table, lines)
+
+    assert group_lines_into_blocks(table, lines) == expected
+    chunk_size = rng.randint(1, 20)
+    assert list(iter_blocks(table, iter(lines), chunk_size=chunk_size)) == expected
+
+
+def test_no_lines():
+    table = TokenTable.from_tokens([])
+    assert group_lines_into_blocks(table, []) == []
+    assert list(iter_blocks(table, [])) == []
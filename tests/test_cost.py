@@ -0,0 +1,71 @@
+import pytest
+
+from src.candidates.cost import CostCandidateExtractor, parse_amount
+from src.extraction.page_features import PageFeatures
+from src.layout.block_grouping import group_lines_into_blocks
+from src.layout.line_grouping import group_tokens_into_lines
+from src.layout.token_table import TokenTable
+
+
+def token(text, x, y, h=20):
+    w = 12 * len(text)
+    return {"text": text, "bbox": [[x, y], [x + w, y], [x + w, y + h], [x, y + h]],
+            "confidence": 0.95}
+
+
+def page(tokens):
+    table = TokenTable.from_tokens(tokens)
+    lines = group_tokens_into_lines(table)
+    return PageFeatures(table, group_lines_into_blocks(table, lines), 1200, 1600)
+
+
+def costs(tokens):
+    return {c.value for c in CostCandidateExtractor().extract(page(tokens))}
+
+
+@pytest.mark.parametrize("text, value", [
+    ("₹ 7,45,000/-", 745000),
+    ("Rs. 745000", 745000),
+    ("INR 7,45,000.50", 745000.5),
+    ("6.85 lakh", 685000),
+    ("1.2 crore", 12000000),
+])
+def test_parse_amount(text, value):
+    assert parse_amount(text)[0] == value
+
+
+@pytest.mark.parametrize("text", ["12/03/2024", "Qty 1", "GSTIN 27AAACM1234F1Z5"])
+def test_parse_amount_rejects_non_amounts(text):
+    assert parse_amount(text) is None
+
+
+@pytest.mark.parametrize("text, value", [
+    # Excluded words must match whole words, not parts of other words
+    ("Shubham Automobiles 7,45,000", 745000),  # "mob"
+    ("Hotel charges Rs. 5,500", 5500),         # "tel"
+    ("Shipping 1,200", 1200),                  # "pin"
+])
+def test_amount_lines_not_excluded_by_substrings(text, value):
+    assert value in costs([token(text, 100, 300)])
+
+
+@pytest.mark.parametrize("text", [
+    "Mob: 98,765",
+    "Tel 45,000",
+    "PIN 4,22,001",
+    "Date: 12,03,2024",
+])
+def test_excluded_lines(text):
+    assert costs([token(text, 100, 300)]) == set()
+
+
+def test_grand_total_row_of_amount_column():
+    tokens = [
+        token("Particulars", 100, 300), token("Amount (Rs)", 900, 300),
+        token("Swaraj 744 FE", 100, 340), token("6,85,000", 900, 340),
+        token("Insurance", 100, 380), token("32,500", 900, 380),
+        token("Grand Total", 100, 440), token("7,17,500/-", 900, 440),
+    ]
+    candidates = CostCandidateExtractor().extract(page(tokens))
+    best = max(candidates, key=lambda c: c.confidence)
+    assert (best.value, best.source) == (717500, "grand_total_row")
@@ -0,0 +1,17 @@
+import pytest
+
+from src.document_pipeline import DocumentPipeline
+
+
+@pytest.mark.parametrize("document", [[], ()])
+def test_empty_document_rejected(document):
+    documents = DocumentPipeline(master_matching=False)
+    with pytest.raises(ValueError, match="no page images"):
+        documents.run(document)
+
+
+def test_missing_pages_reported_per_page(tmp_path):
+    paths = [str(tmp_path / "quote_pg1.png"), str(tmp_path / "quote_pg2.png")]
+    result = DocumentPipeline(master_matching=False).run(paths)
+    assert (result["status"], result["num_pages"], result["pages_processed"]) == ("error", 2, 2)
+    assert [page["page"] for page in result["pages"]] == [1, 2]
@@ -0,0 +1,93 @@
+import os
+import random
+
+import numpy as np
+import pytest
+from rapidfuzz import fuzz
+
+from benchmarks.bench_master_match import ocr_noise, random_name
+from src.utils.fuzzy_match import MasterIndex
+from src.utils.text_normalize import normalize_text
+
+
+def brute_force(text, names):
+    """Best WRatio over every master name, and the rows scoring it."""
+    query = normalize_text(text)
+    scores = [round(fuzz.WRatio(query, name), 2) for name in names]
+    best = max(scores)
+    return best, {row for row, score in enumerate(scores) if score == best}
+
+
+def write_master(path, names):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("dealer_id,dealer_name\n")
+        f.writelines(f"{i},{name}\n" for i, name in enumerate(names, 1))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_query_matches_brute_force(seed):
+    rng = random.Random(seed)
+    labels = [random_name(rng) for _ in range(2000)]
+    index = MasterIndex.build(labels)
+    names = [normalize_text(label) for label in labels]
+
+    for _ in range(50):
+        text = ocr_noise(rng.choice(labels), rng.randint(0, 1), rng)
+        score, rows = brute_force(text, names)
+        top = index.query(text, k=1)[0]
+        # Tied rows are equally good; the scan just keeps the first
+        assert top["score"] == score
+        assert top["row"] in rows
+        assert top["match"] == labels[top["row"]]
+
+
+def test_exact_name_scores_100():
+    labels = ["Shubham Automobiles", "Sri Sai Tractors Pvt Ltd", "Balaji Motors"]
+    index = MasterIndex.build(labels)
+    assert index.query("SRI SAI TRACTORS PVT. LTD.")[0] == {
+        "row": 1, "match": "Sri Sai Tractors Pvt Ltd", "score": 100.0
+    }
+
+
+@pytest.mark.parametrize("text", ["", "   ", "--/--", "@#"])
+def test_empty_query(text):
+    index = MasterIndex.build(["Shubham Automobiles", "Balaji Motors"])
+    assert index.query(text) == []
+    assert len(index.candidates(normalize_text(text))) == 0
+
+
+def test_save_load_round_trip(tmp_path):
+    rng = random.Random(0)
+    labels = [random_name(rng) for _ in range(500)]
+    built = MasterIndex.build(labels)
+    built.save(str(tmp_path))
+
+    loaded = MasterIndex.load(str(tmp_path))
+    assert isinstance(loaded.postings, np.memmap)
+    assert len(loaded) == len(built)
+    assert [loaded.label(row) for row in range(len(loaded))] == labels
+    for text in labels[:50]:
+        noisy = ocr_noise(text, 2, rng)
+        assert loaded.query(noisy) == built.query(noisy)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_load_or_build_rebuilds_stale_index(tmp_path):
+    csv_path = str(tmp_path / "dealer_master.csv")
+    index_dir = str(tmp_path / "index")
+    write_master(csv_path, ["Ace Motors", "Best Wheels"])
+    assert MasterIndex.load_or_build(csv_path, ["dealer_name"], index_dir).query("Ace Motors")[0]["row"] == 0
+
+    # Unchanged CSV: the saved index is reused
+    marker = os.path.join(index_dir, "postings.npy")
+    built_at = os.path.getmtime(marker)
+    MasterIndex.load_or_build(csv_path, ["dealer_name"], index_dir)
+    assert os.path.getmtime(marker) == built_at
+
+    # Newer CSV: rebuilt before loading
+    write_master(csv_path, ["Best Wheels", "Ace Motors", "Shubham Automobiles"])
+    os.utime(csv_path, (built_at + 10, built_at + 10))
+    index = MasterIndex.load_or_build(csv_path, ["dealer_name"], index_dir)
+    assert len(index) == 3
+    assert index.query("Ace Motors")[0] == {"row": 1, "match": "Ace Motors", "score": 100.0}
+    assert index.query("Shubham Automobiles")[0]["row"] == 2
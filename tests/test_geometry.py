@@ -0,0 +1,40 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.layout.geometry import quad_to_rect
+from src.utils.geometry import as_quads, quad_centers, quads_to_rects, rect_heights
+
+
+def random_quads(rng, n):
+    quads = []
+    for _ in range(n):
+        x, y = rng.uniform(0, 2000), rng.uniform(0, 3000)
+        w, h, skew = rng.uniform(0, 300), rng.uniform(0, 60), rng.uniform(-5, 5)
+        quads.append([[x, y], [x + w, y + skew], [x + w, y + skew + h], [x, y + h]])
+        if rng.random() < 0.3:
+            rng.shuffle(quads[-1])  # corners in any order
+    return quads
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_scalar_quad_to_rect(seed):
+    rng = random.Random(seed)
+    quads = random_quads(rng, rng.randint(1, 200))
+    expected = [quad_to_rect(q) for q in quads]
+
+    rects = quads_to_rects(quads)
+    centers = quad_centers(quads)
+    np.testing.assert_allclose(rects, [[r["x_min"], r["y_min"], r["x_max"], r["y_max"]]
+                                       for r in expected])
+    np.testing.assert_allclose(centers, [[r["x_center"], r["y_center"]] for r in expected])
+    np.testing.assert_allclose(rect_heights(rects), [r["height"] for r in expected])
+
+
+def test_empty_page():
+    quads = as_quads(np.empty((0, 4, 2)))
+    assert quads.shape == (0, 4, 2)
+    assert quads_to_rects(quads).shape == (0, 4)
+    assert quad_centers(quads).shape == (0, 2)
+    assert rect_heights(quads_to_rects(quads)).shape == (0,)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from src.utils.keyword_matcher import KeywordMatcher
+
+KEYWORDS = ["auto", "automobiles", "automotive", "mobile", "mobiles", "bile",
+            "tractor", "tractors", "actor", "motor", "motors", "pvt", "ltd"]
+
+
+def reference_find_all(keywords, text):
+    """Every keyword at every position, by brute force."""
+    return sorted(
+        (start, k)
+        for start in range(len(text))
+        for k in dict.fromkeys(keywords)
+        if k and text.startswith(k, start)
+    )
+
+
+@pytest.mark.parametrize("text", [
+    "abc tractors pvt ltd",
+    "sai automobiles and automotive",
+    "automobilesautomobiles",
+    "motors motor motorsport",
+    "no keywords here",
+    "",
+])
+def test_find_all_overlapping_and_nested(text):
+    matcher = KeywordMatcher(KEYWORDS)
+    assert sorted(matcher.find_all(text)) == reference_find_all(KEYWORDS, text)
+
+
+def test_find_all_lists_prefixes_before_the_longest_match():
+    matcher = KeywordMatcher(["tractors", "tractor", "trac"])
+    assert matcher.find_all("xtractors") == [(1, "tractor"), (1, "trac"), (1, "tractors")]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_find_all_random_keywords(seed):
+    rng = random.Random(seed)
+    keywords = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 5))) for _ in range(30)]
+    text = "".join(rng.choice("ab ") for _ in range(200))
+    assert sorted(KeywordMatcher(keywords).find_all(text)) == reference_find_all(keywords, text)
+
+
+def test_hits_keeps_first_start():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.hits("abc tractors pvt ltd") == {
+        "tractor": 4, "tractors": 4, "actor": 6, "pvt": 13, "ltd": 17
+    }
+    assert matcher.hits("auto automobiles") == {
+        "auto": 0, "automobiles": 5, "mobile": 9, "mobiles": 9, "bile": 11
+    }
+
+
+def test_count_weights_duplicate_entries():
+    matcher = KeywordMatcher(["motor", "motors", "motor", "ltd", ""])
+    assert matcher.keywords == ["motor", "motors", "ltd"]
+    assert matcher.count(matcher.hits("abc motors ltd")) == 4
+    assert matcher.count(matcher.hits("abc motor")) == 2
+    assert matcher.count(matcher.hits("nothing")) == 0
+
+
+def test_search_and_starts():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.search("sai tractors")
+    assert not matcher.search("sai traders")
+    assert matcher.starts("auto tractors") == [0, 5]
+
+
+def test_empty_keyword_list():
+    matcher = KeywordMatcher([])
+    assert matcher.find_all("anything") == []
+    assert matcher.hits("anything") == {}
+    assert not matcher.search("anything")
@@ -0,0 +1,23 @@
+import random
+
+import pytest
+
+from benchmarks.bench_line_grouping import random_page, reference_group_tokens_into_lines
+from src.layout.line_grouping import group_tokens_into_lines
+from src.layout.token_table import TokenTable
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_reference_on_random_pages(seed):
+    rng = random.Random(seed)
+    tokens = random_page(rng.randint(1, 400), rng)
+    rng.shuffle(tokens)
+
+    expected = [[t["text"] for t in line] for line in reference_group_tokens_into_lines(tokens)]
+    table = TokenTable.from_tokens(tokens)
+    actual = [[table.text[row] for row in line] for line in group_tokens_into_lines(table)]
+    assert actual == expected
+
+
+def test_empty_page():
+    assert group_tokens_into_lines(TokenTable.from_tokens([])) == []
@@ -0,0 +1,53 @@
+import random
+import sqlite3
+import string
+
+from src.preprocessing.ocr_cache import OCRCache
+
+
+def access_times(cache):
+    with sqlite3.connect(cache.path) as conn:
+        return dict(conn.execute("SELECT key, last_access FROM entries"))
+
+
+def random_page(rng, chars=1000):
+    return {"tokens": ["".join(rng.choice(string.ascii_lowercase) for _ in range(chars))]}
+
+
+def test_hits_are_buffered_and_flushed_in_batches(tmp_path):
+    cache = OCRCache(str(tmp_path), flush_every=3, flush_interval_s=3600)
+    for key in "abcd":
+        cache.put(key, {"tokens": [key]})
+    before = access_times(cache)
+
+    assert cache.get("a") == {"tokens": ["a"]}
+    cache.get("b")
+    assert access_times(cache) == before
+
+    cache.get("c")
+    after = access_times(cache)
+    assert all(after[k] >= before[k] for k in "abc") and after["d"] == before["d"]
+    assert (cache.hits, cache.misses) == (3, 0)
+
+
+def test_close_flushes_pending_hits(tmp_path):
+    cache = OCRCache(str(tmp_path), flush_every=100, flush_interval_s=3600)
+    cache.put("a", {"tokens": []})
+    cache.put("b", {"tokens": []})
+    cache.get("a")
+    cache.close()
+
+    times = access_times(cache)
+    assert times["a"] >= times["b"]
+
+
+def test_eviction_sees_buffered_hits(tmp_path):
+    # ~700-byte payloads; the cap holds three
+    rng = random.Random(0)
+    cache = OCRCache(str(tmp_path), max_size_mb=2500 / 2**20, flush_every=100, flush_interval_s=3600)
+    for key in ["old", "middle", "recent"]:
+        cache.put(key, random_page(rng))
+
+    cache.get("old")  # buffered; put() writes it before evicting
+    cache.put("new", random_page(rng))
+    assert set(access_times(cache)) == {"old", "recent", "new"}
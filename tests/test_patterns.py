@@ -0,0 +1,19 @@
+import random
+
+import pytest
+
+from benchmarks.bench_patterns import FIXTURE_DIR, extractors, fixture_lines, random_line
+
+LINES = fixture_lines(FIXTURE_DIR) + [random_line(random.Random(0)) for _ in range(20000)] + [
+    "", "   ", "Swaraj 744 FE 48 HP", "MF 1035 DI / 36 HP", "Rs. 7,45,000/-", "HP-52 PTO 44",
+    # Blacklisted words, alone and inside longer words
+    "FOR SWARAJ 744 FE", "Bank 855 FE", "Formtrac 60 EPI", "Total Amount 744 FE", "GSTIN 575 DI",
+]
+
+
+@pytest.mark.parametrize("name, reference, compiled, lowercase",
+                         extractors(), ids=[e[0] for e in extractors()])
+def test_registry_matches_reference(name, reference, compiled, lowercase):
+    lines = [line.lower() for line in LINES] if lowercase else LINES
+    mismatches = [line for line in lines if reference(line) != compiled(line)]
+    assert not mismatches, f"{len(mismatches)} lines differ, e.g. {mismatches[0]!r}"
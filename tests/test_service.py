@@ -0,0 +1,56 @@
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from src.service import make_server
+
+
+class EchoService:
+    ready = True
+
+    def handle(self, path=None, data=None):
+        return 200, {"path": path}
+
+
+@pytest.fixture
+def post_path(tmp_path):
+    servers = []
+
+    def post(path, root):
+        server = make_server("127.0.0.1:0", EchoService(), root=root)
+        servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        conn = http.client.HTTPConnection(*server.server_address)
+        conn.request("POST", "/extract", json.dumps({"path": path}),
+                     {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    yield post
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_path_requests_disabled_without_root(post_path, tmp_path):
+    (tmp_path / "page.png").write_bytes(b"x")
+    assert post_path(str(tmp_path / "page.png"), root=None)[0] == 403
+
+
+def test_path_resolved_under_root(post_path, tmp_path):
+    (tmp_path / "pages").mkdir()
+    status, result = post_path("pages/page.png", root=str(tmp_path))
+    assert status == 200
+    assert result["path"] == os.path.realpath(tmp_path / "pages" / "page.png")
+
+
+@pytest.mark.parametrize("path", ["../outside.png", "/etc/passwd", "link.png"])
+def test_path_outside_root_rejected(post_path, tmp_path, path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "link.png").symlink_to(tmp_path / "outside.png")
+    assert post_path(path, root=str(root))[0] == 403
+
@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from src.staged_pipeline import StagedPipeline
+
+
+def pages_then_error(paths):
+    yield from paths
+    raise ValueError("bad manifest line")
+
+
+def run_with_timeout(fn, timeout=30):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "StagedPipeline.run() hung"
+    return outcome
+
+
+@pytest.mark.parametrize("paths", [[], ["missing_1.png", "missing_2.png"]])
+def test_failing_input_is_reraised_after_fed_pages(tmp_path, paths):
+    staged = StagedPipeline(decode_workers=2, normalize_workers=1, master_matching=False)
+    results = []
+    paths = [str(tmp_path / p) for p in paths]
+
+    outcome = run_with_timeout(lambda: results.extend(staged.run(pages_then_error(paths))))
+
+    assert isinstance(outcome.get("error"), ValueError)
+    # Pages fed before the failure still come out (as errors: the files do not exist)
+    assert sorted(r["image"] for r in results) == sorted(paths)
+    assert all(r["status"] == "error" for r in results)
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from src.extraction.top_k import TopK
+
+
+def reference_top_k(candidates, k):
+    """
+    The original ranking: all candidates in page order, highest score first
+    with the first seen winning ties, each key once, best k kept.
+    """
+    ranked = sorted(candidates, key=lambda c: (-c["score"], c["order"]))
+    kept = {}
+    for c in ranked:
+        kept.setdefault(c["key"], c)
+    return list(kept.values())[:k]
+
+
+def random_candidates(rng, n):
+    # Few distinct scores and keys, so ties and repeated values are common
+    return [
+        {"score": rng.choice([0.25, 0.5, 0.5, 0.75, 0.9, 0.9]),
+         "order": (i // 3, i % 3),
+         "key": rng.choice("ABCDEFGH")}
+        for i in range(n)
+    ]
+
+
+def push_all(candidates, k):
+    top = TopK(k)
+    for c in candidates:
+        top.push(c["score"], c["order"], c["key"], c)
+    return top
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_sort_and_take_first(seed):
+    rng = random.Random(seed)
+    candidates = random_candidates(rng, rng.randint(0, 40))
+    k = rng.randint(1, 6)
+    expected = reference_top_k(candidates, k)
+
+    shuffled = candidates[:]
+    rng.shuffle(shuffled)
+    top = push_all(shuffled, k)
+
+    assert top.items() == expected
+    assert top.best() == (max(candidates, key=lambda c: c["score"]) if candidates else None)
+
+
+def test_equal_scores_go_to_the_earliest():
+    top = TopK(2)
+    top.push(0.8, (5,), "late", "late")
+    top.push(0.8, (1,), "early", "early")
+    top.push(0.8, (3,), "middle", "middle")
+    assert top.items() == ["early", "middle"]
+    assert top.best() == "early"
+
+
+def test_repeated_key_keeps_its_best_score():
+    top = TopK(3)
+    top.push(0.5, (0,), "745000", {"score": 0.5, "line": 0})
+    top.push(0.9, (4,), "745000", {"score": 0.9, "line": 4})
+    top.push(0.9, (2,), "745000", {"score": 0.9, "line": 2})
+    top.push(0.7, (1,), "685000", {"score": 0.7, "line": 1})
+    top.push(0.3, (3,), "745000", {"score": 0.3, "line": 3})
+    assert len(top) == 2
+    assert top.items() == [{"score": 0.9, "line": 2}, {"score": 0.7, "line": 1}]
+
+
+def test_admits():
+    top = TopK(2)
+    assert top.admits(0.0)  # not full yet
+    top.push(0.9, (0,), "a", "a")
+    top.push(0.6, (1,), "b", "b")
+    # A candidate tying the worst kept score may still win on page order
+    assert top.admits(0.6)
+    assert top.admits(0.6 - 0.0005)  # within BOUND_SLACK of rounding
+    assert not top.admits(0.55)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_pruning_by_bound_keeps_the_same_top_k(seed):
+    # Resolvers visit lines by decreasing score bound and stop at the first
+    # line admits() rejects; the result must match scoring every line
+    rng = random.Random(seed)
+    bounds = [rng.choice([0.3, 0.5, 0.7, 0.9]) for _ in range(rng.randint(1, 30))]
+    lines = [
+        [{"score": round(bound * rng.choice([0.5, 0.8, 1.0]), 3), "order": (li, j),
+          "key": rng.choice("ABCDEF")} for j in range(rng.randint(0, 3))]
+        for li, bound in enumerate(bounds)
+    ]
+    k = rng.randint(1, 4)
+
+    top = TopK(k)
+    for li in sorted(range(len(lines)), key=lambda li: -bounds[li]):
+        if not top.admits(bounds[li]):
+            break
+        for c in lines[li]:
+            top.push(c["score"], c["order"], c["key"], c)
+
+    assert top.items() == reference_top_k([c for line in lines for c in line], k)